@@ -0,0 +1,151 @@
+"""远程控制的往返延迟和吞吐（本机回环）
+
+    python benchmarks/remote_loopback.py [消息数]
+
+启动 RemoteServer 和真实的 AudioEngine（音轨没有声音，触发只经过命令队列），
+分别通过 UDP（文本和 OSC）和 WebSocket 测量 /ping 的往返延迟，
+以及连续发送 /trigger 时服务器处理的消息数/秒
+"""
+import base64
+import os
+import socket
+import struct
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+TRACKS = 100
+
+
+class WebSocketClient:
+    """最小的 WebSocket 客户端，只发送带掩码的文本帧"""
+    def __init__(self, port):
+        self.sock = socket.create_connection(("127.0.0.1", port))
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        key = base64.b64encode(os.urandom(16)).decode()
+        self.sock.sendall((f"GET / HTTP/1.1\r\nHost: 127.0.0.1:{port}\r\nUpgrade: websocket\r\n"
+                           f"Connection: Upgrade\r\nSec-WebSocket-Key: {key}\r\n"
+                           "Sec-WebSocket-Version: 13\r\n\r\n").encode())
+        self.reader = self.sock.makefile("rb")
+        status = self.reader.readline()
+        if b" 101 " not in status:
+            raise RuntimeError(f"握手失败: {status!r}")
+        while self.reader.readline() not in (b"\r\n", b""):
+            pass
+
+    def send(self, text):
+        payload = text.encode("utf-8")
+        mask = os.urandom(4)
+        masked = bytes(b ^ mask[i % 4] for i, b in enumerate(payload))
+        length = len(payload)
+        head = struct.pack(">BB", 0x81, 0x80 | length) if length < 126 else \
+            struct.pack(">BBH", 0x81, 0x80 | 126, length)
+        self.sock.sendall(head + mask + masked)
+
+    def receive(self):
+        head = self.reader.read(2)
+        length = head[1] & 0x7F
+        if length == 126:
+            length = struct.unpack(">H", self.reader.read(2))[0]
+        return self.reader.read(length).decode("utf-8")
+
+    def close(self):
+        self.sock.close()
+
+
+def percentiles(values):
+    p50, p99 = np.percentile(values, [50, 99]) * 1000
+    return f"p50 {p50:.3f} ms  p99 {p99:.3f} ms"
+
+
+def udp_round_trips(port, count, osc):
+    from musicpad.remote import osc_encode
+
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.settimeout(1.0)
+    times = []
+    for i in range(count):
+        message = osc_encode("/ping", i) if osc else f"/ping {i}".encode()
+        start = time.perf_counter()
+        sock.sendto(message, ("127.0.0.1", port))
+        sock.recvfrom(1024)
+        times.append(time.perf_counter() - start)
+    sock.close()
+    return times
+
+
+def udp_throughput(server, port, count):
+    """连续发送 count 条触发，等待服务器收完，返回 消息数/秒"""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    # 接收缓冲有限，分批发送并用 /ping 同步，避免本机丢包
+    batch = 200
+    sock.settimeout(1.0)
+    before = server.received
+    start = time.perf_counter()
+    for first in range(0, count, batch):
+        for i in range(first, min(count, first + batch)):
+            sock.sendto(f"/trigger {i % TRACKS + 1}".encode(), ("127.0.0.1", port))
+        sock.sendto(b"/ping sync", ("127.0.0.1", port))
+        sock.recvfrom(1024)
+    seconds = time.perf_counter() - start
+    sock.close()
+    return (server.received - before) / seconds
+
+
+def main():
+    from musicpad.audio_engine import AudioEngine
+    from musicpad.audio_track import AudioTrack
+    from musicpad.remote import RemoteServer
+
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    engine = AudioEngine(maxsize=count * 2)
+    engine.tracks = tuple(AudioTrack() for _ in range(TRACKS))
+    engine.start()
+    server = RemoteServer(engine)
+    # 使用系统分配的空闲端口
+    udp_port, ws_port = free_port(socket.SOCK_DGRAM), free_port(socket.SOCK_STREAM)
+    server.start(udp_port, ws_port)
+
+    pings = min(count, 2000)
+    print(f"UDP 文本 往返      {percentiles(udp_round_trips(udp_port, pings, osc=False))}")
+    print(f"UDP OSC 往返       {percentiles(udp_round_trips(udp_port, pings, osc=True))}")
+    print(f"UDP 触发吞吐       {udp_throughput(server, udp_port, count):.0f} 条/秒")
+
+    client = WebSocketClient(ws_port)
+    times = []
+    for i in range(pings):
+        start = time.perf_counter()
+        client.send(f'{{"cmd": "ping", "id": {i}}}')
+        client.receive()
+        times.append(time.perf_counter() - start)
+    print(f"WebSocket 往返     {percentiles(times)}")
+    before = server.received
+    start = time.perf_counter()
+    for i in range(count):
+        client.send(f"/trigger {i % TRACKS + 1}")
+    client.send("/ping sync")
+    client.receive()
+    print(f"WebSocket 触发吞吐 {(server.received - before) / (time.perf_counter() - start):.0f} 条/秒")
+    client.close()
+
+    stats = server.stats()
+    server.stop()
+    engine.close()
+    print(f"收到 {stats['received']} 条，无效 {stats['errors']} 条，"
+          f"处理 p99 {stats['handle_ms']['p99']:.3f} ms，音频队列丢弃 {engine.dropped} 条")
+
+
+def free_port(kind):
+    with socket.socket(socket.AF_INET, kind) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+if __name__ == "__main__":
+    main()
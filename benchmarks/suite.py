@@ -0,0 +1,323 @@
+"""音频板规模的基准测试
+
+    python benchmarks/suite.py [--sizes 10 100 1000 5000] [-o 结果.json] [--compare 旧结果.json]
+
+为每个规模生成合成的 audios.yaml（音轨循环引用几个短音频），
+在独立的子进程中创建 AudioPlayer（不安装全局键盘钩子）并测量:
+
+- load_seconds: AudioPlayer.load_settings 的耗时，decode_seconds: 后台解码全部文件的耗时
+- rss_per_track: 相对空音频板的峰值常驻内存增量 / 音轨数
+- key_events_per_second: _on_key_event 处理合成按键事件的吞吐
+- idle_cpu / playing_cpu: 没有播放时和部分音轨播放时的进程 CPU 占用（状态轮询的开销）
+- save_seconds: save_settings 在界面线程的耗时，save_write_seconds: 到保存线程写入完成的耗时，
+  save_unchanged_seconds: 设置未变化时的耗时
+
+使用 SDL 的 dummy 音频驱动和 Qt 的 offscreen 平台，结果写入 JSON，按提交号区分
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import wave
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+SIZES = (10, 100, 1000, 5000)
+AUDIO_FILES = 8        # 合成音频的个数，音轨循环引用
+AUDIO_SECONDS = 0.5
+KEY_EVENTS = 20000
+CPU_SECONDS = 2.0      # 测量 CPU 占用的时长
+PLAYING_TRACKS = 32    # 测量播放时 CPU 占用的播放音轨数
+LOAD_TIMEOUT = 120.0
+MODES = ("终止模式", "单点模式", "重叠模式", "暂停模式")
+MODIFIERS = ("", "ctrl+", "alt+", "shift+", "ctrl+alt+", "ctrl+shift+", "alt+shift+", "ctrl+alt+shift+")
+KEYS = ([chr(c) for c in range(ord("A"), ord("Z") + 1)]
+        + [str(d) for d in range(10)] + [f"F{i}" for i in range(1, 13)])
+
+
+def peak_rss_bytes():
+    """进程的峰值常驻内存，Windows 上为峰值工作集"""
+    try:
+        import resource
+    except ImportError:
+        return working_set(peak=True)
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def working_set(peak=False):
+    """用 GetProcessMemoryInfo 读取 Windows 进程的（峰值）工作集，失败返回 None"""
+    import ctypes
+    from ctypes import wintypes
+
+    class ProcessMemoryCounters(ctypes.Structure):
+        _fields_ = [("cb", wintypes.DWORD),
+                    ("PageFaultCount", wintypes.DWORD),
+                    ("PeakWorkingSetSize", ctypes.c_size_t),
+                    ("WorkingSetSize", ctypes.c_size_t),
+                    ("QuotaPeakPagedPoolUsage", ctypes.c_size_t),
+                    ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                    ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+                    ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                    ("PagefileUsage", ctypes.c_size_t),
+                    ("PeakPagefileUsage", ctypes.c_size_t)]
+
+    kernel32, psapi = ctypes.windll.kernel32, ctypes.windll.psapi
+    kernel32.GetCurrentProcess.restype = wintypes.HANDLE
+    psapi.GetProcessMemoryInfo.argtypes = [wintypes.HANDLE, ctypes.POINTER(ProcessMemoryCounters),
+                                           wintypes.DWORD]
+    psapi.GetProcessMemoryInfo.restype = wintypes.BOOL
+    counters = ProcessMemoryCounters()
+    counters.cb = ctypes.sizeof(counters)
+    if not psapi.GetProcessMemoryInfo(kernel32.GetCurrentProcess(), ctypes.byref(counters), counters.cb):
+        return None
+    return counters.PeakWorkingSetSize if peak else counters.WorkingSetSize
+
+
+def write_tone(path, frequency, rate=44100):
+    t = np.arange(int(AUDIO_SECONDS * rate)) / rate
+    pcm = (np.sin(2 * np.pi * frequency * t) * 8000).astype(np.int16)
+    with wave.open(str(path), "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(rate)
+        f.writeframes(pcm.tobytes())
+
+
+def shortcuts():
+    """不重复的组合键，数量有限，超出的音轨没有快捷键"""
+    return [modifier + key for modifier in MODIFIERS for key in KEYS]
+
+
+def make_board(directory, count):
+    """在 directory 中生成音频和 count 个音轨的 audios.yaml"""
+    from musicpad.board import dump_board
+
+    files = []
+    for i in range(AUDIO_FILES):
+        path = Path(directory) / f"tone{i}.wav"
+        write_tone(path, 220 * (i + 1))
+        files.append(str(path))
+    keys = shortcuts()
+    tracks = [{
+        "file_path": files[i % len(files)],
+        "shortcut": keys[i] if i < len(keys) else "",
+        "volume": -(i % 12),
+        "mode": MODES[i % len(MODES)],
+        "loop": False,
+    } for i in range(count)]
+    data = {"global_settings": {"hold_mode": False, "stop_all_shortcut": "esc"}, "tracks": tracks}
+    (Path(directory) / "audios.yaml").write_text(dump_board(data), encoding="utf-8")
+
+
+def key_events(count, tracks):
+    """按下再松开各组合键的合成事件，键名与 keyboard 钩子一致（字母为小写）"""
+    from keyboard import KeyboardEvent, KEY_DOWN, KEY_UP
+
+    chords = [track.shortcut.split("+") for track in tracks if track.shortcut] or [["esc"]]
+    events = []
+    i = 0
+    while len(events) < count:
+        names = [name.lower() if len(name) == 1 else name for name in chords[i % len(chords)]]
+        events += [KeyboardEvent(KEY_DOWN, 0, name) for name in names]
+        events += [KeyboardEvent(KEY_UP, 0, name) for name in reversed(names)]
+        i += 1
+    return events[:count]
+
+
+def run_loop(app, seconds, done=None):
+    """运行事件循环 seconds 秒，done() 为真时提前结束"""
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end and not (done and done()):
+        app.processEvents()
+        time.sleep(0.001)
+
+
+def cpu_fraction(app, seconds):
+    """运行事件循环期间进程（所有线程）的 CPU 占用"""
+    from PyQt6.QtCore import QEventLoop, QTimer
+
+    loop = QEventLoop()
+    QTimer.singleShot(int(seconds * 1000), loop.quit)
+    cpu, wall = time.process_time(), time.perf_counter()
+    loop.exec()
+    return (time.process_time() - cpu) / (time.perf_counter() - wall)
+
+
+def measure(count):
+    """在当前进程中测量 count 个音轨的音频板，返回结果字典
+
+    音频板、合成音频和缓存都放在临时目录中，结束后删除
+    """
+    with tempfile.TemporaryDirectory(prefix="musicpad-bench-", ignore_cleanup_errors=True) as directory:
+        # 缓存目录在导入 musicpad 之前设置，每次都从没有缓存开始
+        os.environ["MUSICPAD_CACHE_DIR"] = os.path.join(directory, "cache")
+        cwd = os.getcwd()
+        os.chdir(directory)
+        try:
+            return measure_board(directory, count)
+        finally:
+            os.chdir(cwd)
+
+
+def measure_board(directory, count):
+    """测量 directory 中 count 个音轨的音频板"""
+    from PyQt6.QtWidgets import QApplication
+    from musicpad.player import AudioPlayer
+
+    class BenchPlayer(AudioPlayer):
+        load_seconds = 0.0
+
+        def setup_keyboard_hook(self):
+            # 不安装全局钩子，按键事件由基准直接调用 _on_key_event
+            pass
+
+        def load_settings(self, board):
+            start = time.perf_counter()
+            super().load_settings(board)
+            self.load_seconds = time.perf_counter() - start
+
+    app = QApplication.instance() or QApplication([])
+    make_board(directory, count)
+
+    player = BenchPlayer()
+    decoded = []
+    player.tracks_container.loader.finished.connect(lambda n, seconds: decoded.append(seconds))
+    run_loop(app, LOAD_TIMEOUT, lambda: decoded or not count)
+    result = {
+        "tracks": count,
+        "container": type(player.tracks_container).__name__,
+        "load_seconds": player.load_seconds,
+        "decode_seconds": decoded[0] if decoded else None,
+        "peak_rss_bytes": peak_rss_bytes(),
+    }
+
+    tracks = player.tracks_container.tracks()
+    events = key_events(KEY_EVENTS, tracks)
+    start = time.perf_counter()
+    for event in events:
+        player._on_key_event(event)
+    seconds = time.perf_counter() - start
+    result["key_events_per_second"] = len(events) / seconds
+    result["engine_dropped"] = player.engine.dropped
+    # 等待触发的播放结束，避免影响空闲时的测量
+    player.stop_all_tracks()
+    run_loop(app, 0.5)
+
+    result["idle_cpu"] = cpu_fraction(app, CPU_SECONDS)
+    playing = [track.audio_track for track in tracks[:PLAYING_TRACKS]]
+    for track in playing:
+        track.loop = True
+        player.trigger_track(track, True)
+    run_loop(app, 0.2)
+    result["playing_tracks"] = len(playing)
+    result["playing_cpu"] = cpu_fraction(app, CPU_SECONDS)
+    player.stop_all_tracks()
+
+    # 保存在保存线程中写入：分别测量界面线程的耗时和写入完成的总耗时
+    player.saver.submit(lambda: None).result()
+    player.board_text = None
+    player.dirty = True
+    start = time.perf_counter()
+    player.save_settings()
+    result["save_seconds"] = time.perf_counter() - start
+    player.saver.submit(lambda: None).result()
+    result["save_write_seconds"] = time.perf_counter() - start
+    start = time.perf_counter()
+    player.save_settings()
+    result["save_unchanged_seconds"] = time.perf_counter() - start
+
+    # 结束后台线程，临时目录才能删除
+    player.engine.close()
+    player.tracks_container.loader.shutdown()
+    player.saver.shutdown(wait=True)
+    return result
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(old, new):
+    """按规模打印两次结果的变化"""
+    old_runs = {run["tracks"]: run for run in old["runs"]}
+    print(f"与 {old['commit']} 比较")
+    for run in new["runs"]:
+        before = old_runs.get(run["tracks"])
+        if before is None:
+            continue
+        changes = []
+        for key, value in run.items():
+            previous = before.get(key)
+            if isinstance(value, float) and isinstance(previous, float) and previous:
+                changes.append(f"{key} {value / previous - 1:+.0%}")
+        print(f"{run['tracks']:>6}: " + ", ".join(changes))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES, help="音轨数")
+    parser.add_argument("-o", "--output", help="结果 JSON，默认为 benchmarks/results/<提交号>.json")
+    parser.add_argument("--compare", help="与之前的结果 JSON 比较")
+    parser.add_argument("--child", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child is not None:
+        # 子进程，最后一行输出结果
+        print(json.dumps(measure(args.child)))
+        sys.stdout.flush()
+        os._exit(0)
+
+    runs = []
+    baseline = None
+    for count in (0, *args.sizes):
+        output = subprocess.run([sys.executable, __file__, "--child", str(count)],
+                                capture_output=True, text=True, check=True).stdout
+        run = json.loads(output.strip().splitlines()[-1])
+        if count == 0:
+            # 空音频板，作为内存的基准
+            baseline = run["peak_rss_bytes"]
+            continue
+        run["rss_per_track"] = (run["peak_rss_bytes"] - baseline) / count
+        runs.append(run)
+        print(f"{count:>6} 音轨  读取 {run['load_seconds'] * 1000:8.1f} ms  "
+              f"内存 {run['rss_per_track'] / 1024:6.1f} KB/音轨  "
+              f"按键 {run['key_events_per_second']:9.0f} 次/秒  "
+              f"CPU 空闲 {run['idle_cpu']:.1%} 播放 {run['playing_cpu']:.1%}  "
+              f"保存 {run['save_seconds'] * 1000:7.1f} ms")
+
+    commit = git_commit()
+    result = {
+        "commit": commit,
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "baseline_rss_bytes": baseline,
+        "runs": runs,
+    }
+    output = Path(args.output) if args.output else ROOT / "benchmarks" / "results" / f"{commit}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(result, indent=2, ensure_ascii=False), encoding="utf-8")
+    print(f"结果已写入 {output}")
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            compare(json.load(f), result)
+
+
+if __name__ == "__main__":
+    main()
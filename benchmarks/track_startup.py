@@ -0,0 +1,83 @@
+"""音轨控件的创建耗时和内存
+
+    python benchmarks/track_startup.py [音轨数]
+
+分别在子进程中创建折叠的音轨（设置面板延迟创建）和预先创建设置面板的音轨，
+比较每个音轨的创建耗时和常驻内存
+"""
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+MODES = ("lazy", "eager")
+
+
+def rss_bytes():
+    """当前进程的常驻内存，Windows 上为工作集，其它没有 /proc 的平台（macOS）用峰值近似"""
+    from suite import peak_rss_bytes, working_set
+
+    if sys.platform == "win32":
+        return working_set()
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        return peak_rss_bytes()
+
+
+def measure(mode, count):
+    """在当前进程中创建 count 个音轨，返回 (每个耗时秒, 每个内存字节)"""
+    from PyQt6.QtWidgets import QApplication
+    from musicpad.tracks import AudioTrackWidget
+
+    app = QApplication.instance() or QApplication([])
+    settings = {"shortcut": "F1", "volume": -6, "mode": "单点模式", "loop": True}
+    # 预热，排除第一次创建控件时的一次性开销
+    AudioTrackWidget().load_settings(settings)
+    app.processEvents()
+
+    widgets = []
+    before = rss_bytes()
+    start = time.perf_counter()
+    for _ in range(count):
+        widget = AudioTrackWidget()
+        widget.load_settings(settings)
+        if mode == "eager":
+            widget.build_panel()
+        widgets.append(widget)
+    seconds = time.perf_counter() - start
+    app.processEvents()
+    return seconds / count, (rss_bytes() - before) / count
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    if len(sys.argv) > 2:
+        # 子进程
+        per_track, per_bytes = measure(sys.argv[2], count)
+        print(per_track, per_bytes)
+        return
+
+    results = {}
+    for mode in MODES:
+        output = subprocess.run([sys.executable, __file__, str(count), mode],
+                                capture_output=True, text=True, check=True).stdout
+        results[mode] = [float(x) for x in output.split()[-2:]]
+
+    print(f"{count} 个音轨")
+    print(f"{'':8}{'耗时/音轨':>12}{'内存/音轨':>12}")
+    for mode, (per_track, per_bytes) in results.items():
+        print(f"{mode:8}{per_track * 1e6:>9.0f} us{per_bytes / 1024:>9.1f} KB")
+    lazy, eager = results["lazy"], results["eager"]
+    print(f"耗时减少 {1 - lazy[0] / eager[0]:.0%}，内存减少 {1 - lazy[1] / eager[1]:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,253 @@
+import hashlib
+import json
+import threading
+from pathlib import Path
+
+import numpy as np
+import pygame
+import pygame.sndarray
+
+from .board import user_cache_dir, write_atomic
+from .sound_pool import sound_pool
+from .stream import StreamReader
+
+CACHE_DIR = user_cache_dir() / "analysis"
+VERSION = 5           # 分析方法变化时增加，旧的缓存失效
+CHUNK_FRAMES = 1 << 20
+SILENCE_LUFS = -70.0  # 绝对门限，也是静音时的响度
+TRUE_PEAK_TAPS = 16   # 真峰值插值的 sinc 长度
+TRUE_PEAK_CANDIDATES = 4096
+TRUE_PEAK_LIMIT = -1.0  # 标准化后真峰值不超过 -1 dBTP
+PEAK_BINS = 512       # 波形缩略图的包络点数
+SILENCE_DB = -50.0    # 低于该电平视为静音
+TRIM_PREROLL = 0.005  # 起点前保留的秒数，不切掉起音
+TRIM_TAIL = 0.02      # 终点后保留的秒数
+
+
+def samples(sound) -> np.ndarray:
+    """Sound 的 PCM 视图 (帧, 声道)，不复制"""
+    array = pygame.sndarray.samples(sound)
+    return array if array.ndim == 2 else array[:, None]
+
+
+def loudness(pcm: np.ndarray, rate) -> dict:
+    """积分响度和峰值
+
+    响度按 BS.1770 的方法分 400 ms 块（步长 100 ms）并做绝对/相对门限，
+    但不做 K 加权滤波，结果接近 LUFS；真峰值在样本峰附近做 4 倍 sinc 插值
+    """
+    hop = max(1, rate // 10)
+    frames = len(pcm) // hop * hop
+    # 每 100 ms 的均方，分段转换为浮点以限制内存
+    step = max(hop, CHUNK_FRAMES // hop * hop)
+    energies = []
+    for start in range(0, frames, step):
+        chunk = pcm[start:min(frames, start + step)].astype(np.float32) / 32768
+        energies.append((chunk * chunk).reshape(-1, hop, pcm.shape[1]).mean(axis=1).sum(axis=1))
+    sub = np.concatenate(energies) if energies else np.zeros(0, np.float32)
+    if len(sub) >= 4:
+        blocks = np.convolve(sub, np.full(4, 0.25), mode="valid")
+    else:
+        # 短于 400 ms 时整段作为一块
+        blocks = np.array([sub.mean()]) if len(sub) else np.zeros(0)
+
+    with np.errstate(divide="ignore"):
+        block_lufs = -0.691 + 10 * np.log10(blocks)
+    gated = blocks[block_lufs > SILENCE_LUFS]
+    if len(gated):
+        relative = -0.691 + 10 * np.log10(gated.mean()) - 10
+        gated = gated[-0.691 + 10 * np.log10(gated) > relative]
+    lufs = -0.691 + 10 * np.log10(gated.mean()) if len(gated) else SILENCE_LUFS
+
+    mean_square = sub.mean() / pcm.shape[1] if len(sub) else 0.0
+    top, candidates = _peak_candidates(pcm)
+    sample_peak = top / 32768
+    peak = max(sample_peak, _interpolated_peak(pcm, candidates))
+    return {
+        "lufs": float(lufs),
+        "rms_db": float(10 * np.log10(mean_square)) if mean_square > 0 else SILENCE_LUFS,
+        "peak_db": float(20 * np.log10(sample_peak)) if sample_peak > 0 else SILENCE_LUFS,
+        "true_peak_db": float(20 * np.log10(peak)) if peak > 0 else SILENCE_LUFS,
+    }
+
+
+def _magnitude(chunk):
+    """int16 的绝对值，先转 int32，避免 abs(-32768) 溢出"""
+    return np.abs(chunk.astype(np.int32))
+
+
+def _peak_candidates(pcm):
+    """样本峰和绝对值最大的若干样本（展平后的下标），分段选取以限制内存"""
+    channels = pcm.shape[1]
+    values = np.zeros(0, np.int32)
+    index = np.zeros(0, np.int64)
+    for start in range(0, len(pcm), CHUNK_FRAMES):
+        flat = _magnitude(pcm[start:start + CHUNK_FRAMES]).reshape(-1)
+        count = min(TRUE_PEAK_CANDIDATES, len(flat))
+        top = np.argpartition(flat, -count)[-count:]
+        values = np.concatenate((values, flat[top]))
+        index = np.concatenate((index, top + start * channels))
+        if len(values) > TRUE_PEAK_CANDIDATES:
+            keep = np.argpartition(values, -TRUE_PEAK_CANDIDATES)[-TRUE_PEAK_CANDIDATES:]
+            values, index = values[keep], index[keep]
+    return int(values.max(initial=0)), index
+
+
+def _interpolated_peak(pcm, candidates):
+    """只在接近样本峰的位置插值，找出样本之间的峰"""
+    if not len(candidates) or len(pcm) < 2:
+        return 0.0
+    frames = candidates // pcm.shape[1]
+    channels = candidates % pcm.shape[1]
+    # 在 i + 1/4, 2/4, 3/4 处插值
+    offsets = np.arange(-TRUE_PEAK_TAPS // 2 + 1, TRUE_PEAK_TAPS // 2 + 1)
+    phases = np.array([0.25, 0.5, 0.75])[:, None]
+    window = np.hanning(TRUE_PEAK_TAPS + 2)[1:-1]
+    weights = np.sinc(phases - offsets) * window
+    index = np.clip(frames[:, None] + offsets, 0, len(pcm) - 1)
+    neighbours = pcm[index, channels[:, None]].astype(np.float32) / 32768
+    return float(np.abs(neighbours @ weights.T).max())
+
+
+def peaks(pcm: np.ndarray, bins=PEAK_BINS) -> dict:
+    """波形包络：把所有声道按帧分成 bins 段，取每段的最小/最大值 (-1~1)"""
+    if not len(pcm):
+        return {"min": [], "max": []}
+    bins = min(bins, len(pcm))
+    edges = np.linspace(0, len(pcm), bins + 1).astype(int)[:-1] * pcm.shape[1]
+    flat = pcm.reshape(-1)
+    lows = np.minimum.reduceat(flat, edges) / 32768
+    highs = np.maximum.reduceat(flat, edges) / 32768
+    return {"min": np.round(lows, 3).tolist(), "max": np.round(highs, 3).tolist()}
+
+
+def silence_bounds(pcm: np.ndarray, rate, threshold_db=SILENCE_DB) -> dict:
+    """开头和结尾静音之外的范围（秒），从两端分段向内扫描，不读整段"""
+    threshold = int(32768 * pow(10, threshold_db / 20))
+    length = len(pcm) / rate if rate else 0.0
+    first = last = None
+    for start in range(0, len(pcm), CHUNK_FRAMES):
+        loud = np.flatnonzero((_magnitude(pcm[start:start + CHUNK_FRAMES]) > threshold).any(axis=1))
+        if len(loud):
+            first = start + loud[0]
+            break
+    if first is None:
+        # 整段静音
+        return {"start": 0.0, "end": length}
+    for end in range(len(pcm), first, -CHUNK_FRAMES):
+        start = max(first, end - CHUNK_FRAMES)
+        loud = np.flatnonzero((_magnitude(pcm[start:end]) > threshold).any(axis=1))
+        if len(loud):
+            last = start + loud[-1] + 1
+            break
+    return _bounds(first, last, length, rate)
+
+
+def stream_silence_bounds(path, rate, threshold_db=SILENCE_DB) -> dict:
+    """流式音源的静音范围，按块读取整个文件，内存与文件长度无关"""
+    threshold = int(32768 * pow(10, threshold_db / 20))
+    reader = StreamReader(path)
+    first = last = None
+    frames = 0
+    try:
+        while True:
+            data = reader.read()
+            if not data:
+                break
+            pcm = np.frombuffer(data, "<i2").reshape(-1, reader.channels)
+            loud = np.flatnonzero((_magnitude(pcm) > threshold).any(axis=1))
+            if len(loud):
+                if first is None:
+                    first = frames + loud[0]
+                last = frames + loud[-1] + 1
+            frames += len(pcm)
+    finally:
+        reader.close()
+    length = frames / rate if rate else 0.0
+    if first is None:
+        return {"start": 0.0, "end": length}
+    return _bounds(first, last, length, rate)
+
+
+def _bounds(first, last, length, rate):
+    """第一个和最后一个有声帧转换为秒，两端各留一点余量"""
+    return {
+        "start": float(max(0.0, first / rate - TRIM_PREROLL)),
+        "end": float(min(length, last / rate + TRIM_TAIL)),
+    }
+
+
+def normalize_gain_db(result, target):
+    """达到目标响度所需的增益(dB)，不让真峰值超过 TRUE_PEAK_LIMIT"""
+    if not result or result["lufs"] <= SILENCE_LUFS:
+        return 0.0
+    return min(target - result["lufs"], TRUE_PEAK_LIMIT - result["true_peak_db"])
+
+
+class AnalysisCache:
+    """按文件标识（路径/修改时间/大小）缓存的分析结果，每个文件一个 JSON"""
+    def __init__(self, directory=CACHE_DIR):
+        self.directory = Path(directory)
+        self.lock = threading.Lock()
+        self.memory = {}  # 文件标识 -> 结果
+
+    def entry_path(self, identity):
+        key = "|".join(map(str, identity))
+        return self.directory / (hashlib.sha1(key.encode("utf-8")).hexdigest() + ".json")
+
+    def get(self, file_path, stream=False):
+        """读取缓存，未命中返回 None
+
+        流式播放时只分析静音，这样的结果只在 stream 为真时返回
+        """
+        identity = sound_pool.identity(file_path)
+        if identity is None:
+            return None
+        with self.lock:
+            result = self.memory.get(identity)
+        if result is not None:
+            return result if stream or not result.get("stream") else None
+        try:
+            with open(self.entry_path(identity), "r", encoding="utf-8") as f:
+                result = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if result.get("version") != VERSION:
+            return None
+        with self.lock:
+            self.memory[identity] = result
+        return result if stream or not result.get("stream") else None
+
+    def put(self, file_path, result):
+        identity = sound_pool.identity(file_path)
+        if identity is None:
+            return
+        result["version"] = VERSION
+        with self.lock:
+            self.memory[identity] = result
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            write_atomic(self.entry_path(identity), json.dumps(result))
+        except OSError as e:
+            print(f"写入分析缓存失败: {e}")
+
+
+def analyze(file_path, sound):
+    """分析解码后的声音并写入缓存，在工作线程调用"""
+    rate = pygame.mixer.get_init()[0]
+    pcm = samples(sound)
+    result = {"loudness": loudness(pcm, rate), "peaks": peaks(pcm),
+              "silence": silence_bounds(pcm, rate)}
+    analysis_cache.put(file_path, result)
+    return result
+
+
+def analyze_stream(file_path, source):
+    """流式音源没有完整的 PCM，只按块检测静音，在工作线程调用"""
+    rate = pygame.mixer.get_init()[0]
+    result = {"silence": stream_silence_bounds(source.path, rate), "stream": True}
+    analysis_cache.put(file_path, result)
+    return result
+
+
+analysis_cache = AnalysisCache()
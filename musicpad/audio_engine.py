@@ -0,0 +1,169 @@
+import queue
+import threading
+import time
+
+from .audio_track import AudioTrack
+from .fades import gain_scheduler
+from .instruments import instruments, TRIGGER, TOGGLE_PLAY
+from .voices import voice_manager
+
+
+class AudioEngine(threading.Thread):
+    """音频命令线程
+
+    键盘钩子线程和界面线程只向有界队列放入小命令，
+    由本线程统一调用 AudioTrack，界面繁忙时不会延迟触发；
+    删除音轨、停止所有、切换设备等生命周期命令放入不限长度的控制队列，不会被丢弃，
+    并且先于排队的触发执行
+    """
+    WAKE = object()  # 控制命令入队后唤醒线程，本身不执行
+
+    def __init__(self, maxsize=256):
+        super().__init__(name="AudioEngine", daemon=True)
+        self.commands = queue.Queue(maxsize)
+        self.control = queue.SimpleQueue()
+        # 设置快照，只使用普通 Python 属性，不读取 Qt 控件
+        self.hold_mode = False
+        self.tracks: tuple[AudioTrack, ...] = ()
+        # 指标
+        self.processed = 0
+        self.dropped = 0
+        self.max_queue_depth = 0
+        self.last_latency = 0.0
+        self.max_latency = 0.0
+        self.total_latency = 0.0
+
+    def submit(self, func, *args):
+        """放入一条命令，队列已满时丢弃并返回 False"""
+        try:
+            self.commands.put_nowait((func, args, time.perf_counter()))
+        except queue.Full:
+            self.dropped += 1
+            return False
+        depth = self.commands.qsize()
+        if depth > self.max_queue_depth:
+            self.max_queue_depth = depth
+        return True
+
+    def submit_control(self, func, *args):
+        """放入一条不能丢弃的生命周期命令，不阻塞调用线程"""
+        self.control.put((func, args, time.perf_counter()))
+        try:
+            self.commands.put_nowait(self.WAKE)
+        except queue.Full:
+            pass  # 队列满时线程正忙，执行下一条命令前会先处理控制队列
+
+    def trigger(self, track: AudioTrack, is_key_down: bool, trace=None):
+        """快捷键触发音轨，trace 为诊断记录"""
+        submitted = self.submit(self._trigger, track, is_key_down, trace)
+        if trace is not None:
+            instruments.mark(trace, TRIGGER)
+        return submitted
+
+    def toggle(self, track: AudioTrack, action):
+        """界面操作音轨，action 为 track 的方法"""
+        return self.submit(self._toggle, track, action)
+
+    def stop_all(self):
+        """停止所有音轨"""
+        self.submit_control(self._stop_all)
+        return True
+
+    def run(self):
+        while True:
+            command = self.commands.get()
+            self._run_control()
+            if command is None:
+                break
+            if command is not self.WAKE:
+                self._execute(command)
+
+    def drain(self):
+        """在调用线程中执行队列中的所有命令，用于不启动线程的离线渲染"""
+        while True:
+            self._run_control()
+            try:
+                command = self.commands.get_nowait()
+            except queue.Empty:
+                return
+            if command is not None and command is not self.WAKE:
+                self._execute(command)
+
+    def _run_control(self):
+        while True:
+            try:
+                command = self.control.get_nowait()
+            except queue.Empty:
+                return
+            self._execute(command)
+
+    def _execute(self, command):
+        func, args, enqueue_time = command
+        try:
+            func(*args)
+        except Exception as e:
+            print(f"音频命令执行失败: {e}")
+        latency = time.perf_counter() - enqueue_time
+        self.processed += 1
+        self.last_latency = latency
+        self.total_latency += latency
+        if latency > self.max_latency:
+            self.max_latency = latency
+
+    def close(self, timeout=1.0):
+        """结束线程"""
+        if not self.is_alive():
+            return
+        try:
+            self.commands.put(None, timeout=timeout)
+        except queue.Full:
+            return
+        self.join(timeout)
+
+    def metrics(self):
+        """队列深度和入队到播放的延迟(ms)"""
+        return {
+            "queue_depth": self.commands.qsize(),
+            "max_queue_depth": self.max_queue_depth,
+            "processed": self.processed,
+            "dropped": self.dropped,
+            "latency_last_ms": self.last_latency * 1000,
+            "latency_avg_ms": self.total_latency / self.processed * 1000 if self.processed else 0.0,
+            "latency_max_ms": self.max_latency * 1000,
+        }
+
+    def _trigger(self, track: AudioTrack, is_key_down: bool, trace=None):
+        # 仅在按下按钮，或者松开按钮且按住模式时有效
+        # 也就是
+        # 切换触发： 按下 True 松开 按下 True 松开 按下 True ...
+        # 按住触发: 按下 True 松开 False 按下 True ...
+
+        # 如果设置了停止其他，先停止其他音轨
+        # 在音乐播放的开始和结束都会尝试停止
+        if trace is not None:
+            instruments.mark(trace, TOGGLE_PLAY)
+            instruments.set_current(trace)
+        try:
+            if not track.is_active() and track.mute_others:
+                self._stop_others(track)
+            track.toggle_play(self.hold_mode, is_key_down)
+        finally:
+            if trace is not None:
+                instruments.set_current(None)
+
+    def _toggle(self, track: AudioTrack, action):
+        if not track.is_active() and track.mute_others:
+            self._stop_others(track)
+        action()
+
+    def _stop_all(self):
+        # '停止所有'立即停止，不淡出
+        # 只处理有播放的音轨，track.stop() 用来重置状态
+        gain_scheduler.stop_all()
+        for track in voice_manager.stop_all():
+            track.stop()
+
+    def _stop_others(self, current_track: AudioTrack):
+        # 按各自的淡出时间停止，与当前音轨的淡入形成交叉淡化
+        for track in voice_manager.active_tracks(except_track=current_track):
+            track.stop()
@@ -8,34 +8,148 @@ import pygame
 from pathlib import Path
 from pygame.mixer import Channel
 
+from .analysis import normalize_gain_db
+from .fades import gain_scheduler, db_to_gain
+from .instruments import instruments, PLAY
+from .pcm_cache import pcm_cache
+from .sound_pool import sound_pool
+from .stream import StreamSource
+from .voices import voice_manager
+
 class AudioTrack:
+    normalize_target = None  # 响度标准化的目标 (LUFS)，None 为不标准化
+
     def __init__(self):
         self.sound = None
         self.channels: list[Channel] = []
-        self.volume = 0
+        self.gain_db = 0     # 用户设置的音量 (dB)
+        self.volume = 1.0    # 实际的线性音量，包含标准化增益
+        self.analysis = None # 响度等分析结果，后台得到
+        self.trim_silence = False # 按检测到的静音裁剪开头和结尾
+        self.trim_start = None    # 手动设置的起点(秒)，None 时使用检测结果
+        self.trim_end = None      # 手动设置的终点(秒)
+        self.trimmed = None       # (播放段, 按播放段切好的声音)，不裁剪或尚未切好时为 None
+        self.trim_key = None      # 当前播放段在声音池中的 (声音, 帧范围)
         self.is_playing = False
         self.is_paused = False
         self.loop = False
+        self.mute_others = False
+        self.stream = False  # 强制流式播放
+        self.priority = 0    # 通道不够时优先级低的先被抢占
+        self.max_voices = 0  # 同时播放数上限，0 为不限
+        self.fade_in = 0.0   # 淡入秒数
+        self.fade_out = 0.0  # 淡出秒数，停止时淡出，'停止其它'时形成交叉淡化
+        self.duck_others = 0 # 播放期间把其它音轨压低的 dB，0 为不闪避
         self.mode = STOP
         self.path = ""
+        self.monitor = None  # PlaybackMonitor，开始播放时通知
+        self.load_id = 0     # 后台加载的请求号，旧请求的结果会被丢弃
+        self.load_time = 0.0
 
     def load_file(self, file_path:str):
         """加载音频文件"""
+        sound = self.decode_file(file_path, self.stream)
+        self.set_sound(sound, file_path)
+        return sound is not None
+
+    @staticmethod
+    def decode_file(file_path:str, stream=False):
+        """解码音频文件，失败返回 None，可在工作线程调用
+
+        stream 为真或文件较大时返回按块解码的 StreamSource
+        """
         if not file_path or not Path(file_path).exists():
-            self.sound = None
-            self.path = ""
-            return False
+            return None
+        if ((stream or StreamSource.should_stream(file_path))
+                and StreamSource.supports(file_path)):
+            try:
+                return StreamSource(file_path)
+            except Exception as e:
+                print(f"无法流式播放，改为完整解码: {e}")
+        # 同一文件在所有音轨间共享
+        return sound_pool.acquire(file_path, AudioTrack._decode_sound)
 
+    @staticmethod
+    def _decode_sound(file_path:str):
+        # 优先使用解码后的缓存
+        sound = pcm_cache.load(file_path)
+        if sound is not None:
+            return sound
         try:
-            self.sound = pygame.mixer.Sound(file_path)
-            self.path = file_path
-            self.set_volume(self.volume*100)
-            return True
+            sound = pygame.mixer.Sound(file_path)
         except Exception as e:
             print(f"加载音频文件失败: {e}")
-            self.sound = None
-            self.path = ""
-            return False
+            return None
+        pcm_cache.store(file_path, sound)
+        return sound
+
+    def set_sound(self, sound, file_path:str, load_time=0.0):
+        """设置解码好的声音，释放之前共享的声音"""
+        if self.sound is not None:
+            sound_pool.release(self.sound)
+        self.sound = sound
+        self.path = file_path if sound else ""
+        self.load_time = load_time
+        self.set_analysis(None)
+
+    def set_analysis(self, analysis):
+        """设置分析结果，更新标准化音量和裁剪"""
+        self.analysis = analysis
+        self.update_volume()
+        self.update_trim()
+
+    def trim_span(self):
+        """实际播放的 (起点秒, 终点秒)，没有声音时返回 None"""
+        if self.sound is None:
+            return None
+        length = self.sound.get_length()
+        detected = self.analysis.get("silence") if self.analysis and self.trim_silence else None
+        start = self.trim_start if self.trim_start is not None else (detected["start"] if detected else 0.0)
+        end = self.trim_end if self.trim_end is not None else (detected["end"] if detected else length)
+        start = max(0.0, min(start, length))
+        return start, max(start, min(end, length))
+
+    def play_span(self):
+        """需要裁剪时返回播放段，播放整个声音时返回 None"""
+        span = self.trim_span()
+        if (span is None or (span[0] < 0.001 and span[1] > self.sound.get_length() - 0.001)
+                or span[1] - span[0] < 0.01):
+            return None
+        return span
+
+    def update_trim(self, wait=False):
+        """按播放段取得切好的声音，只在声音或裁剪点变化时请求，触发时不再复制
+
+        同一声音和播放段在声音池中只切一次，由切分线程完成；
+        切好之前按原来的播放段（换了声音时为完整声音）播放。wait 为真时在当前线程等待完成
+        """
+        span = self.play_span()
+        key = None
+        # 流式播放不切分，播放时按播放段读取
+        if span is not None and not isinstance(self.sound, StreamSource):
+            rate = pygame.mixer.get_init()[0]
+            key = (self.sound, (int(span[0] * rate), int(span[1] * rate)))
+        if key == self.trim_key:
+            return
+        old, self.trim_key = self.trim_key, key
+        if key is None or old is None or old[0] is not self.sound:
+            self.trimmed = None
+        if old is not None:
+            sound_pool.release_trim(*old)
+        if key is None:
+            return
+
+        def done(trimmed):
+            # 播放线程只读取 trimmed 这一个属性，播放段和声音总是一致
+            if self.trim_key == key and trimmed is not None:
+                self.trimmed = (span, trimmed)
+
+        sound_pool.acquire_trim(*key, done, wait)
+
+    def unload(self):
+        """停止并释放声音"""
+        self.stop()
+        self.set_sound(None, "")
 
     def toggle_play(self, is_hold_mode: bool, is_key_down: bool):
         """按状态播放音频"""
@@ -107,15 +221,42 @@ class AudioTrack:
                 self.pause()
 
     def play(self):
-        channel = self.sound.play(loops=-1 if self.loop else 0)
+        loops = -1 if self.loop else 0
+        trimmed = self.trimmed
+        if trimmed:
+            # 从切好的声音播放，循环也只在播放段内
+            span, sound = trimmed
+            channel = voice_manager.play(self, self.sound, loops, span[0], output_sound=sound, span=span)
+        elif isinstance(self.sound, StreamSource):
+            # 按块读取播放段，循环也回到段的起点
+            span = self.play_span()
+            channel = voice_manager.play(self, self.sound, loops, span[0] if span else 0.0, span=span)
+        else:
+            channel = voice_manager.play(self, self.sound, loops)
+        if channel is None:
+            return
+        if instruments.enabled:
+            instruments.mark(instruments.current(), PLAY)
+        # 声音可能被多个音轨共享，音量设置在通道上
+        if self.fade_in > 0:
+            gain_scheduler.fade_in(channel, self.fade_in)
+        else:
+            channel.set_volume(self.volume)
+            gain_scheduler.track_voice(channel)
+        # 先记录通道再登记闪避，调度线程检查闪避音轨的通道时总能看到这次播放
         self.channels.append(channel)
+        if self.duck_others < 0:
+            gain_scheduler.duck_others(self, db_to_gain(self.duck_others), voice_manager.active_voices())
         self.is_playing = True
         self.is_paused = False
+        self.notify_monitor()
 
     def stop(self):
         """停止播放"""
-        if self.sound:
-            self.sound.stop()
+        # 只停止自己的通道，不影响共享同一声音的其它音轨
+        for channel in self.channels:
+            if channel.get_sound() is self.sound:
+                gain_scheduler.fade_out(channel, self.fade_out)
         self.channels.clear()
         self.is_playing = False
         self.is_paused = False
@@ -132,13 +273,34 @@ class AudioTrack:
             channel.unpause()
         self.is_paused = False
         self.is_playing = True
+        self.notify_monitor()
+
+    def notify_monitor(self):
+        """通知监视器开始关注本音轨"""
+        if self.monitor:
+            self.monitor.watch(self)
 
     def set_volume(self, db):
         """设置音量 (db)"""
-        self.volume = max(-60, min(0, db))  # 限制在 -60dB 到 0dB 之间
-        self.volume = pow(10, self.volume / 20.0)
-        if self.sound:
-            self.sound.set_volume(self.volume)
+        self.gain_db = max(-60, min(0, db))  # 限制在 -60dB 到 0dB 之间
+        self.update_volume()
+
+    def update_volume(self):
+        """用户音量加上标准化增益，标准化可以提升音量，但不超过 1.0"""
+        db = self.gain_db
+        if AudioTrack.normalize_target is not None and self.analysis:
+            db += normalize_gain_db(self.analysis.get("loudness"), AudioTrack.normalize_target)
+        self.volume = min(1.0, pow(10, db / 20.0))
+        for channel in self.channels:
+            channel.set_volume(self.volume)
+
+    def playhead(self):
+        """最近一次播放的位置 (0~1)，没有播放时返回 None"""
+        for channel in reversed(list(self.channels)):
+            if channel.get_busy():
+                length = channel.get_sound().get_length()
+                return channel.position() / length if length else None
+        return None
 
     def is_active(self):
         """检查是否正在播放"""
@@ -0,0 +1,81 @@
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import yaml
+
+# 有 libyaml 时使用 C 实现
+try:
+    from yaml import CSafeLoader as SafeLoader, CSafeDumper as SafeDumper
+except ImportError:
+    from yaml import SafeLoader, SafeDumper
+
+YAML = "yaml"
+JSON = "json"
+BOARD_FILES = {YAML: "audios.yaml", JSON: "audios.json"}
+
+
+def user_cache_dir() -> Path:
+    """缓存的根目录，不随启动时的工作目录变化，可用环境变量 MUSICPAD_CACHE_DIR 指定"""
+    override = os.environ.get("MUSICPAD_CACHE_DIR")
+    if override:
+        return Path(override)
+    if sys.platform == "win32":
+        base = os.environ.get("LOCALAPPDATA") or Path.home() / "AppData" / "Local"
+    elif sys.platform == "darwin":
+        base = Path.home() / "Library" / "Caches"
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "musicpad"
+
+
+def find_board(directory="."):
+    """返回最近保存的配置文件路径，没有时返回 None"""
+    paths = [Path(directory) / name for name in BOARD_FILES.values()]
+    paths = [p for p in paths if p.exists()]
+    if not paths:
+        return None
+    return max(paths, key=lambda p: p.stat().st_mtime)
+
+
+def board_format(path):
+    return JSON if Path(path).suffix.lower() == ".json" else YAML
+
+
+def load_board(path):
+    """读取配置文件，返回 (数据, 耗时秒)"""
+    start = time.perf_counter()
+    with open(path, "r", encoding="utf-8") as f:
+        if board_format(path) == JSON:
+            data = json.load(f)
+        else:
+            data = yaml.load(f, Loader=SafeLoader)
+    return data or {}, time.perf_counter() - start
+
+
+def dump_board(data, fmt=YAML) -> str:
+    """序列化配置"""
+    if fmt == JSON:
+        return json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+    return yaml.dump(data, Dumper=SafeDumper, allow_unicode=True)
+
+
+def write_atomic(path, text):
+    """先写同目录的临时文件再改名，写到一半崩溃也不会损坏原文件"""
+    path = Path(path)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=path.name, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
@@ -0,0 +1,152 @@
+from PyQt6.QtWidgets import (QDockWidget, QWidget, QVBoxLayout, QHBoxLayout, QCheckBox, QPushButton,
+                             QLabel, QTableWidget, QTableWidgetItem, QHeaderView, QFileDialog)
+from PyQt6.QtCore import QTimer
+
+from .instruments import instruments, STAGES
+from .sound_pool import sound_pool
+from .voices import voice_manager
+
+STAGE_NAMES = {
+    "hook": "键盘事件 -> 钩子回调",
+    "match": "匹配快捷键",
+    "trigger": "放入音频队列",
+    "toggle_play": "开始 toggle_play",
+    "play": "通道 play 返回",
+}
+COLUMNS = ["次数", "p50 (ms)", "p95 (ms)", "p99 (ms)", "最大 (ms)"]
+
+
+class DiagnosticsPanel(QDockWidget):
+    """触发延迟的分位数、通道使用、已加载的 PCM 和定时器回调次数
+
+    只在面板可见时刷新，关闭记录后各处的检查几乎没有开销
+    """
+    def __init__(self, engine, parent=None):
+        super().__init__("诊断", parent)
+        self.engine = engine
+        self.remote = None  # RemoteServer，由播放器设置
+        self.setObjectName("diagnostics")
+        self.init_ui()
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.setInterval(500)
+        self.refresh_timer.timeout.connect(self.refresh)
+        self.setup_connections()
+
+    def init_ui(self):
+        widget = QWidget()
+        layout = QVBoxLayout(widget)
+
+        controls = QHBoxLayout()
+        self.enable_check = QCheckBox("记录触发延迟")
+        self.enable_check.setToolTip("从键盘钩子到通道开始播放，各阶段相对钩子回调的耗时")
+        self.clear_btn = QPushButton("清空")
+        self.csv_btn = QPushButton("导出 CSV")
+        self.json_btn = QPushButton("导出 JSON")
+        controls.addWidget(self.enable_check)
+        controls.addStretch()
+        controls.addWidget(self.clear_btn)
+        controls.addWidget(self.csv_btn)
+        controls.addWidget(self.json_btn)
+        layout.addLayout(controls)
+
+        self.table = QTableWidget(len(STAGES), len(COLUMNS))
+        self.table.setHorizontalHeaderLabels(COLUMNS)
+        self.table.setVerticalHeaderLabels([STAGE_NAMES[stage] for stage in STAGES])
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        self.table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        layout.addWidget(self.table)
+
+        self.mixer_label = QLabel()
+        self.memory_label = QLabel()
+        self.engine_label = QLabel()
+        self.remote_label = QLabel()
+        self.counters_label = QLabel()
+        self.counters_label.setWordWrap(True)
+        for label in (self.mixer_label, self.memory_label, self.engine_label, self.remote_label,
+                      self.counters_label):
+            layout.addWidget(label)
+        self.setWidget(widget)
+
+    def setup_connections(self):
+        self.enable_check.toggled.connect(self.on_enable_changed)
+        self.clear_btn.clicked.connect(self.on_clear)
+        self.csv_btn.clicked.connect(self.export_csv)
+        self.json_btn.clicked.connect(self.export_json)
+        self.visibilityChanged.connect(self.on_visibility_changed)
+
+    def on_enable_changed(self, checked):
+        instruments.enabled = checked
+
+    def on_clear(self):
+        instruments.reset()
+        self.refresh()
+
+    def on_visibility_changed(self, visible):
+        if visible:
+            self.refresh()
+            self.refresh_timer.start()
+        else:
+            self.refresh_timer.stop()
+
+    def status(self):
+        """与延迟一起导出的状态"""
+        status = {
+            "mixer": voice_manager.stats(),
+            "sound_pool": sound_pool.stats(),
+            "engine": self.engine.metrics(),
+        }
+        if self.remote is not None:
+            status["remote"] = self.remote.stats()
+        return status
+
+    def refresh(self):
+        summary = instruments.summary()
+        for row, (stage, s) in enumerate(summary["stages"].items()):
+            values = [str(s["count"])] + ["-" if s[key] is None else f"{s[key]:.2f}"
+                                          for key in ("p50", "p95", "p99", "max")]
+            for column, text in enumerate(values):
+                item = self.table.item(row, column)
+                if item is None:
+                    self.table.setItem(row, column, QTableWidgetItem(text))
+                elif item.text() != text:
+                    item.setText(text)
+
+        status = self.status()
+        mixer = status["mixer"]
+        self.mixer_label.setText(
+            f"通道 {mixer['active']} / {mixer['num_channels']}（上限 {mixer['max_channels']}），"
+            f"抢占 {mixer['stolen']}，丢弃 {mixer['dropped']}")
+        pool = status["sound_pool"]
+        self.memory_label.setText(
+            f"已加载 PCM {pool['bytes_loaded'] / 1024 / 1024:.1f} MB（{pool['entries']} 个文件），"
+            f"共享节省 {pool['bytes_saved'] / 1024 / 1024:.1f} MB")
+        engine = status["engine"]
+        self.engine_label.setText(
+            f"命令队列 {engine['queue_depth']}（最大 {engine['max_queue_depth']}），"
+            f"入队到执行 平均 {engine['latency_avg_ms']:.2f} ms / 最大 {engine['latency_max_ms']:.2f} ms")
+        remote = status.get("remote")
+        self.remote_label.setVisible(bool(remote and remote["running"]))
+        if remote and remote["running"]:
+            handle = remote["handle_ms"]
+            self.remote_label.setText(
+                f"远程控制 收到 {remote['received']}，无效 {remote['errors']}，WebSocket 客户端 {remote['clients']}，"
+                f"处理 p99 {handle['p99'] or 0:.3f} ms")
+        counters = summary["counters"]
+        self.counters_label.setText("定时器回调：" + ("，".join(f"{name} {count}" for name, count
+                                                         in sorted(counters.items())) or "无"))
+
+    def export_csv(self):
+        path, _ = QFileDialog.getSaveFileName(self, "导出 CSV", "latency.csv", "CSV (*.csv)")
+        if path:
+            try:
+                instruments.write_csv(path)
+            except OSError as e:
+                print(f"导出失败: {e}")
+
+    def export_json(self):
+        path, _ = QFileDialog.getSaveFileName(self, "导出 JSON", "latency.json", "JSON (*.json)")
+        if path:
+            try:
+                instruments.write_json(path, self.status())
+            except OSError as e:
+                print(f"导出失败: {e}")
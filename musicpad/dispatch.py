@@ -0,0 +1,89 @@
+from .instruments import instruments, MATCH
+
+STOP_ALL = object()  # 快捷键索引中代表'停止所有'的目标
+
+
+def parse_shortcut(shortcut: str) -> frozenset:
+    """将 "ctrl+A" 形式的快捷键解析为按键集合"""
+    if not shortcut:
+        return frozenset()
+    return frozenset(k for k in shortcut.split("+") if k)
+
+
+def normalize_key(name: str) -> str:
+    """将 keyboard 的键名标准化：单个字符转为大写，空格换成下划线"""
+    if len(name) == 1:
+        return name.replace(" ", "_").upper()
+    return name.replace(" ", "_")
+
+
+class ShortcutIndex:
+    """按键 -> 包含该键的组合键 的索引
+
+    只在快捷键变化或音轨增删时重建，按键事件只需查找包含该键的组合键
+    """
+    def __init__(self):
+        self._index: dict[str, tuple] = {}
+
+    def rebuild(self, bindings):
+        """bindings: 可迭代的 (快捷键字符串, 目标)，顺序即匹配顺序"""
+        index: dict[str, list] = {}
+        for shortcut, target in bindings:
+            keys = parse_shortcut(shortcut)
+            if not keys:
+                continue
+            chord = (keys, target)
+            for key in keys:
+                index.setdefault(key, []).append(chord)
+        # 整体替换，钩子线程读取时不会看到一半的索引
+        self._index = {key: tuple(chords) for key, chords in index.items()}
+
+    def lookup(self, key: str) -> tuple:
+        """返回包含 key 的所有 (按键集合, 目标)"""
+        return self._index.get(key, ())
+
+
+class KeyDispatcher:
+    """按键事件 -> 音频命令，不依赖 Qt 和键盘钩子
+
+    界面的全局钩子和无界面渲染共用，保证两者的触发逻辑一致
+    """
+    def __init__(self, engine):
+        self.engine = engine
+        self.hold_keys = set()  # 存储当前按住的键
+        self.shortcut_index = ShortcutIndex()
+
+    def key_event(self, name: str, is_key_down: bool, trace=None):
+        """处理一次按下或松开，name 为 keyboard 的键名，trace 为诊断记录"""
+        key = normalize_key(name)
+        if is_key_down:
+            # 如果不是新按下的，skip
+            if key in self.hold_keys:
+                return
+            self.hold_keys.add(key)
+        else:
+            self.hold_keys.discard(key)
+
+        # 仅新按下的按钮
+        # 和松开按钮
+
+        # 获取当前的触发模式
+        is_hold_mode = self.engine.hold_mode
+        # 只检查包含该键的组合键
+        for keys, target in self.shortcut_index.lookup(key):
+            # 检查是否是停止所有的快捷键
+            if target is STOP_ALL:
+                # 检查是否所有需要的键都被按下
+                if is_key_down and keys <= self.hold_keys:
+                    self.engine.stop_all()
+            # 按下时所有键满足
+            elif is_key_down and keys <= self.hold_keys:
+                if trace is not None:
+                    instruments.mark(trace, MATCH)
+                self.engine.trigger(target, True, trace)
+            # 松开按键仅在按住模式下有效
+            # 此时松开任意范围的按钮都失效
+            elif not is_key_down and is_hold_mode:
+                if trace is not None:
+                    instruments.mark(trace, MATCH)
+                self.engine.trigger(target, False, trace)
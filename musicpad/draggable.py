@@ -1,6 +1,7 @@
 from PyQt6.QtWidgets import QVBoxLayout, QWidget
-from PyQt6.QtCore import Qt, QPoint
+from PyQt6.QtCore import Qt, QPoint, pyqtSignal
 from functools import wraps
+from bisect import bisect_left
 
 
 def mountFunc(obj, funcname, func):
@@ -16,22 +17,25 @@ def mountFunc(obj, funcname, func):
     setattr(obj, funcname, new_func)
 
 class DraggableVBoxLayout(QVBoxLayout):
+    widget_moved = pyqtSignal()  # 拖拽改变顺序信号
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self.dragging_widget = None
         self.drag_start_index = -1
-        self.fixed_widgets = []
+        self.drag_index = -1        # 拖拽中的widget当前所在的位置
+        self.fixed_widgets = set()
+        self._heights = []          # 拖拽开始时缓存的每行高度
+        self._bottoms = []          # 每行的下边界，按位置递增，用于二分查找
+        self._top = 0
 
     def setFixed(self, widget):
         '''设置固定的widget'''
-        if widget in self.fixed_widgets:
-            return
-        self.fixed_widgets.append(widget)
+        self.fixed_widgets.add(widget)
 
     def setDraggable(self, widget):
         '''设置可拖拽的widget'''
-        if widget in self.fixed_widgets:
-            self.fixed_widgets.remove(widget)
+        self.fixed_widgets.discard(widget)
         self._initWidget(widget)
 
     def _initWidget(self, widget:QWidget):
@@ -44,7 +48,8 @@ class DraggableVBoxLayout(QVBoxLayout):
         """处理鼠标按下事件"""
         if event.button() == Qt.MouseButton.LeftButton:
             self.dragging_widget = widget
-            self.drag_start_index = self.indexOf(widget)
+            self.drag_start_index = self.drag_index = self.indexOf(widget)
+            self._cache_bounds()
 
     def _handle_mouse_move(self, event, widget):
         if not (event.buttons() & Qt.MouseButton.LeftButton):
@@ -52,25 +57,46 @@ class DraggableVBoxLayout(QVBoxLayout):
         if widget != self.dragging_widget:
             return
 
-        # 获取鼠标当前位置对应的目标widget
-        target_pos = widget.mapTo(widget.parent(), event.pos())
-        target_widget = self._get_widget_at_position(target_pos)
-
-        if target_widget and target_widget != widget:
-            # 获取目标位置索引
-            target_index = self.indexOf(target_widget)
-            # 移动widget
-            self.removeWidget(widget)
-            self.insertWidget(target_index, widget)
-
-
-    def _get_widget_at_position(self, pos: QPoint):
-        """获取指定位置的widget"""
-        for i in range(self.count()):
-            widget = self.itemAt(i).widget()
-            if widget and widget not in self.fixed_widgets and widget.geometry().contains(pos):
-                return widget
-        return None
+        # 获取鼠标当前位置对应的目标位置
+        # 用全局坐标换算，移动后布局还没刷新时widget自身的坐标是旧的
+        target_pos = widget.parentWidget().mapFromGlobal(event.globalPosition().toPoint())
+        target_index = self._index_at_position(target_pos)
+
+        # 只有目标位置变化时才移动
+        if target_index < 0 or target_index == self.drag_index:
+            return
+        self.removeWidget(widget)
+        self.insertWidget(target_index, widget)
+        self._heights.insert(target_index, self._heights.pop(self.drag_index))
+        self._update_bottoms()
+        self.drag_index = target_index
+        self.widget_moved.emit()
+
+    def _cache_bounds(self):
+        """缓存每行的高度和下边界，拖拽期间按移动更新而不重新读取几何"""
+        self._heights = [self.itemAt(i).geometry().height() for i in range(self.count())]
+        self._top = self.itemAt(0).geometry().top() if self.count() else 0
+        self._update_bottoms()
+
+    def _update_bottoms(self):
+        bottoms = []
+        y = self._top
+        spacing = max(self.spacing(), 0)
+        for height in self._heights:
+            y += height
+            bottoms.append(y)
+            y += spacing
+        self._bottoms = bottoms
+
+    def _index_at_position(self, pos: QPoint):
+        """二分查找指定位置所在的行，落在间隙、固定widget或范围外时返回 -1"""
+        i = bisect_left(self._bottoms, pos.y())
+        if i >= len(self._bottoms) or pos.y() < self._bottoms[i] - self._heights[i]:
+            return -1
+        widget = self.itemAt(i).widget()
+        if widget is None or widget in self.fixed_widgets:
+            return -1
+        return i
 
 if __name__ == '__main__':
     import sys
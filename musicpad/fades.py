@@ -0,0 +1,171 @@
+import threading
+import time
+
+import numpy as np
+
+from .instruments import instruments
+
+BLOCK = 0.01          # 包络更新间隔(秒)
+DUCK_ATTACK = 0.1     # 闪避时压低音量所用的时间(秒)
+DUCK_RELEASE = 0.4    # 闪避结束后恢复音量所用的时间(秒)
+
+
+def db_to_gain(db):
+    return pow(10, db / 20.0)
+
+
+class GainScheduler(threading.Thread):
+    """所有播放的音量包络：淡入、淡出、交叉淡化和闪避其它音轨
+
+    只有一个线程，每块用 numpy 一次算出所有包络的增益，
+    只对输出变化的通道调用 set_volume；包络走完且没有闪避时移出，
+    没有包络时线程休眠
+    """
+    def __init__(self):
+        super().__init__(name="GainScheduler", daemon=True)
+        self.lock = threading.Lock()
+        self.wake = threading.Event()
+        self.started = False
+        self.manual = False  # 由调用者推进 tick（离线渲染），不启动线程
+        self.voices = []                       # 有包络的播放 (Voice)
+        self.gain = np.zeros(0)                # 淡入淡出的当前增益
+        self.target = np.zeros(0)              # 淡入淡出的目标增益
+        self.rate = np.zeros(0)                # 每秒的增益变化量
+        self.stop_at_end = np.zeros(0, bool)   # 淡出到 0 后停止
+        self.duck = np.zeros(0)                # 闪避的当前增益
+        self.output = np.zeros(0)              # 上次设置到通道的音量
+        self.duckers = {}                      # 闪避其它播放的音轨 -> 线性增益
+
+    def _start(self):
+        if not self.started and not self.manual:
+            self.started = True
+            self.start()
+        self.wake.set()
+
+    def _row(self, voice):
+        """返回播放所在的行，不存在时追加一行（增益为 1，不变化）"""
+        for i, v in enumerate(self.voices):
+            if v is voice:
+                return i
+        self.voices.append(voice)
+        self.gain = np.append(self.gain, 1.0)
+        self.target = np.append(self.target, 1.0)
+        self.rate = np.append(self.rate, 0.0)
+        self.stop_at_end = np.append(self.stop_at_end, False)
+        self.duck = np.append(self.duck, 1.0)
+        self.output = np.append(self.output, -1.0)
+        return len(self.voices) - 1
+
+    def ramp(self, voice, end, seconds, start=None, stop=False):
+        """把播放的增益在 seconds 秒内线性变化到 end，start 为空时从当前增益开始"""
+        with self.lock:
+            i = self._row(voice)
+            if start is not None:
+                self.gain[i] = start
+            self.target[i] = end
+            self.rate[i] = abs(end - self.gain[i]) / seconds if seconds > 0 else np.inf
+            self.stop_at_end[i] = stop
+        self._start()
+
+    def fade_in(self, voice, seconds):
+        voice.set_volume(0.0)
+        self.ramp(voice, 1.0, seconds, start=0.0)
+
+    def fade_out(self, voice, seconds):
+        """淡出后停止，seconds 为 0 时立即停止"""
+        if seconds <= 0 or not voice.alive():
+            voice.stop()
+            return
+        self.ramp(voice, 0.0, seconds, stop=True)
+
+    def track_voice(self, voice):
+        """新的播放，有闪避时需要跟着压低"""
+        if self.duckers and voice.track not in self.duckers:
+            with self.lock:
+                self._row(voice)
+            self._start()
+
+    def duck_others(self, track, gain, voices):
+        """track 播放期间把其它播放压低到 gain，voices 为当前所有播放"""
+        with self.lock:
+            self.duckers[track] = gain
+            for voice in voices:
+                if voice.track is not track:
+                    self._row(voice)
+        self._start()
+
+    def stop_all(self):
+        """丢弃所有包络（'停止所有'时）"""
+        with self.lock:
+            self.duckers.clear()
+            self._keep(np.zeros(len(self.voices), bool))
+
+    def _keep(self, mask):
+        self.voices = [v for v, keep in zip(self.voices, mask) if keep]
+        self.gain = self.gain[mask]
+        self.target = self.target[mask]
+        self.rate = self.rate[mask]
+        self.stop_at_end = self.stop_at_end[mask]
+        self.duck = self.duck[mask]
+        self.output = self.output[mask]
+
+    def tick(self, dt):
+        """推进 dt 秒，返回是否还有包络"""
+        with self.lock:
+            # 闪避中的音轨停止后开始恢复
+            for track in [t for t in self.duckers if not any(ch.get_busy() for ch in t.channels)]:
+                del self.duckers[track]
+            level = min(self.duckers.values(), default=1.0)
+            alive = np.fromiter((v.alive() for v in self.voices), bool, len(self.voices))
+            self._keep(alive)
+            if not self.voices:
+                return bool(self.duckers)
+
+            # 淡入淡出
+            step = self.rate * dt
+            self.gain += np.clip(self.target - self.gain, -step, step)
+            # 闪避，闪避者自己不受影响
+            is_ducker = np.fromiter((v.track in self.duckers for v in self.voices), bool, len(self.voices))
+            duck_target = np.where(is_ducker, 1.0, level)
+            delta = duck_target - self.duck
+            duck_step = np.where(delta < 0, dt / DUCK_ATTACK, dt / DUCK_RELEASE)
+            self.duck += np.clip(delta, -duck_step, duck_step)
+
+            volumes = np.fromiter((v.track.volume for v in self.voices), float, len(self.voices))
+            output = self.gain * self.duck * volumes
+            changed = np.abs(output - self.output) > 1e-4
+            finished = self.stop_at_end & (self.gain <= 0)
+            for i in np.flatnonzero(changed & ~finished):
+                self.voices[i].set_volume(output[i])
+            for i in np.flatnonzero(finished):
+                self.voices[i].stop()
+            self.output = output
+
+            # 包络走完且不在闪避中的播放不再更新
+            settled = (self.gain == self.target) & (self.duck == duck_target) & (duck_target == 1.0)
+            self._keep(~(finished | settled))
+            return bool(self.voices) or bool(self.duckers)
+
+    def run(self):
+        last = time.perf_counter()
+        while True:
+            self.wake.wait()
+            now = time.perf_counter()
+            # 休眠后第一块不补算休眠的时间
+            dt = min(now - last, BLOCK * 5)
+            last = now
+            if instruments.enabled:
+                instruments.count("gain_scheduler.tick")
+            try:
+                busy = self.tick(dt)
+            except Exception as e:
+                print(f"音量包络更新失败: {e}")
+                busy = True
+            if not busy:
+                with self.lock:
+                    if not self.voices and not self.duckers:
+                        self.wake.clear()
+            time.sleep(BLOCK)
+
+
+gain_scheduler = GainScheduler()
@@ -1,10 +1,17 @@
 import keyboard, pygame
 from PyQt6.QtWidgets import (QComboBox, QWidget, QVBoxLayout, QHBoxLayout, QApplication, QLabel, QRadioButton, QPushButton,QSlider,
-                           QButtonGroup, QFrame)
+                           QButtonGroup, QFrame, QSpinBox, QCheckBox)
 from PyQt6.QtCore import Qt, pyqtSignal
 from PyQt6.QtMultimedia import QMediaDevices
 
 from musicpad.shortcut import ShortcutCatcher
+from musicpad.pcm_cache import pcm_cache, DEFAULT_LIMIT_MB
+from musicpad.stream import StreamSource
+from musicpad.voices import voice_manager, STEAL_POLICIES
+from musicpad.mixer import mixer_profile
+from musicpad.board import YAML
+from musicpad.audio_track import AudioTrack
+from musicpad.remote import UDP_PORT, WS_PORT
 
 OVERLAP = "重叠模式"
 SINGLE = "单点模式"
@@ -14,8 +21,19 @@ STOP = "终止模式"
 
 class GlobalSettings(QWidget):
     stop_all_tracks_sign = pyqtSignal()  # '停止所有'信号
+    device_changed_sign = pyqtSignal(str)  # 切换音频设备信号
+    settings_changed = pyqtSignal()  # 需要保存的设置变化信号
+    normalize_changed_sign = pyqtSignal()  # 响度标准化设置变化信号
+    remote_changed_sign = pyqtSignal()  # 远程控制开关变化信号
     def __init__(self, parent=None):
         super().__init__(parent)
+        self.pcm_cache_mb = DEFAULT_LIMIT_MB  # 解码缓存上限，0 为禁用
+        self.board_format = YAML  # 配置文件格式，音轨很多时可用更快的 json
+        self.virtual_list = False  # 使用虚拟列表显示音轨，音轨很多时自动启用
+        self.stream_threshold_mb = StreamSource.threshold_bytes // (1024 * 1024)  # 超过该大小自动流式播放，0 为禁用
+        self.remote_udp_port = UDP_PORT  # 远程控制端口，0 为不启用该协议
+        self.remote_ws_port = WS_PORT
+        self.remote_origins = []  # 允许连接 WebSocket 的浏览器来源，只在配置文件中设置
         self.init_ui()
         self.setup_connections()
 
@@ -42,6 +60,17 @@ class GlobalSettings(QWidget):
         first_layout.addWidget(self.toggle_radio)
         first_layout.addWidget(self.stop_all_btn)
         first_layout.addWidget(self.stop_all_shortcut)
+
+        # 响度标准化
+        self.normalize_check = QCheckBox("响度标准化")
+        self.normalize_check.setToolTip("按分析得到的响度把所有音轨调到同一目标，音轨自己的音量在此基础上调整")
+        self.normalize_input = QSpinBox()
+        self.normalize_input.setRange(-40, -5)
+        self.normalize_input.setValue(-16)
+        self.normalize_input.setSuffix(" LUFS")
+        self.normalize_input.setEnabled(False)
+        first_layout.addWidget(self.normalize_check)
+        first_layout.addWidget(self.normalize_input)
         first_layout.addStretch()
 
         # 停止所有播放设置
@@ -52,8 +81,26 @@ class GlobalSettings(QWidget):
         self.device_combo = QComboBox()
         self.update_audio_devices()
 
+        # 通道上限和抢占策略
+        self.max_channels_input = QSpinBox()
+        self.max_channels_input.setRange(8, 512)
+        self.max_channels_input.setValue(voice_manager.max_channels)
+        self.max_channels_input.setToolTip("同时播放的最大通道数，不够时按需增加到此上限")
+        self.steal_policy_combo = QComboBox()
+        self.steal_policy_combo.addItems(STEAL_POLICIES)
+        self.steal_policy_combo.setCurrentText(voice_manager.policy)
+        self.steal_policy_combo.setToolTip("通道用尽时抢占哪个播放，不会抢占优先级更高的音轨")
+
         second_layout.addWidget(QLabel("音频设备:"))
         second_layout.addWidget(self.device_combo)
+        second_layout.addWidget(QLabel("最大通道:"))
+        second_layout.addWidget(self.max_channels_input)
+        second_layout.addWidget(QLabel("抢占:"))
+        second_layout.addWidget(self.steal_policy_combo)
+        # 远程控制
+        self.remote_check = QCheckBox("远程控制")
+        self.remote_check.setToolTip("接受本机 UDP (OSC/文本) 和 WebSocket 的触发命令，端口在配置文件中设置")
+        second_layout.addWidget(self.remote_check)
         second_layout.addStretch()
 
 
@@ -70,6 +117,21 @@ class GlobalSettings(QWidget):
         self.stop_all_btn.clicked.connect(self.stop_all_tracks_sign.emit)
         # 更改音频设备
         self.device_combo.currentIndexChanged.connect(self.on_device_changed)
+        # 通道分配
+        self.max_channels_input.valueChanged.connect(self.on_max_channels_changed)
+        self.steal_policy_combo.currentTextChanged.connect(self.on_steal_policy_changed)
+        # 响度标准化
+        self.normalize_check.toggled.connect(self.on_normalize_changed)
+        self.normalize_input.valueChanged.connect(self.on_normalize_changed)
+        # 远程控制
+        self.remote_check.toggled.connect(self.remote_changed_sign.emit)
+        # 任一设置变化都通知自动保存
+        for signal in (self.hold_radio.toggled, self.stop_all_shortcut.shortcutChanged,
+                       self.max_channels_input.valueChanged,
+                       self.steal_policy_combo.currentTextChanged,
+                       self.normalize_check.toggled, self.normalize_input.valueChanged,
+                       self.remote_check.toggled):
+            signal.connect(lambda *_: self.settings_changed.emit())
 
 
     def update_audio_devices(self):
@@ -78,23 +140,39 @@ class GlobalSettings(QWidget):
             self.device_combo.addItem(device.description())
 
     def on_device_changed(self, index):
-        # 重新初始化pygame.mixer使用新的音频设备
-        pygame.mixer.quit()
-        try:
-            # 获取选中的设备名称
-            device_name = self.device_combo.currentText()
-            pygame.mixer.init(devicename=device_name)
-            pygame.mixer.set_num_channels(32)
-        except Exception as e:
-            print(f"切换音频设备失败: {e}")
-            # 如果切换失败，尝试使用默认设备重新初始化
-            pygame.mixer.init()
-            pygame.mixer.set_num_channels(32)
+        # 由播放器在音频线程中按相同的 mixer 参数重新初始化
+        self.device_changed_sign.emit(self.device_combo.currentText())
+
+    def on_normalize_changed(self, *_):
+        enabled = self.normalize_check.isChecked()
+        self.normalize_input.setEnabled(enabled)
+        AudioTrack.normalize_target = self.normalize_input.value() if enabled else None
+        self.normalize_changed_sign.emit()
+
+    def on_max_channels_changed(self, value):
+        voice_manager.set_max_channels(value)
+
+    def on_steal_policy_changed(self, policy):
+        voice_manager.policy = policy
 
     def get_settings(self):
         return {
             "hold_mode": self.hold_radio.isChecked(),
-            "stop_all_shortcut": self.stop_all_shortcut.current_shortcut
+            "stop_all_shortcut": self.stop_all_shortcut.current_shortcut,
+            "pcm_cache_mb": self.pcm_cache_mb,
+            "stream_threshold_mb": self.stream_threshold_mb,
+            "max_channels": self.max_channels_input.value(),
+            "steal_policy": self.steal_policy_combo.currentText(),
+            "mixer": mixer_profile.get_settings(),
+            "board_format": self.board_format,
+            "virtual_list": self.virtual_list,
+            "mixer_stop_all": voice_manager.mixer_stop,
+            "normalize": self.normalize_check.isChecked(),
+            "normalize_target": self.normalize_input.value(),
+            "remote_control": self.remote_check.isChecked(),
+            "remote_udp_port": self.remote_udp_port,
+            "remote_ws_port": self.remote_ws_port,
+            "remote_origins": self.remote_origins,
         }
 
     def load_settings(self, settings):
@@ -105,4 +183,21 @@ class GlobalSettings(QWidget):
 
         shortcut = settings.get("stop_all_shortcut", "")
         self.stop_all_shortcut.setText(shortcut or "无快捷键")
-        self.stop_all_shortcut.current_shortcut = shortcut
\ No newline at end of file
+        self.stop_all_shortcut.current_shortcut = shortcut
+
+        self.pcm_cache_mb = settings.get("pcm_cache_mb", DEFAULT_LIMIT_MB)
+        pcm_cache.set_limit_mb(self.pcm_cache_mb)
+        self.stream_threshold_mb = settings.get("stream_threshold_mb", self.stream_threshold_mb)
+        StreamSource.threshold_bytes = int(self.stream_threshold_mb * 1024 * 1024)
+        self.max_channels_input.setValue(settings.get("max_channels", voice_manager.max_channels))
+        self.steal_policy_combo.setCurrentText(settings.get("steal_policy", voice_manager.policy))
+        mixer_profile.load_settings(settings.get("mixer", {}))
+        self.board_format = settings.get("board_format", YAML)
+        self.virtual_list = settings.get("virtual_list", False)
+        voice_manager.mixer_stop = settings.get("mixer_stop_all", False)
+        self.normalize_input.setValue(settings.get("normalize_target", -16))
+        self.normalize_check.setChecked(settings.get("normalize", False))
+        self.remote_udp_port = settings.get("remote_udp_port", UDP_PORT)
+        self.remote_ws_port = settings.get("remote_ws_port", WS_PORT)
+        self.remote_origins = list(settings.get("remote_origins", []))
+        self.remote_check.setChecked(settings.get("remote_control", False))
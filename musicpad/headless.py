@@ -0,0 +1,277 @@
+"""无界面渲染：按时间脚本重放按键，把混音结果写入 WAV
+
+    python -m musicpad.headless audios.yaml script.yaml -o out.wav
+
+脚本为 YAML 或 JSON 的事件列表（也可以放在 events 键下），每个事件:
+
+    - {time: 0.5, key: F1, event: down}   # 按下
+    - {time: 0.8, key: F1, event: up}     # 松开
+    - {time: 1.0, key: A, hold: 0.2}      # 不写 event 时按下并在 hold 秒后松开
+
+按键经过与界面相同的 KeyDispatcher / AudioEngine / AudioTrack，
+通道由内部的 numpy 混音器按采样计时，不依赖声卡，也不按实际时间等待
+"""
+import argparse
+import os
+import time
+import wave
+
+import numpy as np
+import pygame
+
+from .analysis import analysis_cache, analyze, samples
+from .audio_engine import AudioEngine
+from .audio_track import AudioTrack
+from .board import load_board
+from .dispatch import KeyDispatcher, STOP_ALL
+from .fades import BLOCK, gain_scheduler
+from .mixer import mixer_profile
+from .sound_pool import sound_pool
+from .stream import StreamSource
+from .track_settings import TrackSettings
+from .voices import voice_manager
+
+DEFAULT_TAIL = 30.0  # 最后一个事件后最多继续渲染的秒数（循环播放不会自己结束）
+
+
+class OfflineChannel:
+    """离线混音器的通道，接口与 pygame Channel 用到的部分一致"""
+    def __init__(self):
+        self.sound = None
+        self.pcm = None
+        self.position = 0  # 帧
+        self.loops = 0
+        self.volume = 1.0
+        self.paused = False
+
+    def play(self, sound, loops=0):
+        self.sound = sound
+        self.pcm = samples(sound)
+        self.position = 0
+        self.loops = loops
+        self.volume = 1.0
+        self.paused = False
+
+    def stop(self):
+        self.sound = None
+        self.pcm = None
+
+    def pause(self):
+        self.paused = True
+
+    def unpause(self):
+        self.paused = False
+
+    def get_busy(self):
+        # 与 pygame 一致，暂停的通道仍然忙
+        return self.sound is not None
+
+    def get_sound(self):
+        return self.sound
+
+    def set_volume(self, volume):
+        self.volume = max(0.0, min(1.0, float(volume)))
+
+    def get_volume(self):
+        return self.volume
+
+    def mix_into(self, out):
+        """把接下来 len(out) 帧叠加到 out"""
+        filled = 0
+        while filled < len(out) and self.sound is not None:
+            count = min(len(out) - filled, len(self.pcm) - self.position)
+            if count > 0:
+                out[filled:filled + count] += self.pcm[self.position:self.position + count] * self.volume
+                filled += count
+                self.position += count
+            if self.position >= len(self.pcm):
+                if self.loops and len(self.pcm):
+                    self.position = 0
+                    if self.loops > 0:
+                        self.loops -= 1
+                else:
+                    self.stop()
+
+
+class OfflineMixer:
+    """代替 pygame.mixer 的混音器，供 VoiceManager 使用
+
+    时钟按已经混音的帧数计算，渲染速度只受计算量限制
+    """
+    def __init__(self, frequency, channels):
+        self.frequency = frequency
+        self.channels = channels
+        self.frame = 0
+        self.outputs: list[OfflineChannel] = []
+
+    def clock(self):
+        return self.frame / self.frequency
+
+    def set_num_channels(self, count):
+        while len(self.outputs) < count:
+            self.outputs.append(OfflineChannel())
+        # 与 pygame 一致，减少通道时停止多出的播放
+        for channel in self.outputs[count:]:
+            channel.stop()
+        del self.outputs[count:]
+
+    def Channel(self, index):
+        return self.outputs[index]
+
+    def stop(self):
+        for channel in self.outputs:
+            channel.stop()
+
+    def busy(self):
+        return any(channel.get_busy() for channel in self.outputs)
+
+    def mix(self, frames) -> np.ndarray:
+        """混音 frames 帧，返回 int16 (帧, 声道)"""
+        out = np.zeros((frames, self.channels), np.float32)
+        for channel in self.outputs:
+            if channel.sound is not None and not channel.paused:
+                channel.mix_into(out)
+        self.frame += frames
+        return np.clip(out, -32768, 32767).astype(np.int16)
+
+
+def load_script(path):
+    """读取按键脚本，返回按时间排序的 (秒, 键名, 是否按下)"""
+    data, _ = load_board(path)
+    if isinstance(data, dict):
+        data = data.get("events", [])
+    events = []
+    for item in data:
+        at = float(item["time"])
+        key = str(item["key"])
+        event = item.get("event")
+        if event is None:
+            events.append((at, key, True))
+            events.append((at + float(item.get("hold", 0.0)), key, False))
+        elif event in ("down", "up"):
+            events.append((at, key, event == "down"))
+        else:
+            raise ValueError(f"未知的按键事件: {event}")
+    # 同一时刻先处理先写的事件
+    return sorted(events, key=lambda e: e[0])
+
+
+def load_tracks(data):
+    """按配置创建音轨并同步加载声音和分析结果，返回 (快捷键, 音轨) 列表"""
+    bindings = []
+    for settings_dict in data.get("tracks", []):
+        settings = TrackSettings()
+        settings.load(settings_dict)
+        # 离线混音直接读取 PCM，不使用流式播放
+        settings.stream = False
+        track = AudioTrack()
+        settings.apply(track)
+        if settings.file_path and not track.load_file(settings.file_path):
+            print(f"无法加载 {settings.file_path}")
+        if track.sound is not None:
+            track.set_analysis(analysis_cache.get(track.path) or analyze(track.path, track.sound))
+        bindings.append((settings.shortcut, track))
+    # 裁剪在切分线程中完成，渲染前等待，保证结果确定
+    sound_pool.wait_trims()
+    return bindings
+
+
+def render(board_path, script_path, output_path, tail=DEFAULT_TAIL, duration=None):
+    """渲染并写入 output_path，返回统计信息
+
+    tail: 最后一个事件后等待播放结束的最长秒数
+    duration: 指定时固定渲染该秒数
+    """
+    data, _ = load_board(board_path)
+    global_settings = data.get("global_settings", {})
+    mixer_profile.load_settings(global_settings.get("mixer", {}))
+
+    # pygame 只用于解码，播放全部交给离线混音器
+    offline = OfflineMixer(mixer_profile.frequency, mixer_profile.channels)
+    voice_manager.backend = offline
+    voice_manager.clock = offline.clock
+    gain_scheduler.manual = True
+    StreamSource.threshold_bytes = 0
+    mixer_profile.init()
+    frequency, _, channels = pygame.mixer.get_init()
+    offline.frequency, offline.channels = frequency, channels
+
+    voice_manager.set_max_channels(global_settings.get("max_channels", voice_manager.max_channels))
+    voice_manager.policy = global_settings.get("steal_policy", voice_manager.policy)
+    voice_manager.mixer_stop = global_settings.get("mixer_stop_all", False)
+    if global_settings.get("normalize", False):
+        AudioTrack.normalize_target = global_settings.get("normalize_target", -16)
+
+    load_start = time.perf_counter()
+    bindings = load_tracks(data)
+    load_seconds = time.perf_counter() - load_start
+
+    # 引擎不启动线程，每个事件后在本线程执行命令
+    engine = AudioEngine()
+    engine.hold_mode = global_settings.get("hold_mode", False)
+    engine.tracks = tuple(track for _, track in bindings)
+    dispatcher = KeyDispatcher(engine)
+    dispatcher.shortcut_index.rebuild(
+        [(global_settings.get("stop_all_shortcut", ""), STOP_ALL)] + bindings)
+
+    events = load_script(script_path)
+    last_event = events[-1][0] if events else 0.0
+    end = int((duration if duration is not None else last_event + tail) * frequency)
+    block = max(1, int(BLOCK * frequency))
+
+    start = time.perf_counter()
+    next_event = 0
+    with wave.open(str(output_path), "wb") as out:
+        out.setnchannels(channels)
+        out.setsampwidth(2)
+        out.setframerate(frequency)
+        while offline.frame < end:
+            # 事件按采样对齐：先处理到期的事件，再混音到下一个事件或下一块
+            while next_event < len(events) and events[next_event][0] * frequency <= offline.frame:
+                _, key, is_key_down = events[next_event]
+                dispatcher.key_event(key, is_key_down)
+                engine.drain()
+                next_event += 1
+            if duration is None and next_event == len(events) and not offline.busy():
+                break
+            frames = min(block, end - offline.frame)
+            if next_event < len(events):
+                frames = max(1, min(frames, int(np.ceil(events[next_event][0] * frequency)) - offline.frame))
+            gain_scheduler.tick(frames / frequency)
+            out.writeframes(offline.mix(frames).tobytes())
+
+    seconds = time.perf_counter() - start
+    rendered = offline.frame / frequency
+    return {
+        "tracks": len(bindings),
+        "events": len(events),
+        "rendered_seconds": rendered,
+        "render_seconds": seconds,
+        "load_seconds": load_seconds,
+        "realtime_factor": rendered / seconds if seconds else float("inf"),
+        "stolen": voice_manager.stolen,
+        "dropped": voice_manager.dropped,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m musicpad.headless",
+                                     description="按按键脚本离线渲染音频板到 WAV")
+    parser.add_argument("board", help="配置文件 (audios.yaml / audios.json)")
+    parser.add_argument("script", help="按键脚本 (YAML / JSON)")
+    parser.add_argument("-o", "--output", default="render.wav", help="输出的 WAV 文件")
+    parser.add_argument("--tail", type=float, default=DEFAULT_TAIL,
+                        help="最后一个事件后最多渲染的秒数")
+    parser.add_argument("--duration", type=float, help="固定渲染的秒数")
+    args = parser.parse_args(argv)
+
+    # 不打开声卡
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    stats = render(args.board, args.script, args.output, args.tail, args.duration)
+    print(f"{stats['tracks']} 个音轨，{stats['events']} 个事件，"
+          f"渲染 {stats['rendered_seconds']:.2f} 秒音频用时 {stats['render_seconds']:.2f} 秒 "
+          f"({stats['realtime_factor']:.0f} 倍实时) -> {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+import csv
+import json
+import threading
+import time
+
+import numpy as np
+
+RING_SIZE = 4096  # 每个阶段保留最近的样本数
+# 触发的各阶段，除 hook 外都是从钩子回调开始经过的毫秒数
+HOOK = "hook"                # 键盘事件发生到钩子回调（keyboard 记录的事件时间）
+MATCH = "match"              # 快捷键匹配到音轨
+TRIGGER = "trigger"          # 命令放入音频线程队列
+TOGGLE_PLAY = "toggle_play"  # 音频线程开始执行 toggle_play
+PLAY = "play"                # 通道的 play 返回
+STAGES = (HOOK, MATCH, TRIGGER, TOGGLE_PLAY, PLAY)
+
+
+class RingHistogram:
+    """固定大小的环形缓冲，只统计最近 size 个样本的分位数"""
+    def __init__(self, size=RING_SIZE):
+        self.values = np.zeros(size)
+        self.count = 0
+        self.lock = threading.Lock()
+
+    def add(self, value):
+        with self.lock:
+            self.values[self.count % len(self.values)] = value
+            self.count += 1
+
+    def clear(self):
+        with self.lock:
+            self.count = 0
+
+    def samples(self) -> np.ndarray:
+        """按时间顺序的最近样本"""
+        with self.lock:
+            size = len(self.values)
+            if self.count <= size:
+                return self.values[:self.count].copy()
+            head = self.count % size
+            return np.concatenate((self.values[head:], self.values[:head]))
+
+    def summary(self):
+        values = self.samples()
+        if not len(values):
+            return {"count": self.count, "p50": None, "p95": None, "p99": None, "max": None}
+        p50, p95, p99 = np.percentile(values, [50, 95, 99])
+        return {"count": self.count, "p50": float(p50), "p95": float(p95),
+                "p99": float(p99), "max": float(values.max())}
+
+
+class Trace:
+    """一次按键触发，记录钩子回调的开始时间"""
+    __slots__ = ("start",)
+
+    def __init__(self, start):
+        self.start = start
+
+
+class Instruments:
+    """触发延迟和定时器回调的统计
+
+    关闭时各处只检查一次 enabled，几乎没有开销；
+    打开后每个阶段写入对应的环形缓冲
+    """
+    def __init__(self, size=RING_SIZE):
+        self.enabled = False
+        self.histograms = {stage: RingHistogram(size) for stage in STAGES}
+        self.counters = {}  # 名称 -> 回调次数
+        self.lock = threading.Lock()  # 计数来自多个线程
+        self.local = threading.local()  # 音频线程当前执行的 Trace
+
+    def start(self, event_time=None):
+        """钩子回调开始，event_time 为 keyboard 记录的事件时间 (time.time())"""
+        trace = Trace(time.perf_counter())
+        if event_time:
+            self.histograms[HOOK].add(max(0.0, time.time() - event_time) * 1000)
+        return trace
+
+    def mark(self, trace, stage):
+        """记录 trace 到达 stage，trace 为 None 时忽略"""
+        if trace is not None:
+            self.histograms[stage].add((time.perf_counter() - trace.start) * 1000)
+
+    def set_current(self, trace):
+        """音频线程开始/结束执行一次触发，之后的阶段用 current() 取得"""
+        self.local.trace = trace
+
+    def current(self):
+        return getattr(self.local, "trace", None)
+
+    def count(self, name):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + 1
+
+    def reset(self):
+        for histogram in self.histograms.values():
+            histogram.clear()
+        with self.lock:
+            self.counters.clear()
+
+    def summary(self):
+        """各阶段的分位数(ms)和回调次数"""
+        with self.lock:
+            counters = dict(self.counters)
+        return {
+            "stages": {stage: histogram.summary() for stage, histogram in self.histograms.items()},
+            "counters": counters,
+        }
+
+    def write_json(self, path, extra=None):
+        """导出统计和各阶段的原始样本，extra 为附加的状态（通道、内存等）"""
+        data = self.summary()
+        data["samples"] = {stage: np.round(h.samples(), 4).tolist() for stage, h in self.histograms.items()}
+        data.update(extra or {})
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+
+    def write_csv(self, path):
+        """导出各阶段的分位数，每个阶段一行"""
+        with open(path, "w", encoding="utf-8", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["stage", "count", "p50_ms", "p95_ms", "p99_ms", "max_ms"])
+            for stage, s in self.summary()["stages"].items():
+                writer.writerow([stage, s["count"], s["p50"], s["p95"], s["p99"], s["max"]])
+
+
+instruments = Instruments()
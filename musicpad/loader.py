@@ -0,0 +1,124 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+
+from .analysis import analysis_cache, analyze, analyze_stream
+from .audio_track import AudioTrack
+from .sound_pool import sound_pool
+from .stream import StreamSource
+
+
+class SoundLoader(QObject):
+    """后台并行解码音频文件
+
+    请求先合并到下一次事件循环，按优先级排序后交给线程池，
+    解码完成后在界面线程把声音交给音轨并回调；
+    没有缓存的分析结果时，在单独的低优先级线程中分析，不延迟加载完成
+    """
+    _loaded_sign = pyqtSignal(object, int, str, object, float, object)  # 音轨, 请求号, 路径, 声音, 耗时, 分析结果
+    _analyzed_sign = pyqtSignal(object, int, object)  # 音轨, 请求号, 分析结果
+    finished = pyqtSignal(int, float)  # 本批文件数, 总耗时(秒)
+
+    def __init__(self, max_workers=None, parent=None):
+        super().__init__(parent)
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers or min(8, os.cpu_count() or 1),
+            thread_name_prefix="SoundLoader")
+        self.analyzer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="SoundAnalyzer")
+        self.queued = []     # (优先级, 序号, 音轨, 路径)
+        self.callbacks = {}  # AudioTrack -> callback(ok, 耗时)
+        self.analysis_callbacks = {}  # AudioTrack -> callback(分析结果)
+        self.pending = 0
+        self.batch_count = 0
+        self.batch_start = 0.0
+        self.flush_timer = QTimer(self)
+        self.flush_timer.setSingleShot(True)
+        self.flush_timer.setInterval(0)
+        self.flush_timer.timeout.connect(self.flush)
+        self._loaded_sign.connect(self._on_loaded)
+        self._analyzed_sign.connect(self._on_analyzed)
+
+    def load(self, track: AudioTrack, file_path, priority=0, callback=None, analyzed=None):
+        """请求加载，priority 越大越先解码
+
+        analyzed: 得到分析结果（缓存或后台分析）后的回调
+        """
+        track.load_id += 1
+        if callback:
+            self.callbacks[track] = callback
+        if analyzed:
+            self.analysis_callbacks[track] = analyzed
+        self.queued.append((priority, len(self.queued), track, file_path))
+        self.flush_timer.start()
+
+    def cancel(self, track: AudioTrack):
+        """丢弃音轨尚未完成的加载"""
+        track.load_id += 1
+        self.callbacks.pop(track, None)
+        self.analysis_callbacks.pop(track, None)
+
+    def flush(self):
+        """按优先级提交所有排队的请求"""
+        if not self.queued:
+            return
+        queued = sorted(self.queued, key=lambda item: (-item[0], item[1]))
+        self.queued = []
+        if not self.pending:
+            self.batch_count = 0
+            self.batch_start = time.perf_counter()
+        for _, _, track, file_path in queued:
+            self.pending += 1
+            self.batch_count += 1
+            self.executor.submit(self._decode, track, track.load_id, file_path)
+
+    def shutdown(self):
+        self.queued.clear()
+        # 等待正在解码的文件，避免在 mixer 关闭后解码
+        self.executor.shutdown(wait=True, cancel_futures=True)
+        self.analyzer.shutdown(wait=True, cancel_futures=True)
+
+    def _decode(self, track: AudioTrack, load_id, file_path):
+        # 工作线程
+        start = time.perf_counter()
+        sound = AudioTrack.decode_file(file_path, track.stream)
+        analysis = analysis_cache.get(file_path, isinstance(sound, StreamSource)) if sound is not None else None
+        self._loaded_sign.emit(track, load_id, file_path, sound, time.perf_counter() - start, analysis)
+
+    def _analyze(self, track: AudioTrack, load_id, file_path, sound):
+        # 分析线程
+        try:
+            if isinstance(sound, StreamSource):
+                analysis = analyze_stream(file_path, sound)
+            else:
+                analysis = analyze(file_path, sound)
+        except Exception as e:
+            print(f"分析音频失败: {e}")
+            return
+        self._analyzed_sign.emit(track, load_id, analysis)
+
+    def _on_loaded(self, track: AudioTrack, load_id, file_path, sound, seconds, analysis):
+        self.pending -= 1
+        # 已被新的请求或删除取代
+        if load_id == track.load_id:
+            track.set_sound(sound, file_path, seconds)
+            if analysis is not None:
+                self._on_analyzed(track, load_id, analysis)
+            elif sound is not None:
+                # 流式播放没有完整的 PCM，只检测静音
+                self.analyzer.submit(self._analyze, track, load_id, file_path, sound)
+            callback = self.callbacks.pop(track, None)
+            if callback:
+                callback(sound is not None, seconds)
+        elif sound is not None:
+            sound_pool.release(sound)
+        if not self.pending:
+            self.finished.emit(self.batch_count, time.perf_counter() - self.batch_start)
+
+    def _on_analyzed(self, track: AudioTrack, load_id, analysis):
+        if load_id == track.load_id:
+            track.set_analysis(analysis)
+            callback = self.analysis_callbacks.pop(track, None)
+            if callback:
+                callback(analysis)
@@ -0,0 +1,174 @@
+import time
+
+import numpy as np
+import pygame
+
+from .sound_pool import sound_pool
+from .stream import StreamSource
+from .voices import voice_manager
+
+CALIBRATION_BUFFERS = (128, 256, 512, 1024, 2048)
+
+
+class MixerProfile:
+    """mixer 参数，启动和切换设备时都按同样的参数初始化"""
+    def __init__(self, frequency=44100, buffer=512, channels=2):
+        self.frequency = frequency
+        self.buffer = buffer
+        self.channels = channels
+        self.devicename = None
+
+    def init(self, devicename=None):
+        """(重新)初始化 mixer，devicename 为空时使用默认设备"""
+        if pygame.mixer.get_init():
+            pygame.mixer.quit()
+        self.devicename = devicename or None
+        pygame.mixer.init(frequency=self.frequency, size=-16, channels=self.channels,
+                          buffer=self.buffer, devicename=self.devicename)
+        voice_manager.apply()
+
+    def buffer_ms(self):
+        return self.buffer / self.frequency * 1000
+
+    def get_settings(self):
+        return {
+            "frequency": self.frequency,
+            "buffer": self.buffer,
+            "channels": self.channels,
+        }
+
+    def load_settings(self, settings):
+        self.frequency = settings.get("frequency", self.frequency)
+        self.buffer = settings.get("buffer", self.buffer)
+        self.channels = settings.get("channels", self.channels)
+
+
+def switch_device(profile: MixerProfile, devicename, tracks):
+    """切换设备并用保留的 PCM 重建声音，正在播放的音轨从原位置继续
+
+    在音频线程中调用。返回 (耗时秒, 恢复的播放数)；
+    新设备的 mixer 格式不同时返回 None，需要重新加载文件
+    """
+    start = time.perf_counter()
+    old_format = pygame.mixer.get_init()
+    playing = voice_manager.snapshot() if old_format else []
+    # 只有正在播放的声音需要 PCM 来恢复位置，其余的可以从磁盘缓存重建
+    raws = sound_pool.snapshot(keep={sound for _, sound, *_ in playing}) if old_format else {}
+    try:
+        profile.init(devicename)
+    except Exception as e:
+        print(f"切换音频设备失败: {e}")
+        # 如果切换失败，尝试使用默认设备重新初始化
+        profile.init()
+    if pygame.mixer.get_init() != old_format:
+        return None
+
+    users = {}  # 旧声音 -> 使用它的音轨
+    for track in tracks:
+        track.channels.clear()
+        users.setdefault(track.sound, []).append(track)
+    playing_sounds = {sound for _, sound, *_ in playing}
+    mapping = {}  # 正在播放的 旧声音 -> (新声音, PCM)
+
+    def replace(old, new, raw):
+        for track in users.pop(old, ()):
+            track.sound = new
+            track.update_trim(wait=True)
+        if old in playing_sounds:
+            mapping[old] = (new, raw)
+
+    sound_pool.rebuild(raws, replace)
+    users.clear()
+
+    freq, size, channels = old_format
+    frame_bytes = channels * abs(size) // 8
+    resumed = 0
+    for track, sound, position, loops, paused, span in playing:
+        if isinstance(sound, StreamSource):
+            voice = voice_manager.play(track, sound, loops, position, span=span)
+        elif sound in mapping:
+            new, raw = mapping[sound]
+            first = 0
+            if span:
+                # 只保留播放段
+                first = int(span[0] * freq)
+                raw = raw[first * frame_bytes:int(span[1] * freq) * frame_bytes]
+            offset = (int(position * freq) - first) * frame_bytes
+            # 循环播放时把缓冲转到当前位置，继续无缝循环
+            data = raw[offset:] + raw[:offset] if loops else raw[offset:]
+            if not data:
+                continue
+            voice = voice_manager.play(track, new, loops, position,
+                                       output_sound=pygame.mixer.Sound(buffer=data), span=span)
+        else:
+            continue
+        if voice is None:
+            continue
+        voice.set_volume(track.volume)
+        track.channels.append(voice)
+        if paused:
+            voice.pause()
+        track.is_playing = True
+        track.is_paused = paused
+        track.notify_monitor()
+        resumed += 1
+    return time.perf_counter() - start, resumed
+
+
+def calibrate(profile: MixerProfile, buffers=CALIBRATION_BUFFERS, trials=10, length_ms=40):
+    """测量各缓冲大小下从触发到通道开始混音的延迟
+
+    pygame 不提供播放位置，这里播放一段已知长度的静音，
+    从调用到通道空闲的时间减去声音长度即为开始延迟（按混音回调粒度）。
+    延迟波动超过缓冲时长的两倍视为回调跟不上（可能断音）。
+    返回每个缓冲大小的结果，结束后按原参数恢复 mixer
+    """
+    original = profile.buffer
+    results = []
+    try:
+        for buffer in buffers:
+            profile.buffer = buffer
+            try:
+                profile.init(profile.devicename)
+            except pygame.error as e:
+                results.append({"buffer": buffer, "ok": False, "error": str(e)})
+                continue
+            freq, _, channels = pygame.mixer.get_init()
+            frames = int(freq * length_ms / 1000)
+            sound = pygame.mixer.Sound(buffer=np.zeros(frames * channels, np.int16).tobytes())
+            length = sound.get_length()
+            latencies = []
+            for _ in range(trials):
+                start = time.perf_counter()
+                channel = sound.play()
+                if channel is None:
+                    continue
+                while channel.get_busy():
+                    time.sleep(0.0005)
+                latencies.append(max(0.0, time.perf_counter() - start - length) * 1000)
+            if not latencies:
+                results.append({"buffer": buffer, "ok": False, "error": "没有可用通道"})
+                continue
+            latencies.sort()
+            buffer_ms = buffer / freq * 1000
+            p50 = latencies[len(latencies) // 2]
+            results.append({
+                "buffer": buffer,
+                "ok": latencies[-1] - latencies[0] <= buffer_ms * 2 + 1,
+                "buffer_ms": buffer_ms,
+                "p50_ms": p50,
+                "max_ms": latencies[-1],
+            })
+    finally:
+        profile.buffer = original
+        profile.init(profile.devicename)
+    return results
+
+
+def recommend_buffer(results):
+    """最小的稳定缓冲大小，没有时返回 None"""
+    stable = [r["buffer"] for r in results if r["ok"]]
+    return min(stable) if stable else None
+
+
+mixer_profile = MixerProfile()
@@ -0,0 +1,87 @@
+import threading
+
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+
+from .audio_track import AudioTrack
+from .instruments import instruments
+
+
+class PlaybackMonitor(QObject):
+    """集中的播放状态监视器
+
+    只轮询正在播放/暂停的音轨，状态真正变化时才回调，
+    播放中的音轨还会回调播放位置（用于波形上的播放头），
+    没有音轨在播放时定时器停止，空闲时没有开销
+
+    只读取音轨状态，播放结束后的清理交给音频线程（engine），
+    不与 play/stop 同时修改 channels
+    """
+    _wake_sign = pyqtSignal()  # 其它线程唤醒定时器
+
+    def __init__(self, engine, interval=50, parent=None):
+        super().__init__(parent)
+        self.engine = engine
+        self.lock = threading.Lock()
+        self.watching: set[AudioTrack] = set()
+        self.callbacks = {}  # AudioTrack -> callback(is_playing, is_paused)
+        self.progress = {}   # AudioTrack -> callback(播放位置 0~1 或 None)
+        self.states = {}     # AudioTrack -> 最近一次回调的状态
+        self.timer = QTimer(self)
+        self.timer.setInterval(interval)
+        self.timer.timeout.connect(self.poll)
+        self._wake_sign.connect(self._wake)
+
+    def bind(self, track: AudioTrack, callback, progress=None):
+        """绑定音轨的状态回调和播放位置回调"""
+        self.callbacks[track] = callback
+        if progress:
+            self.progress[track] = progress
+        track.monitor = self
+
+    def unbind(self, track: AudioTrack):
+        self.callbacks.pop(track, None)
+        self.progress.pop(track, None)
+        self.states.pop(track, None)
+        track.monitor = None
+        with self.lock:
+            self.watching.discard(track)
+
+    def watch(self, track: AudioTrack):
+        """开始监视音轨，可在任意线程调用"""
+        with self.lock:
+            self.watching.add(track)
+        self._wake_sign.emit()
+
+    def _wake(self):
+        if not self.timer.isActive():
+            self.timer.start()
+        self.poll()
+
+    def poll(self):
+        """检查被监视的音轨，状态变化时回调"""
+        if instruments.enabled:
+            instruments.count("monitor.poll")
+        with self.lock:
+            tracks = list(self.watching)
+        for track in tracks:
+            # 复制一份再读取，音频线程可能同时追加
+            busy = any(ch.get_busy() for ch in list(track.channels))
+            if track.is_playing and not busy:
+                # 自然播放结束，由音频线程重置状态
+                self.engine.submit(track.cleanup_channels)
+            is_playing = track.is_playing and busy
+            state = (is_playing, track.is_paused and is_playing)
+            if self.states.get(track, (False, False)) != state:
+                self.states[track] = state
+                callback = self.callbacks.get(track)
+                if callback:
+                    callback(*state)
+            progress = self.progress.get(track)
+            if progress:
+                progress(track.playhead() if is_playing else None)
+            if not is_playing:
+                self.states.pop(track, None)
+                with self.lock:
+                    self.watching.discard(track)
+        if not self.watching:
+            self.timer.stop()
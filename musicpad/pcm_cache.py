@@ -0,0 +1,148 @@
+import hashlib
+import mmap
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+import pygame
+
+from .board import user_cache_dir
+
+CACHE_DIR = user_cache_dir() / "pcm"
+DEFAULT_LIMIT_MB = 1024
+
+
+class PCMCache:
+    """解码后 PCM 的磁盘缓存
+
+    按 路径/修改时间/大小/mixer 格式 索引，命中时内存映射缓存文件直接构造 Sound，
+    不再解码；超过上限时按最近使用时间淘汰
+
+    目录只在第一次使用时扫描一次，之后在内存中维护大小和使用顺序
+    """
+    def __init__(self, directory=CACHE_DIR, max_bytes=DEFAULT_LIMIT_MB * 1024 * 1024):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.index = None  # 缓存文件 -> 字节数，最近使用的在最后
+        self.total = 0
+
+    def _load_index(self):
+        """扫描缓存目录建立索引，持有锁时调用"""
+        if self.index is not None:
+            return
+        entries = []
+        try:
+            for entry in self.directory.glob("*.pcm"):
+                try:
+                    entries.append((entry.stat(), entry))
+                except OSError:
+                    pass
+        except OSError:
+            pass
+        entries.sort(key=lambda item: item[0].st_mtime)
+        self.index = OrderedDict((entry, stat.st_size) for stat, entry in entries)
+        self.total = sum(self.index.values())
+
+    def _record(self, entry, size=None):
+        """记录一次使用，size 不为空时为新写入的大小"""
+        with self.lock:
+            self._load_index()
+            if size is not None:
+                self.total += size - self.index.get(entry, 0)
+                self.index[entry] = size
+            if entry in self.index:
+                self.index.move_to_end(entry)
+
+    def entry_path(self, file_path):
+        """缓存文件路径，源文件不存在或 mixer 未初始化时返回 None"""
+        mixer_format = pygame.mixer.get_init()
+        if not mixer_format:
+            return None
+        try:
+            path = Path(file_path).resolve()
+            stat = path.stat()
+        except OSError:
+            return None
+        key = f"{path}|{stat.st_mtime_ns}|{stat.st_size}|{mixer_format}"
+        return self.directory / (hashlib.sha1(key.encode("utf-8")).hexdigest() + ".pcm")
+
+    def has(self, file_path):
+        """文件是否已在缓存中"""
+        if self.max_bytes <= 0:
+            return False
+        entry = self.entry_path(file_path)
+        return entry is not None and entry.exists()
+
+    def load(self, file_path):
+        """从缓存构造 Sound，未命中返回 None"""
+        if self.max_bytes <= 0:
+            return None
+        entry = self.entry_path(file_path)
+        if entry is None or not entry.exists():
+            self.misses += 1
+            return None
+        try:
+            with open(entry, "rb") as f:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                    sound = pygame.mixer.Sound(buffer=buffer)
+            os.utime(entry)  # 记录最近使用时间，下次启动时按此排序
+        except (OSError, ValueError, pygame.error) as e:
+            print(f"读取 PCM 缓存失败: {e}")
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._record(entry)
+        return sound
+
+    def store(self, file_path, sound):
+        """写入缓存，先写临时文件再改名"""
+        if self.max_bytes <= 0:
+            return
+        entry = self.entry_path(file_path)
+        if entry is None:
+            return
+        try:
+            raw = sound.get_raw()
+            if len(raw) > self.max_bytes:
+                return
+            self.directory.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(raw)
+                os.replace(tmp_path, entry)
+            except OSError:
+                os.remove(tmp_path)
+                raise
+        except OSError as e:
+            print(f"写入 PCM 缓存失败: {e}")
+            return
+        self._record(entry, len(raw))
+        self.evict()
+
+    def evict(self):
+        """按最近使用时间淘汰，直到总大小不超过上限"""
+        with self.lock:
+            self._load_index()
+            while self.total > max(0, self.max_bytes) and self.index:
+                entry, size = self.index.popitem(last=False)
+                self.total -= size
+                try:
+                    entry.unlink()
+                except FileNotFoundError:
+                    pass
+                except OSError as e:
+                    print(f"删除 PCM 缓存失败: {e}")
+
+    def set_limit_mb(self, limit_mb):
+        """设置大小上限(MB)，0 表示禁用"""
+        self.max_bytes = int(limit_mb * 1024 * 1024)
+        self.evict()
+
+
+pcm_cache = PCMCache()
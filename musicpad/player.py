@@ -0,0 +1,404 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pygame
+import keyboard
+
+from PyQt6.QtWidgets import QMainWindow, QWidget, QVBoxLayout, QSizePolicy, QMessageBox
+from PyQt6.QtCore import Qt, QTimer, pyqtSignal
+
+from .audio_engine import AudioEngine
+from .board import BOARD_FILES, find_board, load_board, dump_board, write_atomic
+from .audio_track import AudioTrack
+from .global_settings import GlobalSettings
+from .instruments import instruments
+from .mixer import mixer_profile, calibrate, recommend_buffer, switch_device
+from .remote import RemoteServer
+from .diagnostics import DiagnosticsPanel
+from .dispatch import KeyDispatcher, STOP_ALL
+from .sound_pool import sound_pool
+from .tracks import TracksContainer
+from .track_view import VirtualTracksContainer
+
+VIRTUAL_THRESHOLD = 500  # 音轨数达到该值时自动使用虚拟列表
+
+class AudioPlayer(QMainWindow):
+    calibration_done_sign = pyqtSignal(object)  # 延迟校准结果
+    mixer_reset_sign = pyqtSignal()  # mixer 重新初始化，旧的声音失效
+    device_switched_sign = pyqtSignal(float, int)  # 设备切换耗时(秒), 恢复的播放数
+    remote_volume_sign = pyqtSignal(object, float)  # 远程设置音量 (AudioTrack, dB)
+    board_saved_sign = pyqtSignal(str, float)  # 配置已保存 (文件名, 耗时秒)
+
+    def __init__(self):
+        super().__init__()
+        # 音频命令线程
+        self.engine = AudioEngine()
+        self.engine.start()
+        # 远程控制，命令在接收线程中直接放入音频队列，只有音量回到界面线程
+        self.remote = RemoteServer(self.engine, self.remote_volume_sign.emit)
+        # 设置窗口基本属性
+        self.setWindowTitle("音频播放器")
+        self.setMinimumSize(400, 400)
+
+        # 创建中心部件
+        central_widget = QWidget()
+        self.setCentralWidget(central_widget)
+
+        # 创建主布局
+        self.main_layout = QVBoxLayout(central_widget)
+        self.main_layout.setSpacing(0)  # 减少间距
+        self.main_layout.setContentsMargins(10, 10, 10, 10)
+
+        # 快捷键
+        self.active_shortcuts = {}  # 存储活跃的快捷键
+        self.dispatcher = KeyDispatcher(self.engine)
+        # 快捷键或音轨变化时合并到下一次事件循环重建索引
+        self.index_timer = QTimer(self)
+        self.index_timer.setSingleShot(True)
+        self.index_timer.setInterval(0)
+        self.index_timer.timeout.connect(self.rebuild_shortcut_index)
+        # 设置变化后延迟自动保存，连续修改只保存一次
+        self.dirty = False      # 上次保存后设置是否变化
+        self.board_text = None  # 最近保存/读取的内容，只在保存线程中访问
+        self.saver = ThreadPoolExecutor(max_workers=1, thread_name_prefix="BoardSaver")
+        self.autosave_timer = QTimer(self)
+        self.autosave_timer.setSingleShot(True)
+        self.autosave_timer.setInterval(1000)
+        self.autosave_timer.timeout.connect(self.save_settings)
+
+        # 先读取配置，按音轨数决定使用哪种音轨列表
+        board = self.read_board()
+        # 初始化UI
+        self.init_ui(board)
+        self.load_settings(board)
+        # 按保存的参数初始化 pygame mixer，声音在事件循环开始后才加载
+        mixer_profile.init()
+        self.rebuild_shortcut_index()
+        self.sync_engine_tracks()
+        self.setup_connections()
+        self.on_remote_changed()
+
+        self.setup_keyboard_hook()
+
+    def init_ui(self, board=None):
+        self.create_menu_bar()
+        #添加全局设置
+        self.global_settings_widget = GlobalSettings()
+        self.global_settings_widget.setFixedHeight(90)  # 设置固定高度
+        self.main_layout.addWidget(self.global_settings_widget)
+
+        # 音轨容器占据剩余空间
+        data = board[0] if board else {}
+        if (data.get('global_settings', {}).get('virtual_list')
+                or len(data.get('tracks', [])) >= VIRTUAL_THRESHOLD):
+            self.tracks_container = VirtualTracksContainer(self.engine)
+        else:
+            self.tracks_container = TracksContainer(self.engine)
+            self.tracks_container.setAlignment(Qt.AlignmentFlag.AlignTop)
+        self.tracks_container.setSizePolicy(
+            QSizePolicy.Policy.Expanding,
+            QSizePolicy.Policy.Expanding
+        )
+        self.main_layout.addWidget(self.tracks_container)
+        # 诊断面板，默认隐藏
+        self.diagnostics = DiagnosticsPanel(self.engine, self)
+        self.addDockWidget(Qt.DockWidgetArea.BottomDockWidgetArea, self.diagnostics)
+        self.diagnostics.remote = self.remote
+        self.diagnostics.hide()
+        self.diagnostics_action.triggered.connect(self.diagnostics.setVisible)
+        self.diagnostics.visibilityChanged.connect(self.diagnostics_action.setChecked)
+        # 后续会在这里添加更多UI组件
+        pass
+    def read_board(self):
+        """读取最近保存的配置，返回 (数据, 耗时秒, 路径)，没有时返回 None"""
+        path = find_board()
+        if path is None:
+            return None
+        try:
+            data, seconds = load_board(path)
+        except Exception as e:
+            print(f"读取配置失败: {e}")
+            return None
+        return data, seconds, path
+
+    def load_settings(self, board):
+        if board is None:
+            return
+        data, seconds, path = board
+        self.global_settings_widget.load_settings(data.get('global_settings', {}))
+        self.tracks_container.add_tracks(data.get('tracks', []))
+        # 读取时产生的变化不需要保存，记下读取的内容供之后比较
+        self.dirty = False
+        self.saver.submit(self._remember_board, self.collect_settings(),
+                          self.global_settings_widget.board_format)
+        self.statusBar().showMessage(f"已读取 {path.name}，用时 {seconds * 1000:.0f} ms", 5000)
+
+    def collect_settings(self):
+        return {
+            'global_settings': self.global_settings_widget.get_settings(),
+            'tracks': [track.get_settings() for track in self.tracks_container.tracks()]
+        }
+
+    def mark_dirty(self):
+        """设置变化，稍后自动保存"""
+        self.dirty = True
+        self.autosave_timer.start()
+
+    def save_settings(self):
+        """设置变化后保存：界面线程只收集设置，序列化、比较和写入在保存线程中进行"""
+        fmt = self.global_settings_widget.board_format
+        if not self.dirty and Path(BOARD_FILES[fmt]).exists():
+            return
+        if instruments.enabled:
+            instruments.count("save_settings")
+        self.dirty = False
+        self.saver.submit(self._write_board, self.collect_settings(), fmt, time.perf_counter())
+
+    def _remember_board(self, data, fmt):
+        self.board_text = dump_board(data, fmt)
+
+    def _write_board(self, data, fmt, start):
+        """在保存线程中调用，只在内容变化时写入，先写临时文件再替换"""
+        text = dump_board(data, fmt)
+        if text == self.board_text and Path(BOARD_FILES[fmt]).exists():
+            return
+        try:
+            write_atomic(BOARD_FILES[fmt], text)
+        except OSError as e:
+            print(f"保存配置失败: {e}")
+            return
+        self.board_text = text
+        self.board_saved_sign.emit(BOARD_FILES[fmt], time.perf_counter() - start)
+
+    def on_board_saved(self, name, seconds):
+        self.statusBar().showMessage(f"已保存 {name}，用时 {seconds * 1000:.0f} ms", 2000)
+
+    def setup_connections(self):
+        self.global_settings_widget.stop_all_tracks_sign.connect(self.stop_all_tracks)
+        # 快捷键索引
+        self.global_settings_widget.stop_all_shortcut.shortcutChanged.connect(self.index_timer.start)
+        self.tracks_container.tracks_changed.connect(self.index_timer.start)
+        self.tracks_container.shortcut_changed.connect(self.index_timer.start)
+        # 音频线程的设置快照
+        self.engine.hold_mode = self.global_settings_widget.hold_radio.isChecked()
+        self.global_settings_widget.hold_radio.toggled.connect(self.on_hold_mode_changed)
+        self.tracks_container.tracks_changed.connect(self.sync_engine_tracks)
+        # 后台加载
+        self.tracks_container.loader.finished.connect(self.on_sounds_loaded)
+        self.tracks_container.loader.finished.connect(self.remote.invalidate_names)
+        # mixer 重新初始化
+        self.global_settings_widget.device_changed_sign.connect(self.change_device)
+        self.global_settings_widget.normalize_changed_sign.connect(self.update_volumes)
+        self.calibration_done_sign.connect(self.on_calibration_done)
+        self.mixer_reset_sign.connect(self.reload_sounds)
+        self.device_switched_sign.connect(self.on_device_switched)
+        # 远程控制
+        self.global_settings_widget.remote_changed_sign.connect(self.on_remote_changed)
+        self.remote_volume_sign.connect(self.on_remote_volume)
+        # 自动保存
+        self.global_settings_widget.settings_changed.connect(self.mark_dirty)
+        self.tracks_container.settings_changed.connect(self.mark_dirty)
+        self.board_saved_sign.connect(self.on_board_saved)
+
+    def rebuild_shortcut_index(self):
+        """重建快捷键索引，'停止所有'排在最前"""
+        if instruments.enabled:
+            instruments.count("rebuild_shortcut_index")
+        bindings = [(self.global_settings_widget.stop_all_shortcut.current_shortcut, STOP_ALL)]
+        for track_widget in self.tracks_container.tracks():
+            bindings.append((track_widget.shortcut, track_widget.audio_track))
+        self.dispatcher.shortcut_index.rebuild(bindings)
+
+    def sync_engine_tracks(self):
+        """更新音频线程的音轨快照"""
+        self.engine.tracks = tuple(track_widget.audio_track
+                                   for track_widget in self.tracks_container.tracks())
+
+    def update_volumes(self):
+        """标准化设置变化后重新计算所有音轨的音量"""
+        for track_widget in self.tracks_container.tracks():
+            track_widget.audio_track.update_volume()
+
+    def on_remote_changed(self):
+        """按全局设置启动或停止远程控制"""
+        settings = self.global_settings_widget
+        self.remote.stop()
+        if not settings.remote_check.isChecked():
+            return
+        self.remote.allowed_origins = set(settings.remote_origins)
+        try:
+            self.remote.start(settings.remote_udp_port, settings.remote_ws_port)
+        except OSError as e:
+            print(f"远程控制启动失败: {e}")
+            self.statusBar().showMessage(f"远程控制启动失败: {e}", 5000)
+            return
+        self.statusBar().showMessage(
+            f"远程控制：UDP {settings.remote_udp_port}，WebSocket {settings.remote_ws_port}", 5000)
+
+    def on_remote_volume(self, audio_track, db):
+        track_widget = self.tracks_container.find(audio_track)
+        if track_widget is not None:
+            track_widget.set_volume(max(-60, min(0, round(db))))
+
+    def on_hold_mode_changed(self, checked):
+        self.engine.hold_mode = checked
+
+    def on_sounds_loaded(self, count, seconds):
+        stats = sound_pool.stats()
+        self.statusBar().showMessage(
+            f"已加载 {count} 个音频，用时 {seconds:.2f} 秒，"
+            f"共享命中率 {stats['hit_rate']:.0%}，节省 {stats['bytes_saved'] / 1024 / 1024:.1f} MB", 5000)
+
+
+    def change_device(self, device_name):
+        self.engine.submit_control(self._reinit_mixer, device_name)
+
+    def _reinit_mixer(self, device_name=None):
+        """在音频线程中按当前参数重新初始化 mixer，尽量不重新加载文件"""
+        result = switch_device(mixer_profile, device_name, self.engine.tracks)
+        if result is None:
+            # mixer 格式变化，保留的 PCM 不能直接使用
+            self.mixer_reset_sign.emit()
+        else:
+            self.device_switched_sign.emit(*result)
+
+    def on_device_switched(self, seconds, resumed):
+        self.statusBar().showMessage(
+            f"已切换音频设备，用时 {seconds * 1000:.0f} ms，恢复 {resumed} 个播放", 5000)
+
+    def reload_sounds(self):
+        """mixer 重新初始化后重新加载所有音轨"""
+        sound_pool.clear()
+        for track_widget in self.tracks_container.tracks():
+            # 旧的通道已经失效，在音频线程中清理
+            self.engine.submit(track_widget.audio_track.cleanup_channels)
+            if track_widget.path:
+                track_widget.set_file(track_widget.path)
+
+    def run_calibration(self):
+        """在音频线程中测量各缓冲大小的延迟"""
+        self.statusBar().showMessage("正在校准延迟...")
+        self.engine.stop_all()
+        self.engine.submit_control(self._calibrate)
+
+    def _calibrate(self):
+        self.calibration_done_sign.emit(calibrate(mixer_profile))
+
+    def on_calibration_done(self, results):
+        self.statusBar().clearMessage()
+        rows = []
+        for r in results:
+            if "error" in r:
+                rows.append(f"<tr><td>{r['buffer']}</td><td colspan=3>{r['error']}</td></tr>")
+            else:
+                rows.append(f"<tr><td>{r['buffer']}</td><td>{r['buffer_ms']:.1f} ms</td>"
+                            f"<td>{r['p50_ms']:.1f} / {r['max_ms']:.1f} ms</td>"
+                            f"<td>{'稳定' if r['ok'] else '不稳定'}</td></tr>")
+        best = recommend_buffer(results)
+        text = ("<table><tr><th>缓冲</th><th>缓冲时长</th><th>延迟 中位/最大</th><th></th></tr>"
+                + "".join(rows) + "</table>")
+        buffer = mixer_profile.buffer
+        if best is None:
+            QMessageBox.information(self, "延迟校准", text + "<p>没有稳定的缓冲大小，保持当前设置</p>")
+        elif QMessageBox.question(
+                self, "延迟校准",
+                text + f"<p>当前缓冲 {buffer}，推荐 {best}，是否应用？</p>"
+                ) == QMessageBox.StandardButton.Yes:
+            buffer = best
+        mixer_profile.buffer = buffer
+        self.mark_dirty()
+        # 校准过程中 mixer 被重新初始化过，需要重新加载
+        self.engine.submit_control(self._reinit_mixer, mixer_profile.devicename)
+
+    def setup_keyboard_hook(self):
+        """设置全局键盘钩子"""
+        keyboard.hook(self._on_key_event)
+
+    def _on_key_event(self, event):
+        """处理键盘事件"""
+        if event.event_type in (keyboard.KEY_DOWN, keyboard.KEY_UP):
+            trace = instruments.start(event.time) if instruments.enabled else None
+            self.dispatcher.key_event(event.name, event.event_type == keyboard.KEY_DOWN, trace)
+
+    def trigger_track(self, audio_track: AudioTrack, is_key_down):
+        """触发音轨播放或停止，只向音频线程发送命令"""
+        self.engine.trigger(audio_track, is_key_down)
+
+    def stop_all_tracks(self):
+        """停止所有音轨播放"""
+        self.engine.stop_all()
+
+
+    def closeEvent(self, event):
+        keyboard.unhook_all()  # 移除键盘钩子
+        self.remote.stop()     # 关闭远程控制端口
+        self.engine.close()    # 结束音频线程
+        self.tracks_container.loader.shutdown()  # 丢弃未完成的加载
+        pygame.mixer.quit()    # 关闭音频系统
+        # 窗口关闭时保存设置，等待写入完成
+        self.autosave_timer.stop()
+        self.save_settings()
+        self.saver.shutdown(wait=True)
+        super().closeEvent(event)
+
+    def create_menu_bar(self):
+        # 创建菜单栏
+        menubar = self.menuBar()# 创建帮助菜单
+        tools_menu = menubar.addMenu('工具')
+        calibrate_action = tools_menu.addAction('延迟校准')
+        calibrate_action.triggered.connect(self.run_calibration)
+        self.diagnostics_action = tools_menu.addAction('诊断面板')
+        self.diagnostics_action.setCheckable(True)
+
+        help_menu = menubar.addMenu('帮助')
+
+        # 创建关于动作
+        about_action = help_menu.addAction('关于')
+        about_action.triggered.connect(self.show_about_dialog)
+
+        # 创建使用说明动作
+        manual_action = help_menu.addAction('使用说明')
+        manual_action.triggered.connect(self.show_manual_dialog)
+
+    def show_about_dialog(self):
+        about_text = """
+        <h3>音频播放器</h3>
+        <p>版本: 1.0</p>
+        <p>作者: sch246</p>
+        <p>联系方式: sch246@qq.com</p>
+        <p>Copyright © 2024 All Rights Reserved</p>
+        """
+        QMessageBox.about(self, "关于", about_text)
+
+    def show_manual_dialog(self):
+        manual_text = """
+        <h3>使用说明</h3>
+        <p><b>播放模式：</b></p>
+        <ul>
+            <li>重叠模式：每次点击从头播放，不终止之前的播放</li>
+            <li>单点模式：每次点击从头播放</li>
+            <li>暂停模式：停止播放时暂停内容</li>
+            <li>终止模式：停止播放时终止内容（默认选择）</li>
+        </ul>
+        <p><b>快捷操作：</b></p>
+        <table>
+            <tr><td>可以拖入音频文件-----------------</td></tr>
+            <tr><td>tab 和 shift+tab</td><td>切换选择</td></tr>
+            <tr><td>左键拖拽/上下方向键</td><td>移动音轨</td></tr>
+            <tr><td>Delete</td><td>删除音轨</td></tr>
+            <tr><td>Enter</td><td>播放/停止</td></tr>
+            <tr><td>左键方块</td><td>播放/暂停/继续</td></tr>
+            <tr><td>右键方块</td><td>停止</td></tr>
+            <tr><td>双击名称</td><td>选择音频</td></tr>
+            <tr><td>右键/Space</td><td>展开/折叠</td></tr>
+            <tr><td>双击右键</td><td>展开目标并折叠其它</td></tr>
+        </table>
+        """
+        msg = QMessageBox(self)
+        msg.setWindowTitle("使用说明")
+        msg.setText(manual_text)
+        msg.setTextFormat(Qt.TextFormat.RichText)
+        msg.exec()
+
+
@@ -0,0 +1,436 @@
+"""本机远程触发：UDP（OSC 或文本）和 WebSocket
+
+命令（音轨为从 1 开始的序号，或文件名/不含扩展名的文件名）:
+
+    /trigger <音轨> [按下=1]   与快捷键相同，松开只在按住模式下有效
+    /stop <音轨>
+    /stop_all
+    /volume <音轨> <dB>
+    /ping [任意参数]           原样回复 /pong，客户端据此测量往返延迟
+
+UDP 数据报可以是 OSC 消息，也可以是 "/trigger 3" 形式的文本；
+WebSocket 文本帧为同样的文本或 JSON ({"cmd": "trigger", "track": 3, "down": true})，二进制帧为 OSC。
+命令在接收线程中解析后放入音频命令队列，不经过界面线程。
+浏览器发起的 WebSocket 连接带有 Origin 头，只接受 allowed_origins 中的来源，
+避免任意网页通过本机端口触发
+"""
+import base64
+import hashlib
+import json
+import math
+import shlex
+import socket
+import struct
+import threading
+import time
+from pathlib import Path
+
+from .instruments import RingHistogram
+
+HOST = "127.0.0.1"  # 只接受本机连接
+UDP_PORT = 9000
+WS_PORT = 9001
+POLL_TIMEOUT = 0.5  # 接收线程检查是否停止的间隔(秒)
+WS_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+MAX_HEADER = 8192
+MAX_MESSAGE = 1 << 16
+
+
+def _pad(data: bytes) -> bytes:
+    """OSC 字符串以 0 结尾并补齐到 4 字节"""
+    return data + b"\0" * (4 - len(data) % 4)
+
+
+def osc_encode(address, *args) -> bytes:
+    tags = ","
+    payload = b""
+    for arg in args:
+        if isinstance(arg, bool) or isinstance(arg, int):
+            tags += "i"
+            payload += struct.pack(">i", int(arg))
+        elif isinstance(arg, float):
+            tags += "f"
+            payload += struct.pack(">f", arg)
+        else:
+            tags += "s"
+            payload += _pad(str(arg).encode("utf-8"))
+    return _pad(address.encode("utf-8")) + _pad(tags.encode("ascii")) + payload
+
+
+def _read_string(data, offset):
+    end = data.index(b"\0", offset)
+    return data[offset:end].decode("utf-8"), (end // 4 + 1) * 4
+
+
+def osc_decode(data: bytes):
+    """返回 (地址, 参数列表)，只支持 i/f/s/T/F 类型"""
+    address, offset = _read_string(data, 0)
+    if offset >= len(data):
+        return address, []
+    tags, offset = _read_string(data, offset)
+    args = []
+    for tag in tags[1:]:
+        if tag == "i":
+            args.append(struct.unpack_from(">i", data, offset)[0])
+            offset += 4
+        elif tag == "f":
+            args.append(struct.unpack_from(">f", data, offset)[0])
+            offset += 4
+        elif tag == "s":
+            value, offset = _read_string(data, offset)
+            args.append(value)
+        elif tag in "TF":
+            args.append(tag == "T")
+        else:
+            raise ValueError(f"不支持的 OSC 类型: {tag}")
+    return address, args
+
+
+def _number(token):
+    for kind in (int, float):
+        try:
+            return kind(token)
+        except ValueError:
+            pass
+    return token
+
+
+def parse_text(text: str):
+    """"/trigger 3" 或 JSON 文本，返回 (地址, 参数列表)"""
+    text = text.strip()
+    if text.startswith("{"):
+        message = json.loads(text)
+        if not isinstance(message, dict):
+            raise ValueError("JSON 命令必须是对象")
+        cmd = message.get("cmd", "")
+        if not isinstance(cmd, str):
+            raise ValueError(f"cmd 必须是字符串: {cmd!r}")
+        address = cmd if cmd.startswith("/") else "/" + cmd
+        if address == "/ping":
+            return address, [message.get("id")]
+        args = [message[key] for key in ("track", "down", "db") if key in message]
+        return address, args
+    tokens = shlex.split(text)
+    if not tokens:
+        raise ValueError("空命令")
+    return tokens[0], [_number(token) for token in tokens[1:]]
+
+
+def encode_reply(address, args, request):
+    """按请求的格式编码回复，request 为收到的数据"""
+    if isinstance(request, bytes) and b"\0" in request:
+        return osc_encode(address, *args)
+    if isinstance(request, bytes):
+        request = request.decode("utf-8")
+    if request.lstrip().startswith("{"):
+        return json.dumps({"cmd": address.strip("/"), "id": args[0] if args else None}).encode("utf-8")
+    return " ".join([address] + [str(a) for a in args]).encode("utf-8")
+
+
+class RemoteServer:
+    """接收远程命令并放入音频命令队列
+
+    engine: AudioEngine，音轨从 engine.tracks 快照中查找
+    volume_callback(track, db): 在界面线程同步音量设置，为空时直接在音频线程设置
+    allowed_origins: 允许的浏览器来源 (如 "http://localhost:8080")，不带 Origin 的客户端总是允许
+    """
+    def __init__(self, engine, volume_callback=None):
+        self.engine = engine
+        self.volume_callback = volume_callback
+        self.running = False
+        self.udp_socket = None
+        self.ws_socket = None
+        self.threads = []
+        self.connections = set()
+        self.lock = threading.Lock()
+        self.allowed_origins = set()
+        self.names = {}  # 小写文件名/不含扩展名的文件名 -> 音轨
+        self.named_tracks = None  # 建立名称索引时的 engine.tracks，None 时需要重建
+        # 指标
+        self.received = 0
+        self.errors = 0
+        self.handle_time = RingHistogram()  # 收到到放入队列 (ms)
+
+    def start(self, udp_port=UDP_PORT, ws_port=WS_PORT, host=HOST):
+        """打开端口并开始接收，端口为 0 时不启用该协议，失败时抛出 OSError"""
+        if self.running:
+            return
+        self.running = True
+        try:
+            if udp_port:
+                self.udp_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+                self.udp_socket.bind((host, udp_port))
+                self.udp_socket.settimeout(POLL_TIMEOUT)
+                self._spawn(self._udp_loop, "RemoteUDP")
+            if ws_port:
+                self.ws_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+                self.ws_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+                self.ws_socket.bind((host, ws_port))
+                self.ws_socket.listen()
+                self.ws_socket.settimeout(POLL_TIMEOUT)
+                self._spawn(self._accept_loop, "RemoteWebSocket")
+        except OSError:
+            self.stop()
+            raise
+
+    def stop(self):
+        self.running = False
+        with self.lock:
+            sockets = [self.udp_socket, self.ws_socket, *self.connections]
+            threads, self.threads = self.threads, []
+        self.udp_socket = self.ws_socket = None
+        for sock in sockets:
+            if sock is None:
+                continue
+            try:
+                # close() 不会唤醒阻塞在 accept/read 中的线程，shutdown 会；
+                # 不支持的平台上由 POLL_TIMEOUT 兜底
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            sock.close()
+        # 所有线程共用一个期限，连接数多时也不会让界面等待更久
+        deadline = time.monotonic() + POLL_TIMEOUT * 2
+        for thread in threads:
+            if thread is not threading.current_thread():
+                thread.join(max(0.0, deadline - time.monotonic()))
+
+    def stats(self):
+        return {
+            "running": self.running,
+            "received": self.received,
+            "errors": self.errors,
+            "clients": len(self.connections),
+            "handle_ms": self.handle_time.summary(),
+        }
+
+    def count(self, name):
+        """接收线程各自计数，加锁避免丢失"""
+        with self.lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def _spawn(self, target, name, *args):
+        thread = threading.Thread(target=target, args=args, name=name, daemon=True)
+        with self.lock:
+            self.threads.append(thread)
+        thread.start()
+
+    # 命令
+
+    def resolve(self, ref):
+        """按序号（从 1 开始）或文件名查找音轨"""
+        tracks = self.engine.tracks
+        if isinstance(ref, str) and ref.isdigit():
+            ref = int(ref)
+        if isinstance(ref, int) and not isinstance(ref, bool):
+            return tracks[ref - 1] if 1 <= ref <= len(tracks) else None
+        names = self.names
+        if tracks is not self.named_tracks:
+            # 只在音轨快照变化或文件加载完成后重建，找不到的名称不会触发重建
+            names = {}
+            for track in tracks:
+                if track.path:
+                    path = Path(track.path)
+                    names.setdefault(path.name.lower(), track)
+                    names.setdefault(path.stem.lower(), track)
+            self.names, self.named_tracks = names, tracks
+        return names.get(str(ref).lower())
+
+    def invalidate_names(self):
+        """音轨的文件变化后调用，下次按名称查找时重建索引"""
+        self.named_tracks = None
+
+    def handle(self, address, args):
+        """执行一条命令，返回需要回复的 (地址, 参数)，不需要回复时返回 None"""
+        received = time.perf_counter()
+        self.count("received")
+        command = address.strip("/").lower()
+        if command == "ping":
+            return "/pong", args
+        if command == "stop_all":
+            self.engine.stop_all()
+        elif command in ("trigger", "stop", "volume"):
+            if not args:
+                raise ValueError(f"{address} 需要音轨参数")
+            track = self.resolve(args[0])
+            if track is None:
+                raise ValueError(f"找不到音轨: {args[0]}")
+            if command == "trigger":
+                is_key_down = bool(args[1]) if len(args) > 1 else True
+                # 与快捷键一致，松开只在按住模式下有效
+                if is_key_down or self.engine.hold_mode:
+                    self.engine.trigger(track, is_key_down)
+            elif command == "stop":
+                self.engine.submit(track.stop)
+            else:
+                if len(args) < 2:
+                    raise ValueError("/volume 需要 dB 参数")
+                db = float(args[1])
+                if not math.isfinite(db):
+                    raise ValueError(f"无效的音量: {args[1]}")
+                if self.volume_callback:
+                    self.volume_callback(track, db)
+                else:
+                    self.engine.submit(track.set_volume, db)
+        else:
+            raise ValueError(f"未知命令: {address}")
+        self.handle_time.add((time.perf_counter() - received) * 1000)
+        return None
+
+    def process(self, data, binary):
+        """解析并执行一条消息，返回回复的数据，不需要回复时返回 None
+
+        任何异常都只计为无效消息，不会结束接收线程
+        """
+        try:
+            if binary:
+                address, args = osc_decode(data)
+            else:
+                if isinstance(data, bytes):
+                    data = data.decode("utf-8")
+                address, args = parse_text(data)
+            reply = self.handle(address, args)
+            return None if reply is None else encode_reply(*reply, data)
+        except Exception as e:
+            self.count("errors")
+            print(f"远程命令无效: {e!r}")
+            return None
+
+    # UDP
+
+    def _udp_loop(self):
+        sock = self.udp_socket
+        while self.running:
+            try:
+                data, peer = sock.recvfrom(MAX_MESSAGE)
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+            if not self.running:
+                break
+            reply = self.process(data, b"\0" in data)
+            if reply is not None:
+                try:
+                    sock.sendto(reply, peer)
+                except OSError:
+                    pass
+
+    # WebSocket
+
+    def _accept_loop(self):
+        sock = self.ws_socket
+        while self.running:
+            try:
+                conn, _ = sock.accept()
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+            conn.settimeout(None)
+            conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            with self.lock:
+                self.connections.add(conn)
+            self._spawn(self._ws_connection, "RemoteWebSocketClient", conn)
+
+    def _ws_connection(self, conn):
+        try:
+            reader = conn.makefile("rb")
+            if not self._ws_handshake(conn, reader):
+                return
+            while self.running:
+                frame = self._ws_read_message(conn, reader)
+                if frame is None or not self.running:
+                    break
+                opcode, payload = frame
+                reply = self.process(payload, opcode == 2)
+                if reply is not None:
+                    self._ws_send(conn, opcode, reply)
+        except (OSError, ValueError):
+            pass
+        finally:
+            with self.lock:
+                self.connections.discard(conn)
+                # 结束的连接线程不再保留，stop() 已取走列表时不在其中
+                if threading.current_thread() in self.threads:
+                    self.threads.remove(threading.current_thread())
+            conn.close()
+
+    def _ws_handshake(self, conn, reader):
+        header = b""
+        while not header.endswith(b"\r\n\r\n"):
+            line = reader.readline(MAX_HEADER)
+            if not line or len(header) > MAX_HEADER:
+                return False
+            header += line
+        fields = {}
+        for line in header.decode("latin-1").split("\r\n")[1:]:
+            name, _, value = line.partition(":")
+            fields[name.strip().lower()] = value.strip()
+        key = fields.get("sec-websocket-key")
+        if key is None:
+            conn.sendall(b"HTTP/1.1 400 Bad Request\r\nContent-Length: 0\r\n\r\n")
+            return False
+        # 浏览器总是发送 Origin，本机的其它程序一般不发送
+        origin = fields.get("origin")
+        if origin is not None and origin not in self.allowed_origins:
+            self.count("errors")
+            print(f"拒绝来自 {origin} 的远程连接")
+            conn.sendall(b"HTTP/1.1 403 Forbidden\r\nContent-Length: 0\r\n\r\n")
+            return False
+        accept = base64.b64encode(hashlib.sha1((key + WS_GUID).encode()).digest()).decode()
+        conn.sendall(("HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\n"
+                      f"Connection: Upgrade\r\nSec-WebSocket-Accept: {accept}\r\n\r\n").encode())
+        return True
+
+    def _ws_read_message(self, conn, reader):
+        """读取一条完整消息，返回 (opcode, 数据)，连接关闭时返回 None"""
+        opcode = None
+        parts = []
+        total = 0  # 分片累计长度，与单帧一样不超过 MAX_MESSAGE
+        while True:
+            head = reader.read(2)
+            if len(head) < 2:
+                return None
+            fin, op = head[0] & 0x80, head[0] & 0x0F
+            length = head[1] & 0x7F
+            if length == 126:
+                length = struct.unpack(">H", reader.read(2))[0]
+            elif length == 127:
+                length = struct.unpack(">Q", reader.read(8))[0]
+            if op in (0, 1, 2):
+                total += length
+            if length > MAX_MESSAGE or total > MAX_MESSAGE:
+                self.count("errors")
+                self._ws_send(conn, 8, struct.pack(">H", 1009))  # 消息过大
+                return None
+            mask = reader.read(4) if head[1] & 0x80 else None
+            payload = reader.read(length)
+            if mask:
+                # 整段按整数异或，比逐字节快
+                key = (mask * (length // 4 + 1))[:length]
+                payload = (int.from_bytes(payload, "big") ^ int.from_bytes(key, "big")).to_bytes(length, "big")
+            if op == 8:
+                self._ws_send(conn, 8, payload[:2])
+                return None
+            if op == 9:
+                self._ws_send(conn, 10, payload)
+                continue
+            if op == 10:
+                continue
+            if op != 0:
+                opcode = op
+            parts.append(payload)
+            if fin:
+                return opcode, b"".join(parts)
+
+    @staticmethod
+    def _ws_send(conn, opcode, payload):
+        length = len(payload)
+        if length < 126:
+            head = struct.pack(">BB", 0x80 | opcode, length)
+        elif length < 1 << 16:
+            head = struct.pack(">BBH", 0x80 | opcode, 126, length)
+        else:
+            head = struct.pack(">BBQ", 0x80 | opcode, 127, length)
+        conn.sendall(head + payload)
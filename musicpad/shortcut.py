@@ -2,6 +2,8 @@ import keyboard
 from PyQt6.QtWidgets import (QLabel,QFrame)
 from PyQt6.QtCore import Qt, pyqtSignal
 
+from .dispatch import normalize_key
+
 
 class ShortcutCatcher(QLabel):
     shortcutChanged = pyqtSignal(str)
@@ -37,11 +39,7 @@ class ShortcutCatcher(QLabel):
         if not self.capturing:
             return
 
-        if len(event.name) == 1:
-            # 如果是组合键，将其转换为可读形式
-            key = event.name.replace(" ", "_").upper()
-        else:
-            key = event.name.replace(" ", "_")
+        key = normalize_key(event.name)
 
         if event.event_type == keyboard.KEY_DOWN:
             if key == "esc":
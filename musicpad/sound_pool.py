@@ -0,0 +1,202 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pygame
+
+from .pcm_cache import pcm_cache
+
+
+class SoundPool:
+    """进程内共享的声音池
+
+    同一文件（路径/修改时间/大小相同）只解码一次，多个音轨共享同一个 Sound，
+    按引用计数在最后一个音轨释放时丢弃；按播放段切出的声音也同样共享
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.entries = {}   # 文件标识 -> [Sound, 引用数, 字节数]
+        self.keys = {}      # Sound -> 文件标识
+        self.loading = {}   # 文件标识 -> threading.Event，同一文件正在解码
+        self.trims = {}     # (Sound, (起始帧, 结束帧)) -> [切好的 Sound, 引用数, Future]
+        self.trimmer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="SoundTrimmer")
+        self.hits = 0
+        self.misses = 0
+        self.bytes_saved = 0
+
+    @staticmethod
+    def identity(file_path):
+        """文件标识，文件不存在时返回 None"""
+        try:
+            path = Path(file_path).resolve()
+            stat = path.stat()
+        except OSError:
+            return None
+        return (str(path), stat.st_mtime_ns, stat.st_size)
+
+    def acquire(self, file_path, decode):
+        """获取共享的 Sound，未命中时调用 decode(file_path) 解码，失败返回 None"""
+        key = self.identity(file_path)
+        if key is None:
+            return None
+        while True:
+            with self.lock:
+                entry = self.entries.get(key)
+                if entry:
+                    entry[1] += 1
+                    self.hits += 1
+                    self.bytes_saved += entry[2]
+                    return entry[0]
+                event = self.loading.get(key)
+                if event is None:
+                    # 由本线程解码
+                    event = self.loading[key] = threading.Event()
+                    self.misses += 1
+                    break
+            # 其它线程正在解码同一文件
+            event.wait()
+        try:
+            sound = decode(file_path)
+            with self.lock:
+                if sound is not None:
+                    self.entries[key] = [sound, 1, self.sound_bytes(sound)]
+                    self.keys[sound] = key
+        finally:
+            with self.lock:
+                del self.loading[key]
+            event.set()
+        return sound
+
+    def release(self, sound):
+        """释放一次引用，不在池中的音源忽略"""
+        with self.lock:
+            key = self.keys.get(sound)
+            if key is None:
+                return
+            entry = self.entries[key]
+            entry[1] -= 1
+            if entry[1] <= 0:
+                del self.entries[key]
+                del self.keys[sound]
+
+    def acquire_trim(self, sound, frames, done, wait=False):
+        """获取 sound 在 frames 范围内的声音，同一声音和播放段只复制一次
+
+        在切分线程中复制 PCM，完成后调用 done(切好的声音)，失败时为 None；
+        已切好时立即调用。wait 为真时在返回前完成（音频线程、离线渲染使用）
+        """
+        key = (sound, frames)
+        with self.lock:
+            entry = self.trims.get(key)
+            if entry is None:
+                entry = self.trims[key] = [None, 0, None]
+                entry[2] = self.trimmer.submit(self._trim, entry, sound, frames)
+            entry[1] += 1
+            future = entry[2]
+        if wait:
+            future.result()
+        future.add_done_callback(lambda f: done(f.result()))
+
+    def release_trim(self, sound, frames):
+        """释放一次切好的声音"""
+        with self.lock:
+            entry = self.trims.get((sound, frames))
+            if entry is None:
+                return
+            entry[1] -= 1
+            if entry[1] <= 0:
+                del self.trims[(sound, frames)]
+
+    @staticmethod
+    def _trim(entry, sound, frames):
+        # 切分线程
+        try:
+            array = pygame.sndarray.samples(sound)
+            trimmed = pygame.mixer.Sound(buffer=array[frames[0]:frames[1]])
+        except (pygame.error, ValueError) as e:
+            print(f"裁剪声音失败: {e}")
+            return None
+        entry[0] = trimmed
+        return trimmed
+
+    def wait_trims(self):
+        """等待已请求的裁剪完成，回调也已执行"""
+        self.trimmer.submit(lambda: None).result()
+
+    def snapshot(self, keep=()):
+        """在 mixer 关闭前保留各共享声音的 PCM，返回 文件标识 -> PCM
+
+        已在磁盘缓存中的文件不复制，值为 None，重建时直接从缓存映射；
+        keep 中的声音（正在播放的）总是保留 PCM
+        """
+        with self.lock:
+            items = [(key, entry[0]) for key, entry in self.entries.items()]
+        raws = {}
+        for key, sound in items:
+            if sound not in keep and pcm_cache.has(key[0]) and self.identity(key[0]) == key:
+                raws[key] = None
+            else:
+                raws[key] = sound.get_raw()
+        return raws
+
+    def rebuild(self, raws, replace):
+        """mixer 重新初始化后逐个重建声音，每个重建后调用 replace(旧声音, 新声音, PCM)
+
+        raws 中的 PCM 用完即丢弃，调用方在 replace 中换掉对旧声音的引用，
+        旧声音随之释放，同一时刻只多占一个文件的内存
+        """
+        with self.lock:
+            keys = list(self.entries)
+        for key in keys:
+            if key not in raws:
+                continue
+            raw = raws.pop(key)
+            new = pcm_cache.load(key[0]) if raw is None else pygame.mixer.Sound(buffer=raw)
+            if new is None:
+                try:
+                    new = pygame.mixer.Sound(key[0])
+                except pygame.error as e:
+                    print(f"重建声音失败: {e}")
+                    continue
+            with self.lock:
+                entry = self.entries.get(key)
+                if entry is None:
+                    continue
+                old = entry[0]
+                entry[0] = new
+                del self.keys[old]
+                self.keys[new] = key
+            replace(old, new, raw)
+            del old, raw
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.keys.clear()
+            self.trims.clear()
+
+    @staticmethod
+    def sound_bytes(sound):
+        """解码后 PCM 的字节数"""
+        mixer_format = pygame.mixer.get_init()
+        if not mixer_format:
+            return 0
+        freq, size, channels = mixer_format
+        return int(sound.get_length() * freq) * channels * (abs(size) // 8)
+
+    def stats(self):
+        requests = self.hits + self.misses
+        with self.lock:
+            loaded = sum(entry[2] for entry in self.entries.values())
+            count = len(self.entries)
+        return {
+            "entries": count,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / requests if requests else 0.0,
+            "bytes_saved": self.bytes_saved,
+            "bytes_loaded": loaded,
+        }
+
+
+sound_pool = SoundPool()
@@ -0,0 +1,338 @@
+import threading
+import time
+import wave
+import weakref
+from pathlib import Path
+
+import numpy as np
+import pygame
+
+try:
+    import soundfile
+except ImportError:  # 可选依赖，没有时只有 wav 能流式播放
+    soundfile = None
+
+CHUNK_SECONDS = 0.5   # 每块解码的时长
+STREAM_TIP = "按块解码播放，长音频不占用大量内存"
+UNAVAILABLE_TIP = "未安装 soundfile，只有 wav 能流式播放，该文件会完整解码\n安装: pip install soundfile"
+FEED_INTERVAL = 0.05  # 供给线程检查间隔
+
+
+class LinearResampler:
+    """分块线性插值重采样，块之间保持相位连续"""
+    def __init__(self, src_rate, dst_rate):
+        self.step = src_rate / dst_rate
+        self.pos = 0.0
+        self.prev = None
+
+    def process(self, x: np.ndarray) -> np.ndarray:
+        if self.step == 1:
+            return x
+        if self.prev is not None:
+            x = np.concatenate((self.prev, x))
+        self.prev = x[-1:]
+        n = len(x)
+        if n < 2:
+            return x[:0]
+        idx = np.arange(self.pos, n - 1, self.step)
+        self.pos = (idx[-1] + self.step if len(idx) else self.pos) - (n - 1)
+        i0 = idx.astype(np.int64)
+        frac = (idx - i0)[:, None].astype(np.float32)
+        return x[i0] * (1 - frac) + x[i0 + 1] * frac
+
+    def reset(self):
+        self.pos = 0.0
+        self.prev = None
+
+
+class _WaveFile:
+    """用标准库读取 PCM wav，接口与 soundfile.SoundFile 的用到部分一致"""
+    def __init__(self, path):
+        self.file = wave.open(str(path), "rb")
+        self.samplerate = self.file.getframerate()
+        self.channels = self.file.getnchannels()
+        self.width = self.file.getsampwidth()
+        if self.width not in (1, 2, 3, 4):
+            raise ValueError(f"不支持的采样宽度: {self.width}")
+
+    def read(self, frames):
+        data = self.file.readframes(frames)
+        if self.width == 1:
+            x = (np.frombuffer(data, np.uint8).astype(np.float32) - 128) / 128
+        elif self.width == 2:
+            x = np.frombuffer(data, "<i2").astype(np.float32) / 32768
+        elif self.width == 3:
+            b = np.frombuffer(data, np.uint8).reshape(-1, 3)
+            x = (b[:, 0].astype(np.int32) | (b[:, 1].astype(np.int32) << 8)
+                 | (b[:, 2].astype(np.int8).astype(np.int32) << 16)).astype(np.float32) / 8388608
+        else:
+            x = np.frombuffer(data, "<i4").astype(np.float32) / 2147483648
+        return x.reshape(-1, self.channels)
+
+    def seek(self, frame):
+        self.file.setpos(frame)
+
+    def close(self):
+        self.file.close()
+
+
+class StreamReader:
+    """按块解码音频文件，输出 mixer 格式的 PCM
+
+    span: 只读取 (起点秒, 终点秒) 这一段，rewind() 默认回到段的起点
+    """
+    def __init__(self, path, span=None):
+        if Path(path).suffix.lower() == ".wav":
+            self.file = _WaveFile(path)
+        else:
+            self.file = soundfile.SoundFile(str(path))
+        freq, size, channels = pygame.mixer.get_init()
+        if size != -16:
+            self.file.close()
+            raise ValueError("流式播放只支持 16 位 mixer")
+        self.channels = channels
+        self.frames = int(self.file.samplerate * CHUNK_SECONDS)
+        self.resampler = LinearResampler(self.file.samplerate, freq)
+        self.start = int(span[0] * self.file.samplerate) if span else 0
+        self.end = int(span[1] * self.file.samplerate) if span else None
+        self.pos = 0  # 文件中的当前帧
+
+    def read(self) -> bytes:
+        """读取下一块，结束时返回空 bytes"""
+        while True:
+            frames = self.frames if self.end is None else min(self.frames, self.end - self.pos)
+            if frames <= 0:
+                return b""
+            x = self.file.read(frames)
+            if not len(x):
+                return b""
+            self.pos += len(x)
+            if x.ndim == 1:
+                x = x[:, None]
+            x = self.resampler.process(x.astype(np.float32, copy=False))
+            if len(x):
+                break
+        # 声道映射
+        if x.shape[1] < self.channels:
+            x = np.repeat(x[:, :1], self.channels, axis=1)
+        elif x.shape[1] > self.channels:
+            x = x[:, :self.channels]
+        return (np.clip(x, -1, 1) * 32767).astype("<i2").tobytes()
+
+    def rewind(self, seconds=None):
+        """回到 seconds 秒处，为 None 时回到播放段的起点"""
+        self.pos = self.start if seconds is None else int(seconds * self.file.samplerate)
+        self.file.seek(self.pos)
+        self.resampler.reset()
+
+    def close(self):
+        self.file.close()
+
+
+class StreamVoice:
+    """一次流式播放，接口与 pygame Channel 用到的部分一致
+
+    span 不为空时只播放该段，循环时回到段的起点
+    """
+    def __init__(self, source: "StreamSource", loops: int, span=None):
+        self.source = source
+        self.loops = loops
+        self.reader = StreamReader(source.path, span)
+        self.channel = None
+        self.sounds = []  # 正在播放和排队的块
+        self.stopped = False
+        self.paused = False
+        self.lock = threading.Lock()  # 供给线程与音频线程互斥
+
+    def start(self, channel=None, position=0.0):
+        """在 channel（默认任意空闲通道）上从 position 秒处播放第一块并排队第二块，失败返回 False"""
+        if position:
+            self.reader.rewind(position)
+        sound = self._next_sound()
+        if sound is not None and channel is not None:
+            channel.play(sound)
+            self.channel = channel
+        elif sound is not None:
+            self.channel = sound.play()
+        if self.channel is None:
+            self._finish()
+            return False
+        self.channel.set_volume(self.source.volume)
+        self.sounds = [sound]
+        self.feed()
+        return True
+
+    def feed(self):
+        """在上一块开始播放后排队下一块，播放结束返回 False"""
+        with self.lock:
+            if self.stopped:
+                return False
+            if self.paused:
+                return True
+            if not self.get_busy():
+                self._finish()
+                return False
+            if self.channel.get_queue() is None:
+                current = self.channel.get_sound()
+                self.sounds = [s for s in self.sounds if s is current]
+                sound = self._next_sound()
+                if sound is not None:
+                    self.channel.queue(sound)
+                    self.sounds.append(sound)
+            return True
+
+    def _next_sound(self):
+        data = self.reader.read()
+        if not data and self.loops:
+            self.reader.rewind()
+            if self.loops > 0:
+                self.loops -= 1
+            data = self.reader.read()
+        if not data:
+            return None
+        return pygame.mixer.Sound(buffer=data)
+
+    def _finish(self):
+        self.stopped = True
+        self.sounds = []
+        self.reader.close()
+
+    def get_busy(self):
+        return (not self.stopped and self.channel is not None
+                and self.channel.get_busy()
+                and self.channel.get_sound() in self.sounds)
+
+    def get_sound(self):
+        return self.source
+
+    def pause(self):
+        self.paused = True
+        if self.channel:
+            self.channel.pause()
+
+    def unpause(self):
+        self.paused = False
+        if self.channel:
+            self.channel.unpause()
+
+    def stop(self):
+        with self.lock:
+            if self.stopped:
+                return
+            if self.get_busy():
+                self.channel.stop()
+            self._finish()
+
+    def set_volume(self, volume):
+        if self.channel:
+            self.channel.set_volume(volume)
+
+
+class StreamSource:
+    """流式播放的音源，可替代 pygame Sound 交给 AudioTrack
+
+    每次播放只在内存中保留两块 PCM，占用与文件长度无关
+    """
+    threshold_bytes = 50 * 1024 * 1024  # 文件超过该大小时自动流式播放，0 为禁用
+
+    def __init__(self, path):
+        self.path = str(path)
+        self.volume = 1.0
+        self.voices = weakref.WeakSet()
+        StreamReader(self.path).close()  # 检查能否解码
+        info_frames, info_rate = self._info()
+        self.length = info_frames / info_rate if info_rate else 0.0
+
+    @staticmethod
+    def supports(path):
+        return Path(path).suffix.lower() == ".wav" or soundfile is not None
+
+    @classmethod
+    def check_text(cls, path):
+        """流式播放复选框的 (文字, 提示)，该文件不能流式播放时注明"""
+        if not path or cls.supports(path):
+            return "流式播放", STREAM_TIP
+        return "流式播放（不可用）", UNAVAILABLE_TIP
+
+    @classmethod
+    def should_stream(cls, path):
+        """文件是否超过自动流式播放的大小"""
+        try:
+            return 0 < cls.threshold_bytes <= Path(path).stat().st_size
+        except OSError:
+            return False
+
+    def _info(self):
+        if Path(self.path).suffix.lower() == ".wav":
+            with wave.open(self.path, "rb") as f:
+                return f.getnframes(), f.getframerate()
+        info = soundfile.info(self.path)
+        return info.frames, info.samplerate
+
+    def play(self, loops=0, channel=None, position=0.0, span=None):
+        """开始一次流式播放，返回 StreamVoice，失败返回 None
+
+        span: 只播放 (起点秒, 终点秒) 这一段，position 应在段内
+        """
+        voice = StreamVoice(self, loops, span)
+        if not voice.start(channel, position):
+            return None
+        self.voices.add(voice)
+        feeder.add(voice)
+        return voice
+
+    def stop(self):
+        for voice in list(self.voices):
+            voice.stop()
+
+    def set_volume(self, volume):
+        self.volume = volume
+        for voice in list(self.voices):
+            voice.set_volume(volume)
+
+    def get_volume(self):
+        return self.volume
+
+    def get_length(self):
+        return self.length
+
+
+class StreamFeeder(threading.Thread):
+    """为所有流式播放排队下一块的线程，有播放时才启动"""
+    def __init__(self):
+        super().__init__(name="StreamFeeder", daemon=True)
+        self.lock = threading.Lock()
+        self.voices: list[StreamVoice] = []
+        self.wake = threading.Event()
+        self.started = False
+
+    def add(self, voice: StreamVoice):
+        with self.lock:
+            self.voices.append(voice)
+            start, self.started = not self.started, True
+        if start:
+            self.start()
+        self.wake.set()
+
+    def run(self):
+        while True:
+            self.wake.wait()
+            with self.lock:
+                voices = list(self.voices)
+            alive = []
+            for voice in voices:
+                try:
+                    if voice.feed():
+                        alive.append(voice)
+                except (pygame.error, OSError, RuntimeError) as e:
+                    print(f"流式播放失败: {e}")
+                    voice._finish()
+            with self.lock:
+                added = self.voices[len(voices):]
+                self.voices = alive + added
+                if not self.voices:
+                    self.wake.clear()
+            time.sleep(FEED_INTERVAL)
+
+
+feeder = StreamFeeder()
@@ -0,0 +1,80 @@
+from .audio_track import AudioTrack, STOP
+
+# 新建音轨的设置，旧配置中缺少的键仍按默认值读取
+NEW_TRACK = {"trim_silence": True}
+
+
+class TrackSettings:
+    """音轨的可保存设置，不依赖 Qt，可在没有控件时单独保存和读取"""
+    def __init__(self):
+        self.file_path = ""
+        self.volume = 0  # dB
+        self.shortcut = ""
+        self.mode = STOP
+        self.loop = False
+        self.mute_others = False
+        self.stream = False
+        self.priority = 0
+        self.max_voices = 0
+        self.fade_in = 0.0   # 秒
+        self.fade_out = 0.0  # 秒
+        self.duck_others = 0  # dB，0 为不闪避
+        self.trim_silence = False
+        self.trim_start = None  # 秒，None 为自动检测
+        self.trim_end = None
+
+    def to_dict(self):
+        return {
+            "file_path": self.file_path,
+            "volume": self.volume,
+            "shortcut": self.shortcut,
+            "mode": self.mode,
+            "loop": self.loop,
+            "mute_others": self.mute_others,
+            "stream": self.stream,
+            "priority": self.priority,
+            "max_voices": self.max_voices,
+            "fade_in": self.fade_in,
+            "fade_out": self.fade_out,
+            "duck_others": self.duck_others,
+            "trim_silence": self.trim_silence,
+            "trim_start": self.trim_start,
+            "trim_end": self.trim_end,
+        }
+
+    def load(self, settings):
+        """读取设置，文件路径由调用者加载"""
+        self.file_path = settings.get("file_path", "") or ""
+        # 音量范围 -60 ~ 0 dB
+        self.volume = max(-60, min(0, settings.get("volume", 0)))
+        self.shortcut = settings.get("shortcut", "") or ""
+        self.mode = settings.get("mode", STOP)
+        self.loop = settings.get("loop", False)
+        self.mute_others = settings.get("mute_others", False)
+        self.stream = settings.get("stream", False)
+        self.priority = settings.get("priority", 0)
+        self.max_voices = settings.get("max_voices", 0)
+        self.fade_in = settings.get("fade_in", 0.0)
+        self.fade_out = settings.get("fade_out", 0.0)
+        self.duck_others = max(-60, min(0, settings.get("duck_others", 0)))
+        self.trim_silence = settings.get("trim_silence", False)
+        self.trim_start = settings.get("trim_start")
+        self.trim_end = settings.get("trim_end")
+
+    def apply(self, audio_track: AudioTrack):
+        """把播放相关的设置同步到音轨"""
+        audio_track.set_volume(self.volume)
+        audio_track.mode = self.mode
+        audio_track.loop = self.loop
+        audio_track.mute_others = self.mute_others
+        audio_track.stream = self.stream
+        audio_track.priority = self.priority
+        audio_track.max_voices = self.max_voices
+        audio_track.fade_in = self.fade_in
+        audio_track.fade_out = self.fade_out
+        audio_track.duck_others = self.duck_others
+        # 裁剪点变化时才重新切分声音
+        trim = (self.trim_silence, self.trim_start, self.trim_end)
+        if trim != (audio_track.trim_silence, audio_track.trim_start, audio_track.trim_end):
+            audio_track.trim_silence, audio_track.trim_start, audio_track.trim_end = trim
+            audio_track.update_trim()
@@ -0,0 +1,662 @@
+from pathlib import Path
+
+from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QListView, QPushButton,
+    QStyledItemDelegate, QStyle, QLabel, QComboBox, QSlider, QSpinBox, QDoubleSpinBox, QCheckBox,
+    QFileDialog, QAbstractItemView)
+from PyQt6.QtCore import (Qt, pyqtSignal, QAbstractListModel, QModelIndex, QRect, QSize)
+from PyQt6.QtGui import QColor, QDragEnterEvent, QDropEvent, QMouseEvent
+
+from .audio_engine import AudioEngine
+from .audio_track import AudioTrack, OVERLAP, SINGLE, PAUSE, STOP
+from .loader import SoundLoader
+from .monitor import PlaybackMonitor
+from .shortcut import ShortcutCatcher
+from .stream import StreamSource
+from .track_settings import TrackSettings, NEW_TRACK
+from .waveform import resample_peaks, draw_waveform
+
+ROW_HEIGHT = 34      # 折叠时的行高
+EDITOR_HEIGHT = 190  # 展开的设置面板高度
+INDICATOR_SIZE = 16
+SHORTCUT_WIDTH = 150
+WAVE_WIDTH = 120
+STATUS_COLORS = {
+    (False, False): QColor("#aaaaaa"),
+    (True, False): QColor("#2ecc71"),
+    (True, True): QColor("#e6e219"),
+}
+
+
+class TrackRow:
+    """虚拟列表中的一个音轨：设置和播放状态，没有控件"""
+    container: "VirtualTracksContainer"
+
+    def __init__(self):
+        self.audio_track = AudioTrack()
+        self.settings = TrackSettings()
+        self.name = "未选择文件"
+        self.tooltip = "双击选择文件"
+        self.state = (False, False)  # (is_playing, is_paused)
+        self.is_expanded = False
+        self.position = -1  # 在模型中的行号，由 TrackListModel 维护
+        self.peaks = None
+        self.playhead = None
+        self.scaled = None  # 缩放到行宽度的包络 (宽度, 最小值, 最大值)
+
+    @property
+    def path(self):
+        return self.settings.file_path
+
+    @property
+    def shortcut(self):
+        return self.settings.shortcut
+
+    def get_settings(self):
+        return self.settings.to_dict()
+
+    def load_settings(self, settings):
+        self.settings.load(settings)
+        self.settings.apply(self.audio_track)
+        if self.settings.file_path:
+            self.set_file(self.settings.file_path)
+
+    def set_volume(self, db):
+        """从外部（远程控制）设置音量 (dB)，展开时同步到设置面板"""
+        self.settings.volume = db
+        self.audio_track.set_volume(db)
+        self.container.refresh_editor(self)
+        self.container.settings_changed.emit()
+
+    def set_file(self, file_path):
+        """在后台加载文件，有快捷键的音轨优先"""
+        self.settings.file_path = file_path
+        self.name = "加载中..."
+        self.tooltip = str(file_path)
+        priority = 1 if self.settings.shortcut else 0
+        self.peaks = self.scaled = None
+        self.container.loader.load(self.audio_track, file_path, priority,
+                                   self.on_file_loaded, self.on_analyzed)
+        self.container.row_changed(self)
+        self.container.settings_changed.emit()
+
+    def on_file_loaded(self, ok, seconds):
+        if ok:
+            name = Path(self.path).name
+            if len(name) > 40:
+                name = name[:37] + "..."
+            self.name = name
+            self.tooltip = f"{self.path}\n加载耗时: {seconds * 1000:.0f} ms"
+        else:
+            self.name = "加载失败"
+            self.tooltip = "文件加载失败"
+        self.container.row_changed(self)
+
+    def on_analyzed(self, analysis):
+        self.peaks = analysis.get("peaks")
+        self.scaled = None
+        self.container.row_changed(self)
+        self.container.refresh_editor(self)
+
+    def update_playhead(self, playhead):
+        if playhead != self.playhead:
+            self.playhead = playhead
+            self.container.row_changed(self)
+
+    def update_status(self, is_playing, is_paused):
+        self.state = (is_playing, is_paused)
+        self.container.row_changed(self)
+
+
+class TrackListModel(QAbstractListModel):
+    """音轨列表模型，每行是一个 TrackRow
+
+    每行记住自己的行号，增删和移动时更新，按行查找索引不需要遍历
+    """
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.rows: list[TrackRow] = []
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        row = self.rows[index.row()]
+        if role == Qt.ItemDataRole.DisplayRole:
+            return row.name
+        if role == Qt.ItemDataRole.ToolTipRole:
+            return row.tooltip
+        if role == Qt.ItemDataRole.UserRole:
+            return row
+        return None
+
+    def flags(self, index):
+        return (Qt.ItemFlag.ItemIsEnabled | Qt.ItemFlag.ItemIsSelectable
+                | Qt.ItemFlag.ItemIsEditable)
+
+    def append_rows(self, rows):
+        start = len(self.rows)
+        self.beginInsertRows(QModelIndex(), start, start + len(rows) - 1)
+        self.rows.extend(rows)
+        self._renumber(start, len(self.rows))
+        self.endInsertRows()
+
+    def remove_row(self, position):
+        self.beginRemoveRows(QModelIndex(), position, position)
+        row = self.rows.pop(position)
+        row.position = -1
+        self._renumber(position, len(self.rows))
+        self.endRemoveRows()
+        return row
+
+    def move_row(self, from_index, to_index):
+        """把一行移动到 to_index"""
+        if from_index == to_index:
+            return
+        destination = to_index if to_index < from_index else to_index + 1
+        self.beginMoveRows(QModelIndex(), from_index, from_index, QModelIndex(), destination)
+        self.rows.insert(to_index, self.rows.pop(from_index))
+        self._renumber(min(from_index, to_index), max(from_index, to_index) + 1)
+        self.endMoveRows()
+
+    def _renumber(self, start, end):
+        for position in range(start, end):
+            self.rows[position].position = position
+
+    def index_of(self, row: TrackRow):
+        """行所在的索引，已移除的行返回无效索引"""
+        return self.index(row.position) if row.position >= 0 else QModelIndex()
+
+    def row_changed(self, row: TrackRow):
+        index = self.index_of(row)
+        if index.isValid():
+            self.dataChanged.emit(index, index)
+
+
+def indicator_rect(rect: QRect):
+    """状态指示方块的位置"""
+    return QRect(rect.x() + 6, rect.y() + (ROW_HEIGHT - INDICATOR_SIZE) // 2,
+                 INDICATOR_SIZE, INDICATOR_SIZE)
+
+
+class TrackDelegate(QStyledItemDelegate):
+    """用 QPainter 绘制折叠的音轨行，展开时使用持久编辑器显示设置面板"""
+    def paint(self, painter, option, index):
+        row: TrackRow = index.data(Qt.ItemDataRole.UserRole)
+        rect = option.rect.adjusted(1, 1, -1, -1)
+        selected = bool(option.state & QStyle.StateFlag.State_Selected)
+        painter.save()
+        painter.setPen(QColor("#0078D7") if selected else QColor("#c0c0c0"))
+        painter.setBrush(QColor("#E5F3FF") if selected else option.palette.base())
+        painter.drawRect(rect)
+
+        # 状态指示器
+        painter.setPen(QColor("#555555"))
+        painter.setBrush(STATUS_COLORS[row.state])
+        painter.drawRect(indicator_rect(option.rect))
+
+        # 名字和快捷键
+        painter.setPen(option.palette.text().color())
+        header = QRect(rect.x(), rect.y(), rect.width(), ROW_HEIGHT - 2)
+        name_rect = header.adjusted(INDICATOR_SIZE + 16, 0, -SHORTCUT_WIDTH - WAVE_WIDTH - 20, 0)
+        name = option.fontMetrics.elidedText(row.name, Qt.TextElideMode.ElideRight, name_rect.width())
+        painter.drawText(name_rect, Qt.AlignmentFlag.AlignVCenter | Qt.AlignmentFlag.AlignLeft, name)
+
+        # 波形和播放头
+        wave_rect = QRect(name_rect.right() + 10, header.y() + 7, WAVE_WIDTH, header.height() - 14)
+        if row.peaks is not None and (row.scaled is None or row.scaled[0] != wave_rect.width()):
+            row.scaled = (wave_rect.width(), *resample_peaks(row.peaks, wave_rect.width()))
+        lows, highs = (row.scaled[1], row.scaled[2]) if row.scaled else ((), ())
+        draw_waveform(painter, wave_rect, lows, highs, row.playhead)
+        shortcut_rect = QRect(header.right() - SHORTCUT_WIDTH - 5, header.y() + 5,
+                              SHORTCUT_WIDTH, header.height() - 10)
+        painter.setPen(QColor("#888888"))
+        painter.setBrush(Qt.BrushStyle.NoBrush)
+        painter.drawRect(shortcut_rect)
+        painter.setPen(option.palette.text().color())
+        painter.drawText(shortcut_rect, Qt.AlignmentFlag.AlignCenter, row.shortcut)
+        painter.restore()
+
+    def sizeHint(self, option, index):
+        row: TrackRow = index.data(Qt.ItemDataRole.UserRole)
+        return QSize(option.rect.width(), ROW_HEIGHT + (EDITOR_HEIGHT if row.is_expanded else 0))
+
+    def createEditor(self, parent, option, index):
+        return TrackEditor(index.data(Qt.ItemDataRole.UserRole), parent)
+
+    def updateEditorGeometry(self, editor, option, index):
+        editor.setGeometry(option.rect.adjusted(5, ROW_HEIGHT, -5, -3))
+
+    def setEditorData(self, editor, index):
+        pass
+
+    def setModelData(self, editor, model, index):
+        pass
+
+
+class TrackEditor(QWidget):
+    """展开的音轨设置面板，直接修改 TrackRow 的设置"""
+    def __init__(self, row: TrackRow, parent=None):
+        super().__init__(parent)
+        self.row = row
+        self.setAutoFillBackground(True)
+        settings = row.settings
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(5, 0, 5, 0)
+
+        # 文件和快捷键
+        file_row = QHBoxLayout()
+        self.file_btn = QPushButton("选择文件")
+        self.shortcut_catcher = ShortcutCatcher(settings.shortcut)
+        self.shortcut_catcher.current_shortcut = settings.shortcut
+        self.delete_btn = QPushButton("删除")
+        file_row.addWidget(self.file_btn)
+        file_row.addWidget(QLabel("快捷键:"))
+        file_row.addWidget(self.shortcut_catcher)
+        file_row.addStretch()
+        file_row.addWidget(self.delete_btn)
+
+        volume_row = QHBoxLayout()
+        self.volume_slider = QSlider(Qt.Orientation.Horizontal)
+        self.volume_slider.setRange(-60, 0)
+        self.volume_slider.setValue(settings.volume)
+        self.volume_input = QSpinBox()
+        self.volume_input.setRange(-60, 0)
+        self.volume_input.setValue(settings.volume)
+        self.volume_input.setFixedWidth(60)
+        self.volume_input.setSuffix(" dB")
+        volume_row.addWidget(QLabel("音量:"))
+        volume_row.addWidget(self.volume_slider)
+        volume_row.addWidget(self.volume_input)
+
+        control_row = QHBoxLayout()
+        self.mode_combo = QComboBox()
+        self.mode_combo.addItems([OVERLAP, SINGLE, PAUSE, STOP])
+        self.mode_combo.setCurrentText(settings.mode)
+        self.loop_check = QCheckBox("循环播放")
+        self.loop_check.setChecked(settings.loop)
+        self.mute_others_check = QCheckBox("停止其它")
+        self.mute_others_check.setChecked(settings.mute_others)
+        self.stream_check = QCheckBox()
+        self.stream_check.setChecked(settings.stream)
+        self.show_stream_support()
+        self.priority_input = QSpinBox()
+        self.priority_input.setRange(0, 9)
+        self.priority_input.setValue(settings.priority)
+        self.max_voices_input = QSpinBox()
+        self.max_voices_input.setRange(0, 64)
+        self.max_voices_input.setSpecialValueText("不限")
+        self.max_voices_input.setValue(settings.max_voices)
+        control_row.addWidget(self.mode_combo)
+        control_row.addWidget(self.loop_check)
+        control_row.addWidget(self.mute_others_check)
+        control_row.addWidget(self.stream_check)
+        control_row.addWidget(QLabel("优先级:"))
+        control_row.addWidget(self.priority_input)
+        control_row.addWidget(QLabel("最大复音:"))
+        control_row.addWidget(self.max_voices_input)
+        control_row.addStretch()
+
+        fade_row = QHBoxLayout()
+        self.fade_in_input = QDoubleSpinBox()
+        self.fade_in_input.setRange(0, 10)
+        self.fade_in_input.setSingleStep(0.1)
+        self.fade_in_input.setSuffix(" 秒")
+        self.fade_in_input.setValue(settings.fade_in)
+        self.fade_out_input = QDoubleSpinBox()
+        self.fade_out_input.setRange(0, 10)
+        self.fade_out_input.setSingleStep(0.1)
+        self.fade_out_input.setSuffix(" 秒")
+        self.fade_out_input.setValue(settings.fade_out)
+        self.duck_input = QSpinBox()
+        self.duck_input.setRange(-60, 0)
+        self.duck_input.setSuffix(" dB")
+        self.duck_input.setSpecialValueText("不闪避")
+        self.duck_input.setValue(settings.duck_others)
+        fade_row.addWidget(QLabel("淡入:"))
+        fade_row.addWidget(self.fade_in_input)
+        fade_row.addWidget(QLabel("淡出:"))
+        fade_row.addWidget(self.fade_out_input)
+        fade_row.addWidget(QLabel("闪避其它:"))
+        fade_row.addWidget(self.duck_input)
+        fade_row.addStretch()
+
+        trim_row = QHBoxLayout()
+        self.trim_check = QCheckBox("裁剪静音")
+        self.trim_check.setChecked(settings.trim_silence)
+        self.trim_start_input = QDoubleSpinBox()
+        self.trim_end_input = QDoubleSpinBox()
+        for spin in (self.trim_start_input, self.trim_end_input):
+            spin.setRange(0, 36000)
+            spin.setDecimals(3)
+            spin.setSingleStep(0.01)
+            spin.setSuffix(" 秒")
+        self.trim_auto_btn = QPushButton("自动")
+        trim_row.addWidget(self.trim_check)
+        trim_row.addWidget(QLabel("起点:"))
+        trim_row.addWidget(self.trim_start_input)
+        trim_row.addWidget(QLabel("终点:"))
+        trim_row.addWidget(self.trim_end_input)
+        trim_row.addWidget(self.trim_auto_btn)
+        trim_row.addStretch()
+        self.show_trim()
+
+        layout.addLayout(file_row)
+        layout.addLayout(volume_row)
+        layout.addLayout(control_row)
+        layout.addLayout(fade_row)
+        layout.addLayout(trim_row)
+        self.setup_connections()
+
+    def setup_connections(self):
+        self.volume_slider.valueChanged.connect(self.volume_input.setValue)
+        self.volume_input.valueChanged.connect(self.volume_slider.setValue)
+        self.volume_slider.valueChanged.connect(lambda v: self.update_setting("volume", v))
+        self.mode_combo.currentTextChanged.connect(lambda v: self.update_setting("mode", v))
+        self.loop_check.toggled.connect(lambda v: self.update_setting("loop", v))
+        self.mute_others_check.toggled.connect(lambda v: self.update_setting("mute_others", v))
+        self.priority_input.valueChanged.connect(lambda v: self.update_setting("priority", v))
+        self.max_voices_input.valueChanged.connect(lambda v: self.update_setting("max_voices", v))
+        self.fade_in_input.valueChanged.connect(lambda v: self.update_setting("fade_in", v))
+        self.fade_out_input.valueChanged.connect(lambda v: self.update_setting("fade_out", v))
+        self.duck_input.valueChanged.connect(lambda v: self.update_setting("duck_others", v))
+        self.trim_check.toggled.connect(lambda v: self.update_trim("trim_silence", v))
+        self.trim_start_input.valueChanged.connect(lambda v: self.update_setting("trim_start", v))
+        self.trim_end_input.valueChanged.connect(lambda v: self.update_setting("trim_end", v))
+        self.trim_auto_btn.clicked.connect(self.on_trim_auto)
+        self.stream_check.toggled.connect(self.on_stream_changed)
+        self.shortcut_catcher.shortcutChanged.connect(self.on_shortcut_changed)
+        self.file_btn.clicked.connect(lambda: self.row.container.choose_file(self.row))
+        self.delete_btn.clicked.connect(lambda: self.row.container.remove_track(self.row))
+
+    def update_setting(self, name, value):
+        setattr(self.row.settings, name, value)
+        self.row.settings.apply(self.row.audio_track)
+        self.row.container.settings_changed.emit()
+
+    def update_trim(self, name, value):
+        self.update_setting(name, value)
+        self.show_trim()
+
+    def on_trim_auto(self):
+        self.row.settings.trim_start = None
+        self.update_trim("trim_end", None)
+
+    def show_volume(self):
+        for control in (self.volume_slider, self.volume_input):
+            control.blockSignals(True)
+            control.setValue(self.row.settings.volume)
+            control.blockSignals(False)
+
+    def show_stream_support(self):
+        """没有 soundfile 时提示该文件不能流式播放"""
+        text, tip = StreamSource.check_text(self.row.path)
+        self.stream_check.setText(text)
+        self.stream_check.setToolTip(tip)
+
+    def show_trim(self):
+        """显示实际的裁剪点（手动设置的或检测到的）"""
+        span = self.row.audio_track.trim_span() or (0.0, 0.0)
+        for spin, value in zip((self.trim_start_input, self.trim_end_input), span):
+            spin.blockSignals(True)
+            spin.setValue(value)
+            spin.blockSignals(False)
+
+    def on_stream_changed(self, checked):
+        self.update_setting("stream", checked)
+        # 按新的方式重新加载
+        if self.row.path:
+            self.row.container.engine.submit(self.row.audio_track.stop)
+            self.row.set_file(self.row.path)
+
+    def on_shortcut_changed(self, shortcut):
+        self.row.settings.shortcut = shortcut
+        self.row.container.row_changed(self.row)
+        self.row.container.shortcut_changed.emit(shortcut)
+        self.row.container.settings_changed.emit()
+
+
+class TrackListView(QListView):
+    """虚拟音轨列表，只绘制可见的行
+
+    鼠标和按键操作与 TracksContainer 一致：
+    拖拽/上下方向键移动，Tab 切换选择，右键/Space 展开，Enter 播放/停止，Delete 删除
+    """
+    def __init__(self, container: "VirtualTracksContainer"):
+        super().__init__(container)
+        self.container = container
+        self.drag_row = None
+        self.setVerticalScrollMode(QAbstractItemView.ScrollMode.ScrollPerPixel)
+        self.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
+        self.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
+        self.setAcceptDrops(True)
+
+    def current_row(self):
+        index = self.currentIndex()
+        return index.row() if index.isValid() else -1
+
+    def select_row(self, position):
+        self.setCurrentIndex(self.model().index(position))
+
+    def dragEnterEvent(self, event: QDragEnterEvent):
+        if event.mimeData().hasUrls():
+            event.acceptProposedAction()
+
+    def dragMoveEvent(self, event):
+        if event.mimeData().hasUrls():
+            event.acceptProposedAction()
+
+    def dropEvent(self, event: QDropEvent):
+        self.container.dropEvent(event)
+
+    def mousePressEvent(self, event: QMouseEvent):
+        index = self.indexAt(event.position().toPoint())
+        if not index.isValid():
+            return super().mousePressEvent(event)
+        # 不调用 super，手动取得焦点，键盘导航从点击的行继续
+        self.setFocus(Qt.FocusReason.MouseFocusReason)
+        self.select_row(index.row())
+        row = self.container.model.rows[index.row()]
+        if indicator_rect(self.visualRect(index)).contains(event.position().toPoint()):
+            self.container.toggle_status(row, event.button())
+        elif event.button() == Qt.MouseButton.RightButton:
+            self.container.toggle_expand(row)
+        elif event.button() == Qt.MouseButton.LeftButton:
+            self.drag_row = index.row()
+
+    def mouseMoveEvent(self, event: QMouseEvent):
+        if self.drag_row is None or not (event.buttons() & Qt.MouseButton.LeftButton):
+            return
+        index = self.indexAt(event.position().toPoint())
+        if index.isValid() and index.row() != self.drag_row:
+            self.container.move_track(self.drag_row, index.row())
+            self.drag_row = index.row()
+
+    def mouseReleaseEvent(self, event):
+        self.drag_row = None
+        super().mouseReleaseEvent(event)
+
+    def mouseDoubleClickEvent(self, event: QMouseEvent):
+        '''双击选择文件，双击右键时聚焦展开'''
+        index = self.indexAt(event.position().toPoint())
+        if not index.isValid():
+            return
+        row = self.container.model.rows[index.row()]
+        if event.button() == Qt.MouseButton.LeftButton:
+            self.container.choose_file(row)
+        elif event.button() == Qt.MouseButton.RightButton:
+            self.container.focus_expand(row)
+
+    def focusNextPrevChild(self, next):
+        # Tab 和 shift+Tab 在音轨间切换选择
+        position = self.current_row() + (1 if next else -1)
+        if 0 <= position < self.model().rowCount():
+            self.select_row(position)
+            return True
+        return super().focusNextPrevChild(next)
+
+    def keyPressEvent(self, event):
+        position = self.current_row()
+        if position < 0:
+            return
+        row = self.container.model.rows[position]
+        key = event.key()
+        if key == Qt.Key.Key_Delete:
+            self.container.remove_track(row)
+        elif key == Qt.Key.Key_Space:
+            self.container.toggle_expand(row)
+        elif key == Qt.Key.Key_Up and position > 0:
+            self.container.move_track(position, position - 1)
+        elif key == Qt.Key.Key_Down and position < self.model().rowCount() - 1:
+            self.container.move_track(position, position + 1)
+        elif key in (Qt.Key.Key_Return, Qt.Key.Key_Enter):
+            self.container.toggle_status(row)
+
+
+class VirtualTracksContainer(QWidget):
+    """虚拟化的音轨容器，接口与 TracksContainer 一致
+
+    音轨状态保存在 TrackListModel 中，只有可见行被绘制，
+    控件数量与音轨数量无关（展开的行各有一个设置面板）
+    """
+    tracks_changed = pyqtSignal()  # 音轨增删信号
+    shortcut_changed = pyqtSignal(str)  # 任一音轨快捷键变化信号
+    settings_changed = pyqtSignal()  # 音轨增删、移动或任一音轨设置变化信号
+
+    def __init__(self, engine: AudioEngine, parent=None):
+        super().__init__(parent)
+        self.engine = engine
+        self.monitor = PlaybackMonitor(engine, parent=self)
+        self.loader = SoundLoader(parent=self)
+        self.expanded = set()  # 展开的行
+        self.owners = {}  # AudioTrack -> TrackRow
+        self.init_ui()
+        self.setAcceptDrops(True)
+
+    def init_ui(self):
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        self.model = TrackListModel(self)
+        self.delegate = TrackDelegate(self)
+        self.view = TrackListView(self)
+        self.view.setModel(self.model)
+        self.view.setItemDelegate(self.delegate)
+        self.add_track_btn = QPushButton("添加音轨")
+        self.add_track_btn.clicked.connect(self.add_track)
+        layout.addWidget(self.view)
+        layout.addWidget(self.add_track_btn)
+
+    def dragEnterEvent(self, event: QDragEnterEvent):
+        if event.mimeData().hasUrls():
+            event.acceptProposedAction()
+
+    def dropEvent(self, event: QDropEvent):
+        settings_list = []
+        for url in event.mimeData().urls():
+            file_path = url.toLocalFile()
+            if file_path.lower().endswith(('.mp3', '.wav', '.ogg', '.flac')):
+                settings_list.append({**NEW_TRACK, 'file_path': file_path})
+        if settings_list:
+            self.add_tracks(settings_list)
+
+    def add_track(self):
+        return self.add_tracks([dict(NEW_TRACK)])[0]
+
+    def add_tracks(self, settings_list):
+        """批量添加音轨并读取设置，模型只发一次插入通知"""
+        rows = []
+        for settings in settings_list:
+            row = TrackRow()
+            row.container = self
+            self.monitor.bind(row.audio_track, row.update_status, row.update_playhead)
+            self.owners[row.audio_track] = row
+            rows.append(row)
+        if rows:
+            self.model.append_rows(rows)
+        # 插入模型后再读取，加载回调需要找到所在的行
+        for row, settings in zip(rows, settings_list):
+            if settings:
+                row.load_settings(settings)
+        self.tracks_changed.emit()
+        self.settings_changed.emit()
+        return rows
+
+    def remove_track(self, row: TrackRow):
+        """移除并释放音轨，选中相邻的音轨"""
+        position = row.position
+        self.expanded.discard(row)
+        self.owners.pop(row.audio_track, None)
+        self.monitor.unbind(row.audio_track)
+        self.loader.cancel(row.audio_track)
+        self.engine.submit_control(row.audio_track.unload)
+        self.model.remove_row(position)
+        if self.model.rows:
+            self.view.select_row(max(0, position - 1))
+        self.tracks_changed.emit()
+        self.settings_changed.emit()
+
+    def move_track(self, from_index, to_index):
+        self.model.move_row(from_index, to_index)
+        self.view.select_row(to_index)
+        self.settings_changed.emit()
+
+    def find(self, audio_track):
+        """音轨对应的行，已移除时返回 None"""
+        return self.owners.get(audio_track)
+
+    def tracks(self):
+        """按顺序返回所有音轨"""
+        return list(self.model.rows)
+
+    def row_changed(self, row: TrackRow):
+        self.model.row_changed(row)
+
+    def refresh_editor(self, row: TrackRow):
+        """展开的行显示新的音量和裁剪点"""
+        if row.is_expanded:
+            editor = self.view.indexWidget(self.model.index_of(row))
+            if editor:
+                editor.show_volume()
+                editor.show_trim()
+                editor.show_stream_support()
+
+    def toggle_status(self, row: TrackRow, button=None):
+        '''切换播放状态，与 AudioTrackWidget.toggle_status 一致'''
+        track = row.audio_track
+        if button is None:
+            self.engine.toggle(track, track.toggle_stop)
+        elif button == Qt.MouseButton.LeftButton:
+            self.engine.toggle(track, track.toggle_pause)
+        elif button == Qt.MouseButton.RightButton:
+            self.engine.toggle(track, track.stop)
+
+    def toggle_expand(self, row: TrackRow):
+        row.is_expanded = not row.is_expanded
+        index = self.model.index_of(row)
+        if row.is_expanded:
+            self.expanded.add(row)
+            self.view.openPersistentEditor(index)
+        else:
+            self.expanded.discard(row)
+            self.view.closePersistentEditor(index)
+        self.delegate.sizeHintChanged.emit(index)
+
+    def focus_expand(self, row: TrackRow):
+        '''展开目标并折叠其它，只需遍历展开的行'''
+        for other in list(self.expanded):
+            if other is not row:
+                self.toggle_expand(other)
+        if not row.is_expanded:
+            self.toggle_expand(row)
+
+    def choose_file(self, row: TrackRow):
+        file_path, _ = QFileDialog.getOpenFileName(
+            self,
+            "选择音频文件",
+            "",
+            "音频文件 (*.mp3 *.wav *.ogg *.flac);;所有文件 (*.*)"
+        )
+        if file_path:
+            row.set_file(file_path)
@@ -1,35 +1,39 @@
 
 from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout,
     QPushButton, QFrame, QScrollArea, QLabel,
-    QComboBox, QSlider, QSpinBox, QCheckBox, QFileDialog, QSizePolicy)
-from PyQt6.QtCore import Qt, pyqtSignal, QTimer
+    QComboBox, QSlider, QSpinBox, QDoubleSpinBox, QCheckBox, QFileDialog, QSizePolicy)
+from PyQt6.QtCore import Qt, pyqtSignal
 from PyQt6.QtGui import QDragEnterEvent, QDropEvent, QMouseEvent
 from pathlib import Path
 
 from .shortcut import ShortcutCatcher
 from .audio_track import AudioTrack, OVERLAP, SINGLE, PAUSE, STOP
+from .audio_engine import AudioEngine
+from .monitor import PlaybackMonitor
+from .loader import SoundLoader
+from .stream import StreamSource
+from .track_settings import TrackSettings, NEW_TRACK
+from .waveform import WaveformView
 
 class AudioTrackWidget(QFrame):
     select_sign = pyqtSignal(bool)  # 选中信号
     focus_expand_sign = pyqtSignal()  # '折叠其它'信号
+    settings_changed = pyqtSignal()  # 需要保存的设置变化信号
     tracks_layout: QVBoxLayout
+    engine: AudioEngine
+    loader: SoundLoader
 
     def __init__(self, parent=None):
         super().__init__(parent)
         self.audio_track = AudioTrack()
+        self.settings = TrackSettings()
         self.is_selected = False
-        self.path = ""
         self.is_expanded = False
         self.setFrameStyle(QFrame.Shape.Box | QFrame.Shadow.Raised)
         self.setFocusPolicy(Qt.FocusPolicy.StrongFocus)
         self.init_ui()
         self.setAcceptDrops(True)
 
-
-        self.check_timer = QTimer()
-        self.check_timer.timeout.connect(self.check_channels_status)
-        self.check_timer.start(100)  # 每100ms检查一次
-
     def dragEnterEvent(self, event: QDragEnterEvent):
         if event.mimeData().hasUrls():
             event.acceptProposedAction()
@@ -89,19 +93,31 @@ class AudioTrackWidget(QFrame):
         """)
 
         first_row.addWidget(self.status_indicator)
+        # 波形缩略图，分析完成后显示
+        self.waveform = WaveformView()
+
         first_row.addWidget(self.name_label)
+        first_row.addWidget(self.waveform)
         first_row.addWidget(self.shortcut_catcher)
         # first_row.addWidget(self.expand_btn)
         first_row.addWidget(self.delete_btn)
 
+        # 设置面板在第一次展开时才创建，之前设置只保存在 self.settings 中
+        self.expandable_widget = None
+
+        # 添加所有行到主布局
+        self.main_layout.addWidget(first_row_widget)
+
+        self.setup_connections()
+
+    def build_panel(self):
+        """创建展开后的设置面板，控件的值取自 self.settings"""
         # 第二行（展开时显示）
         volume_row = QHBoxLayout()
         self.volume_slider = QSlider(Qt.Orientation.Horizontal)
         self.volume_slider.setRange(-60, 0)
-        self.volume_slider.setValue(0)
         self.volume_input = QSpinBox()
         self.volume_input.setRange(-60, 0)
-        self.volume_input.setValue(0)
         self.volume_input.setFixedWidth(60)
         self.volume_input.setSuffix(" dB")
         volume_row.addWidget(QLabel("音量:"))
@@ -111,43 +127,163 @@ class AudioTrackWidget(QFrame):
         control_row = QHBoxLayout()
         self.mode_combo = QComboBox()
         self.mode_combo.addItems([OVERLAP, SINGLE, PAUSE, STOP])
-        self.mode_combo.setCurrentText(STOP)
         self.loop_check = QCheckBox("循环播放")
         self.mute_others_check = QCheckBox("停止其它")
+        self.stream_check = QCheckBox("流式播放")
         control_row.addWidget(self.mode_combo)
         control_row.addWidget(self.loop_check)
         control_row.addWidget(self.mute_others_check)
+        control_row.addWidget(self.stream_check)
         control_row.addStretch()
+        # 第四行（展开时显示）
+        voice_row = QHBoxLayout()
+        self.priority_input = QSpinBox()
+        self.priority_input.setRange(0, 9)
+        self.priority_input.setToolTip("通道不够时优先级低的先被抢占，不会抢占更高优先级")
+        self.max_voices_input = QSpinBox()
+        self.max_voices_input.setRange(0, 64)
+        self.max_voices_input.setSpecialValueText("不限")
+        self.max_voices_input.setToolTip("本音轨同时播放的上限，超过时停止最早的一个")
+        voice_row.addWidget(QLabel("优先级:"))
+        voice_row.addWidget(self.priority_input)
+        voice_row.addWidget(QLabel("最大复音:"))
+        voice_row.addWidget(self.max_voices_input)
+        voice_row.addStretch()
+        # 第五行（展开时显示）
+        fade_row = QHBoxLayout()
+        self.fade_in_input = QDoubleSpinBox()
+        self.fade_in_input.setRange(0, 10)
+        self.fade_in_input.setSingleStep(0.1)
+        self.fade_in_input.setSuffix(" 秒")
+        self.fade_out_input = QDoubleSpinBox()
+        self.fade_out_input.setRange(0, 10)
+        self.fade_out_input.setSingleStep(0.1)
+        self.fade_out_input.setSuffix(" 秒")
+        self.fade_out_input.setToolTip("停止时淡出，'停止其它'时与新音轨形成交叉淡化")
+        self.duck_input = QSpinBox()
+        self.duck_input.setRange(-60, 0)
+        self.duck_input.setSuffix(" dB")
+        self.duck_input.setSpecialValueText("不闪避")
+        self.duck_input.setToolTip("播放期间把其它音轨压低的音量")
+        fade_row.addWidget(QLabel("淡入:"))
+        fade_row.addWidget(self.fade_in_input)
+        fade_row.addWidget(QLabel("淡出:"))
+        fade_row.addWidget(self.fade_out_input)
+        fade_row.addWidget(QLabel("闪避其它:"))
+        fade_row.addWidget(self.duck_input)
+        fade_row.addStretch()
+        # 第六行（展开时显示）
+        trim_row = QHBoxLayout()
+        self.trim_check = QCheckBox("裁剪静音")
+        self.trim_check.setToolTip("跳过开头和结尾的静音，触发时立即出声")
+        self.trim_start_input = QDoubleSpinBox()
+        self.trim_end_input = QDoubleSpinBox()
+        for spin in (self.trim_start_input, self.trim_end_input):
+            spin.setRange(0, 36000)
+            spin.setDecimals(3)
+            spin.setSingleStep(0.01)
+            spin.setSuffix(" 秒")
+        self.trim_auto_btn = QPushButton("自动")
+        self.trim_auto_btn.setToolTip("使用检测到的起点和终点")
+        trim_row.addWidget(self.trim_check)
+        trim_row.addWidget(QLabel("起点:"))
+        trim_row.addWidget(self.trim_start_input)
+        trim_row.addWidget(QLabel("终点:"))
+        trim_row.addWidget(self.trim_end_input)
+        trim_row.addWidget(self.trim_auto_btn)
+        trim_row.addStretch()
 
         # 创建容器来存放可展开的行
         self.expandable_widget = QWidget()
         expandable_layout = QVBoxLayout(self.expandable_widget)
         expandable_layout.addLayout(volume_row)
         expandable_layout.addLayout(control_row)
+        expandable_layout.addLayout(voice_row)
+        expandable_layout.addLayout(fade_row)
+        expandable_layout.addLayout(trim_row)
         self.expandable_widget.hide()
+        self.main_layout.addWidget(self.expandable_widget)
 
-        # 添加所有行到主布局
-        self.main_layout.addWidget(first_row_widget)
-        self.main_layout.addWidget(self.expandable_widget)# 设置固定高度
+        self.update_panel()
+        self.setup_panel_connections()
 
-        self.setup_connections()
+    def update_panel(self):
+        """把 self.settings 显示到设置面板，不触发变化信号"""
+        if self.expandable_widget is None:
+            return
+        controls = (self.volume_slider, self.volume_input, self.mode_combo, self.loop_check,
+                    self.mute_others_check, self.stream_check, self.priority_input,
+                    self.max_voices_input, self.fade_in_input, self.fade_out_input,
+                    self.duck_input, self.trim_check)
+        for control in controls:
+            control.blockSignals(True)
+        self.volume_slider.setValue(self.settings.volume)
+        self.volume_input.setValue(self.settings.volume)
+        self.mode_combo.setCurrentText(self.settings.mode)
+        self.loop_check.setChecked(self.settings.loop)
+        self.mute_others_check.setChecked(self.settings.mute_others)
+        self.stream_check.setChecked(self.settings.stream)
+        self.priority_input.setValue(self.settings.priority)
+        self.max_voices_input.setValue(self.settings.max_voices)
+        self.fade_in_input.setValue(self.settings.fade_in)
+        self.fade_out_input.setValue(self.settings.fade_out)
+        self.duck_input.setValue(self.settings.duck_others)
+        self.trim_check.setChecked(self.settings.trim_silence)
+        for control in controls:
+            control.blockSignals(False)
+        self.show_trim()
+        self.show_stream_support()
+
+    def show_stream_support(self):
+        """没有 soundfile 时提示该文件不能流式播放"""
+        if self.expandable_widget is None:
+            return
+        text, tip = StreamSource.check_text(self.path)
+        self.stream_check.setText(text)
+        self.stream_check.setToolTip(tip)
+
+    def show_trim(self):
+        """显示实际的裁剪点（手动设置的或检测到的）"""
+        if self.expandable_widget is None:
+            return
+        span = self.audio_track.trim_span() or (0.0, 0.0)
+        for spin, value in zip((self.trim_start_input, self.trim_end_input), span):
+            spin.blockSignals(True)
+            spin.setValue(value)
+            spin.blockSignals(False)
 
     def setup_connections(self):
         self.status_indicator.mousePressEvent = self.toggle_status
         # self.expand_btn.clicked.connect(self.toggle_expand)
-        self.delete_btn.clicked.connect(self.deleteLater)
+        self.name_label.mouseDoubleClickEvent = self.on_name_double_click
+        self.shortcut_catcher.shortcutChanged.connect(self.on_shortcut_changed)
+
+    def setup_panel_connections(self):
         self.volume_slider.valueChanged.connect(self.volume_input.setValue)
         self.volume_input.valueChanged.connect(self.volume_slider.setValue)
         self.volume_slider.valueChanged.connect(self.on_volume_changed)
         self.mode_combo.currentTextChanged.connect(self.on_mode_changed)
-        self.loop_check.stateChanged.connect(self.on_loop_changed)
-        self.name_label.mouseDoubleClickEvent = self.on_name_double_click
-
-    def check_channels_status(self):
-        """定期检查通道状态"""
-        self.audio_track.cleanup_channels()
-        self.update_status_indicator(self.audio_track.is_playing,
-                                     self.audio_track.is_paused)
+        self.loop_check.toggled.connect(self.on_loop_changed)
+        self.mute_others_check.toggled.connect(self.on_mute_others_changed)
+        self.stream_check.toggled.connect(self.on_stream_changed)
+        self.priority_input.valueChanged.connect(self.on_priority_changed)
+        self.max_voices_input.valueChanged.connect(self.on_max_voices_changed)
+        self.fade_in_input.valueChanged.connect(self.on_fade_in_changed)
+        self.fade_out_input.valueChanged.connect(self.on_fade_out_changed)
+        self.duck_input.valueChanged.connect(self.on_duck_changed)
+        self.trim_check.toggled.connect(self.on_trim_silence_changed)
+        self.trim_start_input.valueChanged.connect(self.on_trim_start_changed)
+        self.trim_end_input.valueChanged.connect(self.on_trim_end_changed)
+        self.trim_auto_btn.clicked.connect(self.on_trim_auto)
+        # 任一设置变化都通知自动保存
+        for signal in (self.volume_slider.valueChanged, self.mode_combo.currentTextChanged,
+                       self.loop_check.toggled, self.mute_others_check.toggled,
+                       self.stream_check.toggled, self.priority_input.valueChanged,
+                       self.max_voices_input.valueChanged, self.fade_in_input.valueChanged,
+                       self.fade_out_input.valueChanged, self.duck_input.valueChanged,
+                       self.trim_check.toggled, self.trim_start_input.valueChanged,
+                       self.trim_end_input.valueChanged, self.trim_auto_btn.clicked):
+            signal.connect(lambda *_: self.settings_changed.emit())
 
     def update_status_indicator(self, is_playing, is_paused):
         """更新状态指示器颜色"""
@@ -158,20 +294,17 @@ class AudioTrackWidget(QFrame):
 
     def toggle_status(self, event: QMouseEvent = None):
         '''切换播放状态'''
-        is_active = self.audio_track.is_active()
-        if not is_active and self.mute_others_check.isChecked():
-            for i in range(self.tracks_layout.count() - 1):
-                widget = self.tracks_layout.itemAt(i).widget()
-                if widget != self:
-                    widget.audio_track.stop()
+        # 交给音频线程执行，'停止其它'也在那里处理
         if event is None:
-            self.audio_track.toggle_stop()
+            self.engine.toggle(self.audio_track, self.audio_track.toggle_stop)
         elif event.button() == Qt.MouseButton.LeftButton:
-            self.audio_track.toggle_pause()
+            self.engine.toggle(self.audio_track, self.audio_track.toggle_pause)
         elif event.button() == Qt.MouseButton.RightButton:
-            self.audio_track.stop()
+            self.engine.toggle(self.audio_track, self.audio_track.stop)
 
     def toggle_expand(self):
+        if self.expandable_widget is None:
+            self.build_panel()
         self.is_expanded = not self.is_expanded
         self.expandable_widget.setVisible(self.is_expanded)
 
@@ -186,14 +319,10 @@ class AudioTrackWidget(QFrame):
             self.toggle_expand()
 
     def set_selected(self, selected):
+        """选中样式由 TracksContainer 的样式表给出，这里只在状态变化时刷新"""
+        if selected == self.is_selected:
+            return
         self.is_selected = selected
-        # 设置选中状态的样式
-        self.setStyleSheet("""
-            AudioTrackWidget[selected="true"] {
-                border: 2px solid #0078D7;
-                background-color: #E5F3FF;
-            }
-        """)
         self.setProperty("selected", selected)
         self.style().unpolish(self)
         self.style().polish(self)
@@ -201,28 +330,115 @@ class AudioTrackWidget(QFrame):
     def focusOutEvent(self, event):
         self.select_sign.emit(False)
 
+    @property
+    def path(self):
+        return self.settings.file_path
 
-    def set_file(self, file_path):
-        self.path = file_path
+    @property
+    def shortcut(self):
+        return self.settings.shortcut
 
-        if self.audio_track.load_file(file_path):
-            name = Path(file_path).name
+
+    def set_file(self, file_path):
+        """在后台加载文件，有快捷键的音轨优先"""
+        self.settings.file_path = file_path
+        self.settings_changed.emit()
+        self.name_label.setText("加载中...")
+        self.name_label.setToolTip(str(file_path))
+        priority = 1 if self.settings.shortcut else 0
+        self.waveform.set_peaks(None)
+        self.loader.load(self.audio_track, file_path, priority, self.on_file_loaded, self.on_analyzed)
+
+    def on_file_loaded(self, ok, seconds):
+        if ok:
+            name = Path(self.path).name
             if len(name) > 40:
                 name = name[:37] + "..."
             self.name_label.setText(name)
-            self.name_label.setToolTip(str(file_path))
+            self.name_label.setToolTip(f"{self.path}\n加载耗时: {seconds * 1000:.0f} ms")
+            self.show_trim()
+            self.show_stream_support()
         else:
             self.name_label.setText("加载失败")
             self.name_label.setToolTip("文件加载失败")
 
+    def on_analyzed(self, analysis):
+        self.waveform.set_peaks(analysis.get("peaks"))
+        self.show_trim()
+
+    def on_trim_silence_changed(self, checked):
+        self.settings.trim_silence = checked
+        self.settings.apply(self.audio_track)
+        self.show_trim()
+
+    def on_trim_start_changed(self, value):
+        self.settings.trim_start = value
+        self.settings.apply(self.audio_track)
+
+    def on_trim_end_changed(self, value):
+        self.settings.trim_end = value
+        self.settings.apply(self.audio_track)
+
+    def on_trim_auto(self):
+        self.settings.trim_start = self.settings.trim_end = None
+        self.settings.apply(self.audio_track)
+        self.show_trim()
+
     def on_volume_changed(self, value):
+        self.settings.volume = value
         self.audio_track.set_volume(value)
 
+    def set_volume(self, db):
+        """从外部（远程控制）设置音量 (dB)，同步到设置面板"""
+        self.on_volume_changed(db)
+        self.update_panel()
+        self.settings_changed.emit()
+
     def on_mode_changed(self, mode_text):
+        self.settings.mode = mode_text
         self.audio_track.mode = mode_text
 
-    def on_loop_changed(self, state):
-        self.audio_track.loop = state == Qt.CheckState.Checked
+    def on_loop_changed(self, checked):
+        self.settings.loop = checked
+        self.audio_track.loop = checked
+
+    def on_mute_others_changed(self, checked):
+        self.settings.mute_others = checked
+        self.audio_track.mute_others = checked
+
+    def on_priority_changed(self, value):
+        self.settings.priority = value
+        self.audio_track.priority = value
+
+    def on_max_voices_changed(self, value):
+        self.settings.max_voices = value
+        self.audio_track.max_voices = value
+
+    def on_fade_in_changed(self, value):
+        self.settings.fade_in = value
+        self.audio_track.fade_in = value
+
+    def on_fade_out_changed(self, value):
+        self.settings.fade_out = value
+        self.audio_track.fade_out = value
+
+    def on_duck_changed(self, value):
+        self.settings.duck_others = value
+        self.audio_track.duck_others = value
+
+    def on_stream_changed(self, checked):
+        if self.audio_track.stream == checked:
+            return
+        self.settings.stream = checked
+        self.audio_track.stream = checked
+        # 按新的方式重新加载
+        if self.path:
+            self.engine.submit(self.audio_track.stop)
+            self.set_file(self.path)
+
+    def on_shortcut_changed(self, shortcut):
+        self.settings.shortcut = shortcut
+        self.settings_changed.emit()
 
     def on_name_double_click(self, event):
         '''双击选择文件，双击右键时聚焦展开'''
@@ -239,32 +455,32 @@ class AudioTrackWidget(QFrame):
             self.focus_expand_sign.emit()
 
     def get_settings(self):
-        return {
-            "file_path": self.path,
-            "volume": self.volume_slider.value(),
-            "shortcut": self.shortcut_catcher.current_shortcut,
-            "mode": self.mode_combo.currentText(),
-            "loop": self.loop_check.isChecked(),
-            "mute_others": self.mute_others_check.isChecked()
-        }
+        return self.settings.to_dict()
 
     def load_settings(self, settings):
-        if settings.get("file_path"):
-            self.set_file(settings["file_path"])
-        self.volume_slider.setValue(settings.get("volume", 100))
-        self.shortcut_catcher.setText(settings.get("shortcut", ""))
-        self.shortcut_catcher.current_shortcut = settings.get("shortcut", "")
-        self.mode_combo.setCurrentText(settings.get("mode", STOP))
-        self.loop_check.setChecked(settings.get("loop", False))
-        self.audio_track.loop = settings.get("loop", False)
-        self.mute_others_check.setChecked(settings.get("mute_others", False))
+        # 先设置快捷键和流式播放，加载时据此决定优先级和方式
+        self.settings.load(settings)
+        self.settings.apply(self.audio_track)
+        self.shortcut_catcher.setText(self.settings.shortcut)
+        self.shortcut_catcher.current_shortcut = self.settings.shortcut
+        self.update_panel()
+        if self.settings.file_path:
+            self.set_file(self.settings.file_path)
 
 from musicpad.draggable import DraggableVBoxLayout
 
 class TracksContainer(QScrollArea):
-    def __init__(self, parent=None):
+    tracks_changed = pyqtSignal()  # 音轨增删信号
+    shortcut_changed = pyqtSignal(str)  # 任一音轨快捷键变化信号
+    settings_changed = pyqtSignal()  # 音轨增删、移动或任一音轨设置变化信号
+
+    def __init__(self, engine: AudioEngine, parent=None):
         super().__init__(parent)
+        self.engine = engine
+        self.monitor = PlaybackMonitor(engine, parent=self)
+        self.loader = SoundLoader(parent=self)
         self.selected_track: AudioTrackWidget = None
+        self.owners = {}  # AudioTrack -> AudioTrackWidget
         self.init_ui()
         self.update_tab_order()
         self.setAcceptDrops(True)
@@ -275,19 +491,27 @@ class TracksContainer(QScrollArea):
 
     def dropEvent(self, event: QDropEvent):
         urls = event.mimeData().urls()
+        settings_list = []
         for url in urls:
             file_path = url.toLocalFile()
             if file_path.lower().endswith(('.mp3', '.wav', '.ogg', '.flac')):
-                track_widget = self.add_track()
-                track_widget.load_settings({
-                    'file_path': file_path
-                })
+                settings_list.append({**NEW_TRACK, 'file_path': file_path})
+        if settings_list:
+            self.add_tracks(settings_list)
 
     def init_ui(self):
         # 创建内容窗口
         content_widget = QWidget()
+        # 选中样式只设置一次，音轨通过 selected 属性切换
+        content_widget.setStyleSheet("""
+            AudioTrackWidget[selected="true"] {
+                border: 2px solid #0078D7;
+                background-color: #E5F3FF;
+            }
+        """)
         self.tracks_layout = DraggableVBoxLayout(content_widget)
         self.tracks_layout.setAlignment(Qt.AlignmentFlag.AlignTop)
+        self.tracks_layout.widget_moved.connect(self.settings_changed)
         # self.tracks_layout.addStretch()
 
         # 设置滚动区域属性
@@ -305,21 +529,81 @@ class TracksContainer(QScrollArea):
         self.add_track_btn.clicked.connect(self.add_track)
     def add_track(self):
         # 在按钮之前添加新音轨
+        return self.add_tracks([dict(NEW_TRACK)])[0]
+
+    def add_tracks(self, settings_list):
+        """批量添加音轨并读取设置
+
+        先创建好所有音轨，再在布局停用、暂停重绘时一次插入到按钮之前，
+        只重新布局一次，Tab 顺序也只重建一次
+        """
+        track_widgets = []
+        for settings in settings_list:
+            track_widget = self.create_track()
+            if settings:
+                track_widget.load_settings(settings)
+            track_widgets.append(track_widget)
+        content_widget = self.widget()
+        content_widget.setUpdatesEnabled(False)
+        self.tracks_layout.setEnabled(False)
+        try:
+            for track_widget in track_widgets:
+                self.tracks_layout.insertWidget(self.tracks_layout.count() - 1, track_widget)
+        finally:
+            self.tracks_layout.setEnabled(True)
+            self.tracks_layout.update()
+            content_widget.setUpdatesEnabled(True)
+        self.update_tab_order()
+        self.tracks_changed.emit()
+        self.settings_changed.emit()
+        return track_widgets
+
+    def create_track(self):
+        """创建一个音轨，由调用者插入布局，不更新 Tab 顺序也不发信号"""
         track_widget = AudioTrackWidget()
         track_widget.select_sign.connect(lambda checked: self.handle_track_selection(track_widget, checked))
         track_widget.focus_expand_sign.connect(lambda: self.handle_focus_expand(track_widget))
-        self.tracks_layout.insertWidget(self.tracks_layout.count() - 1, track_widget)
+        track_widget.delete_btn.clicked.connect(lambda: self.remove_track(track_widget))
+        track_widget.shortcut_catcher.shortcutChanged.connect(self.shortcut_changed)
+        track_widget.settings_changed.connect(self.settings_changed)
         self.tracks_layout.setDraggable(track_widget)
         track_widget.tracks_layout = self.tracks_layout
-        self.update_tab_order()
+        track_widget.engine = self.engine
+        track_widget.loader = self.loader
+        self.monitor.bind(track_widget.audio_track, track_widget.update_status_indicator,
+                          track_widget.waveform.set_playhead)
+        self.owners[track_widget.audio_track] = track_widget
         return track_widget
 
+    def remove_track(self, track_widget):
+        """移除并删除音轨"""
+        if track_widget is self.selected_track:
+            self.selected_track = None
+        self.tracks_layout.removeWidget(track_widget)
+        self.owners.pop(track_widget.audio_track, None)
+        self.monitor.unbind(track_widget.audio_track)
+        self.loader.cancel(track_widget.audio_track)
+        self.engine.submit_control(track_widget.audio_track.unload)
+        track_widget.deleteLater()
+        self.tracks_changed.emit()
+        self.settings_changed.emit()
+
+    def find(self, audio_track):
+        """音轨对应的控件，已移除时返回 None"""
+        return self.owners.get(audio_track)
+
+    def tracks(self):
+        """按顺序返回所有音轨"""
+        return [self.tracks_layout.itemAt(i).widget()
+                for i in range(self.tracks_layout.count() - 1)]  # -1 排除添加按钮
+
     def move_track(self, from_index, to_index):
         # 移动音轨位置
         track = self.tracks_layout.takeAt(from_index).widget()
         self.tracks_layout.insertWidget(to_index, track)
         track.setFocus()
         self.update_tab_order()
+        self.settings_changed.emit()
 
     def update_tab_order(self):
         """更新Tab键顺序"""
@@ -338,16 +622,17 @@ class TracksContainer(QScrollArea):
         QWidget.setTabOrder(last_track, self.add_track_btn)
 
     def handle_track_selection(self, selected_track, checked):
-        for i in range(self.tracks_layout.count() - 1):# -1 排除添加按钮
-            track = self.tracks_layout.itemAt(i).widget()
-            if track == selected_track:
-                track.set_selected(checked)
-            else:
-                track.set_selected(False)
+        """只刷新之前选中的和当前的音轨"""
+        previous = self.selected_track
         if checked:
+            if previous is not None and previous is not selected_track:
+                previous.set_selected(False)
+            selected_track.set_selected(True)
             self.selected_track = selected_track
         else:
-            self.selected_track = None
+            selected_track.set_selected(False)
+            if previous is selected_track:
+                self.selected_track = None
 
     def handle_focus_expand(self, widget):
         for i in range(self.tracks_layout.count() - 1):
@@ -365,9 +650,7 @@ class TracksContainer(QScrollArea):
 
         if event.key() == Qt.Key.Key_Delete:
             # 删除当前选中的音轨
-            self.tracks_layout.removeWidget(self.selected_track)
-            self.selected_track.deleteLater()
-            self.selected_track = None
+            self.remove_track(self.selected_track)
 
             next_index = current_index - 1
             track_count = self.tracks_layout.count() - 1  # -1 for add button
@@ -0,0 +1,230 @@
+import threading
+import time
+
+import pygame
+
+from .stream import StreamSource, StreamVoice
+
+OLDEST = "最早"
+QUIETEST = "最轻"
+PRIORITY = "最低优先级"
+STEAL_POLICIES = [PRIORITY, OLDEST, QUIETEST]
+
+
+class Voice:
+    """一次播放，接口与 pygame Channel 用到的部分一致
+
+    通道被抢占后自动失效，不会误操作其它音轨的声音
+    """
+    def __init__(self, manager: "VoiceManager", index, track, sound, output, loops=0, position=0.0, span=None):
+        self.manager = manager
+        self.index = index
+        self.track = track
+        self.sound = sound
+        self.output = output  # pygame Channel 或 StreamVoice
+        self.loops = loops
+        self.span = span  # 只播放 sound 的这一段 (起点秒, 终点秒)，循环也在段内
+        self.priority = track.priority
+        # 播放位置，切换设备时据此恢复
+        self.started = manager.clock() - position
+        self.paused_at = None
+        self.paused_total = 0.0
+
+    def position(self):
+        """当前在 sound 中播放到的秒数（循环时在段内取余）"""
+        # 离线渲染的时钟从 0 开始，暂停时刻可能为 0.0
+        now = self.paused_at if self.paused_at is not None else self.manager.clock()
+        elapsed = now - self.started - self.paused_total
+        start, end = self.span or (0.0, self.sound.get_length())
+        if self.loops and end > start:
+            return start + max(0.0, elapsed - start) % (end - start)
+        return min(elapsed, end)
+
+    def alive(self):
+        return self.manager.voices.get(self.index) is self
+
+    def get_busy(self):
+        return self.alive() and self.output.get_busy()
+
+    def get_sound(self):
+        return self.sound
+
+    def get_volume(self):
+        return self.track.volume
+
+    def pause(self):
+        if self.alive():
+            self.output.pause()
+            if self.paused_at is None:
+                self.paused_at = self.manager.clock()
+
+    def unpause(self):
+        if self.alive():
+            self.output.unpause()
+            if self.paused_at is not None:
+                self.paused_total += self.manager.clock() - self.paused_at
+                self.paused_at = None
+
+    def set_volume(self, volume):
+        if self.alive():
+            self.output.set_volume(volume)
+
+    def stop(self):
+        if self.alive():
+            self.output.stop()
+            self.manager.remove(self)
+
+
+class VoiceManager:
+    """通道分配器
+
+    通道不够时按需增加到上限，达到上限后按策略抢占，
+    永远不会抢占优先级更高的音轨，没有可抢占的通道时丢弃新的播放
+    """
+    def __init__(self, num_channels=32, max_channels=128, policy=PRIORITY):
+        self.lock = threading.RLock()
+        self.voices: dict[int, Voice] = {}  # 通道号 -> 当前播放
+        self.initial_channels = num_channels
+        self.num_channels = num_channels
+        self.max_channels = max_channels
+        self.policy = policy
+        self.mixer_stop = False  # '停止所有'时直接调用 pygame.mixer.stop()
+        # 提供 Channel/set_num_channels/stop 的混音器和播放位置的时钟，离线渲染时替换
+        self.backend = pygame.mixer
+        self.clock = time.perf_counter
+        self.stolen = 0
+        self.dropped = 0
+
+    def apply(self):
+        """mixer 初始化后调用，旧的通道全部失效"""
+        with self.lock:
+            self.voices.clear()
+            self.num_channels = min(self.initial_channels, self.max_channels)
+            self.backend.set_num_channels(self.num_channels)
+
+    def set_max_channels(self, max_channels):
+        with self.lock:
+            self.max_channels = max_channels
+            if self.num_channels > max_channels:
+                self.num_channels = max_channels
+                if pygame.mixer.get_init():
+                    self.backend.set_num_channels(max_channels)
+                for index in [i for i in self.voices if i >= max_channels]:
+                    del self.voices[index]
+
+    def play(self, track, sound, loops=0, position=0.0, output_sound=None, span=None):
+        """为音轨分配通道并播放，返回 Voice，被丢弃时返回 None
+
+        position: 从该秒数开始（流式播放时）或记录的起始位置
+        output_sound: 实际播放的声音（如从中间截取的片段），Voice 仍归属于 sound
+        span: output_sound 对应 sound 中的 (起点秒, 终点秒)，流式播放时只读取该段
+        """
+        with self.lock:
+            # 单音轨复音上限，抢占自己最早的播放
+            if track.max_voices > 0:
+                own = [v for v in self.voices.values() if v.track is track and v.get_busy()]
+                if len(own) >= track.max_voices:
+                    min(own, key=lambda v: v.started).stop()
+                    self.stolen += 1
+
+            index = self._find_free()
+            if index is None and self.num_channels < self.max_channels:
+                self.num_channels = min(self.max_channels, self.num_channels * 2)
+                self.backend.set_num_channels(self.num_channels)
+                index = self._find_free()
+            if index is None:
+                victim = self._choose_victim(track.priority)
+                if victim is None:
+                    self.dropped += 1
+                    return None
+                victim.stop()
+                self.stolen += 1
+                index = victim.index
+
+            channel = self.backend.Channel(index)
+            if isinstance(sound, StreamSource):
+                output = sound.play(loops, channel, position, span)
+                if output is None:
+                    self.dropped += 1
+                    return None
+            else:
+                channel.play(output_sound or sound, loops)
+                output = channel
+            voice = self.voices[index] = Voice(self, index, track, sound, output, loops, position, span)
+            return voice
+
+    def remove(self, voice: Voice):
+        with self.lock:
+            if self.voices.get(voice.index) is voice:
+                del self.voices[voice.index]
+
+    def active_voices(self):
+        with self.lock:
+            return list(self.voices.values())
+
+    def active_tracks(self, except_track=None):
+        """有播放的音轨"""
+        with self.lock:
+            return {v.track for v in self.voices.values() if v.track is not except_track}
+
+    def stop_all(self, except_track=None):
+        """停止所有播放（except_track 的除外），返回被停止的音轨
+
+        只遍历当前的播放，与音轨总数无关
+        """
+        with self.lock:
+            voices = [v for v in self.voices.values() if v.track is not except_track]
+            if except_track is None and self.mixer_stop:
+                self.backend.stop()
+                self.voices.clear()
+                # 流式播放还需要结束读取
+                for voice in voices:
+                    if isinstance(voice.output, StreamVoice):
+                        voice.output.stop()
+            else:
+                for voice in voices:
+                    voice.output.stop()
+                    del self.voices[voice.index]
+        return {voice.track for voice in voices}
+
+    def _find_free(self):
+        for index in range(self.num_channels):
+            voice = self.voices.get(index)
+            if voice is not None:
+                if voice.output.get_busy():
+                    continue
+                del self.voices[index]
+            if not self.backend.Channel(index).get_busy():
+                return index
+        return None
+
+    def _choose_victim(self, priority):
+        """从优先级不高于 priority 的播放中按策略选择"""
+        candidates = [v for v in self.voices.values() if v.priority <= priority]
+        if not candidates:
+            return None
+        if self.policy == OLDEST:
+            return min(candidates, key=lambda v: v.started)
+        if self.policy == QUIETEST:
+            return min(candidates, key=lambda v: (v.get_volume(), v.started))
+        return min(candidates, key=lambda v: (v.priority, v.started))
+
+    def snapshot(self):
+        """正在播放的 (音轨, 声音, 位置, 循环次数, 是否暂停, 播放段)"""
+        with self.lock:
+            return [(v.track, v.sound, v.position(), v.loops, v.paused_at is not None, v.span)
+                    for v in self.voices.values() if v.output.get_busy()]
+
+    def stats(self):
+        with self.lock:
+            active = sum(1 for v in self.voices.values() if v.output.get_busy())
+        return {
+            "active": active,
+            "num_channels": self.num_channels,
+            "max_channels": self.max_channels,
+            "stolen": self.stolen,
+            "dropped": self.dropped,
+        }
+
+
+voice_manager = VoiceManager()
@@ -0,0 +1,67 @@
+import numpy as np
+from PyQt6.QtWidgets import QWidget, QSizePolicy
+from PyQt6.QtCore import QRect, QLineF
+from PyQt6.QtGui import QPainter, QColor, QPen
+
+WAVE_COLOR = QColor("#7f8c8d")
+PLAYHEAD_COLOR = QColor("#e74c3c")
+
+
+def resample_peaks(peaks, width):
+    """把分析得到的峰值包络缩放到 width 个像素，返回 (最小值, 最大值)"""
+    lows = np.asarray(peaks["min"], np.float32)
+    highs = np.asarray(peaks["max"], np.float32)
+    if width <= 0 or not len(lows):
+        return np.zeros(0, np.float32), np.zeros(0, np.float32)
+    edges = np.linspace(0, len(lows), width + 1).astype(int)
+    edges = np.minimum(edges[:-1], len(lows) - 1)
+    return np.minimum.reduceat(lows, edges), np.maximum.reduceat(highs, edges)
+
+
+def draw_waveform(painter: QPainter, rect: QRect, lows, highs, playhead=None):
+    """用竖线画出包络，playhead 为 0~1 的播放位置"""
+    painter.save()
+    if len(lows):
+        middle = rect.y() + rect.height() / 2
+        half = rect.height() / 2
+        painter.setPen(QPen(WAVE_COLOR, 1))
+        painter.drawLines([QLineF(rect.x() + x, middle - high * half, rect.x() + x, middle - low * half)
+                           for x, (low, high) in enumerate(zip(lows.tolist(), highs.tolist()))])
+    if playhead is not None:
+        x = rect.x() + playhead * rect.width()
+        painter.setPen(QPen(PLAYHEAD_COLOR, 1))
+        painter.drawLine(QLineF(x, rect.top(), x, rect.bottom()))
+    painter.restore()
+
+
+class WaveformView(QWidget):
+    """音轨行中的波形缩略图和播放位置，只用 QPainter 绘制"""
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.peaks = None
+        self.playhead = None
+        self.scaled = None  # (宽度, 最小值, 最大值)
+        self.setFixedHeight(20)
+        self.setMinimumWidth(60)
+        self.setMaximumWidth(160)
+        self.setSizePolicy(QSizePolicy.Policy.Preferred, QSizePolicy.Policy.Fixed)
+
+    def set_peaks(self, peaks):
+        self.peaks = peaks
+        self.scaled = None
+        self.update()
+
+    def set_playhead(self, playhead):
+        if playhead != self.playhead:
+            self.playhead = playhead
+            self.update()
+
+    def paintEvent(self, event):
+        if self.peaks is None and self.playhead is None:
+            return
+        rect = self.rect()
+        if self.peaks is not None and (self.scaled is None or self.scaled[0] != rect.width()):
+            self.scaled = (rect.width(), *resample_peaks(self.peaks, rect.width()))
+        lows, highs = (self.scaled[1], self.scaled[2]) if self.scaled else ((), ())
+        painter = QPainter(self)
+        draw_waveform(painter, rect, lows, highs, self.playhead)
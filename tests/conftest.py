@@ -0,0 +1,7 @@
+import os
+import tempfile
+
+# 不打开声卡，缓存写到临时目录，需在导入 musicpad 之前设置
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+os.environ.setdefault("MUSICPAD_CACHE_DIR", tempfile.mkdtemp(prefix="musicpad-test-"))
@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+
+from musicpad import analysis
+from musicpad.analysis import loudness, silence_bounds
+
+RATE = 44100
+
+
+def burst(value, frames=RATE, at=RATE // 2, width=64):
+    """小幅噪声中间夹一段恒定电平"""
+    rng = np.random.default_rng(0)
+    pcm = rng.integers(-30, 30, size=(frames, 2)).astype(np.int16)
+    pcm[at:at + width] = value
+    return pcm
+
+
+@pytest.mark.parametrize("value", [-32768, 32767])
+def test_full_scale_peak(value):
+    result = loudness(burst(value), RATE)
+    assert result["peak_db"] == pytest.approx(0.0, abs=0.01)
+    assert result["true_peak_db"] >= result["peak_db"]
+
+
+def test_peak_found_across_chunks(monkeypatch):
+    # 每段只取少量候选，峰位于最后一段
+    monkeypatch.setattr(analysis, "CHUNK_FRAMES", 4096)
+    monkeypatch.setattr(analysis, "TRUE_PEAK_CANDIDATES", 8)
+    pcm = burst(-32768, frames=5 * 4096, at=4 * 4096 + 100, width=4)
+    top, candidates = analysis._peak_candidates(pcm)
+    assert top == 32768
+    assert len(candidates) == 8
+    frames = candidates // 2
+    assert ((frames >= 4 * 4096 + 100) & (frames < 4 * 4096 + 104)).all()
+    result = loudness(pcm, RATE)
+    assert result["peak_db"] == pytest.approx(0.0, abs=0.01)
+    assert result["true_peak_db"] >= result["peak_db"]
+
+
+def test_silent_clip():
+    result = loudness(np.zeros((RATE, 2), np.int16), RATE)
+    assert result["peak_db"] == result["true_peak_db"] == analysis.SILENCE_LUFS
+
+
+def test_silence_bounds_keep_negative_full_scale():
+    pcm = np.zeros((RATE, 2), np.int16)
+    pcm[RATE // 4] = -32768
+    pcm[RATE // 2] = -32768
+    bounds = silence_bounds(pcm, RATE)
+    assert bounds["start"] == pytest.approx(0.25 - analysis.TRIM_PREROLL, abs=1e-4)
+    assert bounds["end"] == pytest.approx(0.5 + analysis.TRIM_TAIL, abs=1e-4)
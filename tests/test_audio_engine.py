@@ -0,0 +1,28 @@
+import threading
+
+from musicpad.audio_engine import AudioEngine
+
+
+def test_control_commands_are_not_dropped():
+    engine = AudioEngine(maxsize=2)
+    calls = []
+    assert engine.submit(calls.append, "a")
+    assert engine.submit(calls.append, "b")
+    assert not engine.submit(calls.append, "dropped")
+    # 队列已满，生命周期命令仍然保留
+    engine.submit_control(calls.append, "unload")
+    engine.drain()
+    assert calls == ["unload", "a", "b"]
+    assert engine.dropped == 1
+
+
+def test_control_wakes_engine_thread():
+    engine = AudioEngine()
+    done = threading.Event()
+    engine.start()
+    try:
+        engine.submit_control(done.set)
+        assert done.wait(1)
+    finally:
+        engine.close()
+    assert not engine.is_alive()
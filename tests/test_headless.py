@@ -0,0 +1,113 @@
+import json
+import wave
+
+import numpy as np
+import pytest
+
+from musicpad.headless import render
+from musicpad.voices import Voice
+
+RATE = 44100
+
+
+def write_wav(path, pcm):
+    with wave.open(str(path), "wb") as f:
+        f.setnchannels(pcm.shape[1])
+        f.setsampwidth(2)
+        f.setframerate(RATE)
+        f.writeframes(pcm.astype("<i2").tobytes())
+
+
+def read_wav(path):
+    with wave.open(str(path), "rb") as f:
+        assert (f.getframerate(), f.getnchannels(), f.getsampwidth()) == (RATE, 2, 2)
+        return np.frombuffer(f.readframes(f.getnframes()), "<i2").reshape(-1, 2)
+
+
+@pytest.fixture
+def board(tmp_path):
+    """0.25 秒的正弦波，快捷键 A，终止模式"""
+    t = np.arange(RATE // 4) / RATE
+    tone = (np.sin(2 * np.pi * 440 * t) * 8000).astype(np.int16)
+    pcm = np.stack((tone, tone), axis=1)
+    write_wav(tmp_path / "tone.wav", pcm)
+    board_path = tmp_path / "audios.json"
+    board_path.write_text(json.dumps({
+        "global_settings": {"hold_mode": False, "mixer": {"frequency": RATE, "channels": 2}},
+        "tracks": [{"file_path": str(tmp_path / "tone.wav"), "shortcut": "A"}],
+    }), encoding="utf-8")
+    return board_path, pcm
+
+
+def test_render_places_sound_at_event_time(tmp_path, board):
+    board_path, pcm = board
+    script = tmp_path / "script.json"
+    script.write_text(json.dumps([{"time": 0.1, "key": "a"}]), encoding="utf-8")
+
+    stats = render(board_path, script, tmp_path / "out.wav", duration=0.5)
+    out = read_wav(tmp_path / "out.wav")
+
+    assert stats["events"] == 2  # 按下和松开
+    assert len(out) == RATE // 2
+    start = int(0.1 * RATE)
+    assert not out[:start].any()
+    np.testing.assert_array_equal(out[start:start + len(pcm)], pcm)
+    assert not out[start + len(pcm):].any()
+
+
+def test_render_is_deterministic(tmp_path, board):
+    board_path, _ = board
+    script = tmp_path / "script.json"
+    # 第二次按下停止，第三次重新开始
+    script.write_text(json.dumps([{"time": 0.0, "key": "a"}, {"time": 0.05, "key": "a"},
+                                  {"time": 0.2, "key": "a", "hold": 0.01}]), encoding="utf-8")
+
+    render(board_path, script, tmp_path / "a.wav", duration=0.6)
+    render(board_path, script, tmp_path / "b.wav", duration=0.6)
+    first = read_wav(tmp_path / "a.wav")
+
+    assert (tmp_path / "a.wav").read_bytes() == (tmp_path / "b.wav").read_bytes()
+    stop, restart = int(0.05 * RATE), int(0.2 * RATE)
+    assert first[:stop].any()
+    assert not first[stop:restart].any()
+    assert first[restart:].any()
+
+
+class FakeManager:
+    def __init__(self):
+        self.now = 0.0
+        self.voices = {}
+
+    def clock(self):
+        return self.now
+
+
+class FakeSound:
+    def get_length(self):
+        return 10.0
+
+
+class FakeOutput:
+    def pause(self):
+        pass
+
+    def unpause(self):
+        pass
+
+
+class FakeTrack:
+    priority = 0
+
+
+def test_voice_paused_at_clock_zero():
+    """离线时钟从 0 开始，在 0.0 暂停也应停止计时"""
+    manager = FakeManager()
+    voice = Voice(manager, 0, FakeTrack(), FakeSound(), FakeOutput())
+    manager.voices[0] = voice
+
+    voice.pause()
+    manager.now = 2.0
+    assert voice.position() == 0.0
+    voice.unpause()
+    manager.now = 3.0
+    assert voice.position() == pytest.approx(1.0)
@@ -0,0 +1,303 @@
+import base64
+import json
+import os
+import socket
+import struct
+import threading
+import time
+
+import pytest
+
+from musicpad.remote import POLL_TIMEOUT, RemoteServer, osc_decode, osc_encode, parse_text
+
+
+class FakeTrack:
+    def __init__(self, path=""):
+        self.path = path
+        self.volume = None
+
+    def stop(self):
+        pass
+
+    def set_volume(self, db):
+        self.volume = db
+
+
+class FakeEngine:
+    """记录命令，不经过音频线程"""
+    def __init__(self, tracks):
+        self.tracks = tuple(tracks)
+        self.hold_mode = False
+        self.calls = []
+
+    def trigger(self, track, is_key_down, trace=None):
+        self.calls.append(("trigger", track, is_key_down))
+
+    def submit(self, func, *args):
+        self.calls.append(("submit", func, args))
+        func(*args)
+
+    def stop_all(self):
+        self.calls.append(("stop_all",))
+
+
+@pytest.fixture
+def tracks():
+    return [FakeTrack("/music/Intro.wav"), FakeTrack("/music/outro.mp3"), FakeTrack()]
+
+
+@pytest.fixture
+def engine(tracks):
+    return FakeEngine(tracks)
+
+
+def free_port(kind):
+    with socket.socket(socket.AF_INET, kind) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture
+def server(engine):
+    server = RemoteServer(engine)
+    server.start(free_port(socket.SOCK_DGRAM), free_port(socket.SOCK_STREAM))
+    yield server
+    server.stop()
+
+
+class WebSocket:
+    """只发送带掩码文本帧的最小客户端"""
+    def __init__(self, port, origin=None):
+        self.sock = socket.create_connection(("127.0.0.1", port), timeout=2)
+        key = base64.b64encode(os.urandom(16)).decode()
+        request = (f"GET / HTTP/1.1\r\nHost: 127.0.0.1:{port}\r\nUpgrade: websocket\r\n"
+                   f"Connection: Upgrade\r\nSec-WebSocket-Key: {key}\r\nSec-WebSocket-Version: 13\r\n")
+        if origin:
+            request += f"Origin: {origin}\r\n"
+        self.sock.sendall((request + "\r\n").encode())
+        self.reader = self.sock.makefile("rb")
+        self.status = self.reader.readline()
+        while self.reader.readline() not in (b"\r\n", b""):
+            pass
+
+    def send(self, text):
+        payload = text.encode("utf-8")
+        mask = os.urandom(4)
+        masked = bytes(b ^ mask[i % 4] for i, b in enumerate(payload))
+        self.sock.sendall(struct.pack(">BB", 0x81, 0x80 | len(payload)) + mask + masked)
+
+    def receive(self):
+        head = self.reader.read(2)
+        return self.reader.read(head[1] & 0x7F).decode("utf-8")
+
+    def close(self):
+        self.reader.close()
+        self.sock.close()
+
+
+def udp_request(port, message):
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        sock.settimeout(2)
+        sock.sendto(message, ("127.0.0.1", port))
+        return sock.recvfrom(1024)[0]
+
+
+# 解析
+
+def test_osc_round_trip():
+    data = osc_encode("/trigger", 3, 0.5, "intro", True)
+    assert len(data) % 4 == 0
+    address, args = osc_decode(data)
+    assert address == "/trigger"
+    # bool 按 int 编码
+    assert args == [3, 0.5, "intro", 1]
+
+
+def test_parse_text():
+    assert parse_text("/trigger 3") == ("/trigger", [3])
+    assert parse_text('/trigger "my intro" 0') == ("/trigger", ["my intro", 0])
+    assert parse_text("/volume 2 -6.5") == ("/volume", [2, -6.5])
+    assert parse_text('{"cmd": "trigger", "track": 3, "down": false}') == ("/trigger", [3, False])
+    assert parse_text('{"cmd": "ping", "id": 7}') == ("/ping", [7])
+
+
+@pytest.mark.parametrize("text", ['{"cmd": 5}', '{"cmd": null}', '{"cmd": ["ping"]}', "", "{"])
+def test_parse_text_rejects_malformed(text):
+    with pytest.raises(ValueError):
+        parse_text(text)
+
+
+# 命令
+
+def test_resolve_by_index_and_name(engine, tracks):
+    server = RemoteServer(engine)
+    assert server.resolve(1) is tracks[0]
+    assert server.resolve("2") is tracks[1]
+    assert server.resolve(0) is None
+    assert server.resolve(4) is None
+    assert server.resolve("intro") is tracks[0]
+    assert server.resolve("INTRO.WAV") is tracks[0]
+    assert server.resolve("outro") is tracks[1]
+
+
+def test_resolve_caches_misses_until_tracks_change(engine, tracks):
+    server = RemoteServer(engine)
+    assert server.resolve("late") is None
+    names = server.names
+    tracks[2].path = "/music/late.ogg"
+    # 找不到的名称不重建索引
+    assert server.resolve("late") is None
+    assert server.names is names
+    server.invalidate_names()
+    assert server.resolve("late") is tracks[2]
+    # 音轨快照替换后也重建
+    engine.tracks = (FakeTrack("/music/new.wav"),)
+    assert server.resolve("new") is engine.tracks[0]
+
+
+def test_trigger_key_up_only_in_hold_mode(engine, tracks):
+    server = RemoteServer(engine)
+    server.handle("/trigger", [1])
+    server.handle("/trigger", [1, 0])
+    assert engine.calls == [("trigger", tracks[0], True)]
+    engine.hold_mode = True
+    server.handle("/trigger", [1, 0])
+    assert engine.calls[-1] == ("trigger", tracks[0], False)
+
+
+def test_volume(engine, tracks):
+    changes = []
+    server = RemoteServer(engine, lambda track, db: changes.append((track, db)))
+    server.handle("/volume", ["outro", -12])
+    assert changes == [(tracks[1], -12.0)]
+
+
+@pytest.mark.parametrize("db", ["nan", "inf", "-inf", float("nan")])
+def test_volume_rejects_non_finite(engine, db):
+    changes = []
+    server = RemoteServer(engine, lambda track, db: changes.append(db))
+    assert server.process(f"/volume 1 {db}".encode(), binary=False) is None
+    assert changes == []
+    assert server.errors == 1
+
+
+@pytest.mark.parametrize("data, binary", [
+    (b'{"cmd": 5}', False),
+    (b"[1]", False),
+    (b"\xff\xfe", False),
+    (b"/unknown 1", False),
+    (b"/trigger 9", False),
+    (b"/trigger", False),
+    (b"/ping\0\0\0,x\0\0", True),
+    (b"/trigger\0\0\0\0,i\0\0", True),
+])
+def test_process_counts_malformed(engine, data, binary):
+    server = RemoteServer(engine)
+    assert server.process(data, binary) is None
+    assert server.errors == 1
+    assert engine.calls == []
+
+
+# 本机回环
+
+def test_udp_ping_survives_malformed(server):
+    port = server.udp_socket.getsockname()[1]
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        sock.sendto(b'{"cmd": 5}', ("127.0.0.1", port))
+        sock.sendto(b"/volume 1 nan", ("127.0.0.1", port))
+    assert udp_request(port, b"/ping 7") == b"/pong 7"
+    assert osc_decode(udp_request(port, osc_encode("/ping", 8))) == ("/pong", [8])
+    assert json.loads(udp_request(port, b'{"cmd": "ping", "id": 9}')) == {"cmd": "pong", "id": 9}
+    assert server.errors == 2
+
+
+def test_udp_trigger(server, engine, tracks):
+    port = server.udp_socket.getsockname()[1]
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        sock.sendto(osc_encode("/trigger", "outro"), ("127.0.0.1", port))
+    # ping 在同一线程中按顺序处理，收到回复时触发已经执行
+    udp_request(port, b"/ping")
+    assert ("trigger", tracks[1], True) in engine.calls
+
+
+def test_websocket_ping_survives_malformed(server):
+    client = WebSocket(server.ws_socket.getsockname()[1])
+    try:
+        assert b" 101 " in client.status
+        client.send('{"cmd": 5}')
+        client.send('{"cmd": "ping", "id": 1}')
+        assert json.loads(client.receive()) == {"cmd": "pong", "id": 1}
+        client.send("/ping 2")
+        assert client.receive() == "/pong 2"
+    finally:
+        client.close()
+    assert server.errors == 1
+
+
+def test_websocket_rejects_browser_origin(server):
+    port = server.ws_socket.getsockname()[1]
+    client = WebSocket(port, origin="http://evil.example")
+    assert b" 403 " in client.status
+    client.close()
+
+    server.allowed_origins = {"http://localhost:8080"}
+    client = WebSocket(port, origin="http://localhost:8080")
+    try:
+        assert b" 101 " in client.status
+        client.send("/ping ok")
+        assert client.receive() == "/pong ok"
+    finally:
+        client.close()
+
+
+def test_stop_wakes_idle_clients(engine):
+    server = RemoteServer(engine)
+    server.start(0, free_port(socket.SOCK_STREAM))
+    port = server.ws_socket.getsockname()[1]
+    clients = [WebSocket(port) for _ in range(3)]
+    try:
+        started = time.perf_counter()
+        server.stop()
+        # 所有线程共用 POLL_TIMEOUT * 2 的期限
+        assert time.perf_counter() - started < POLL_TIMEOUT * 2
+        assert not any(thread.is_alive() for thread in threading.enumerate()
+                       if thread.name == "RemoteWebSocketClient")
+        for client in clients:
+            assert client.reader.read(2) == b""
+    finally:
+        for client in clients:
+            client.close()
+
+
+def frame_head(opcode, length, fin):
+    return struct.pack(">BBH", (0x80 if fin else 0) | opcode, 0x80 | 126, length)
+
+
+def test_websocket_limits_fragmented_message(server):
+    client = WebSocket(server.ws_socket.getsockname()[1])
+    try:
+        chunk = b"x" * 60000
+        # 每帧都在限制内，累计超过 MAX_MESSAGE
+        mask = b"\0" * 4
+        client.sock.sendall(frame_head(1, len(chunk), fin=False) + mask + chunk)
+        # 读到第二帧的长度就关闭连接，不需要发送数据
+        client.sock.sendall(frame_head(0, len(chunk), fin=False))
+        assert client.reader.read(4) == struct.pack(">BBH", 0x88, 2, 1009)
+        assert client.reader.read(1) == b""
+    finally:
+        client.close()
+    assert server.errors == 1
+
+
+def test_finished_connections_release_threads(server):
+    port = server.ws_socket.getsockname()[1]
+    for _ in range(5):
+        client = WebSocket(port)
+        client.send("/ping")
+        client.receive()
+        client.close()
+    deadline = time.monotonic() + 2
+    while len(server.threads) > 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    # 只剩 UDP 和 accept 线程
+    assert len(server.threads) == 2
@@ -0,0 +1,91 @@
+import wave
+
+import numpy as np
+import pygame
+import pytest
+
+from musicpad.analysis import silence_bounds, stream_silence_bounds
+from musicpad.stream import StreamReader, StreamVoice
+
+RATE = 44100
+
+
+@pytest.fixture
+def mixer():
+    if not pygame.mixer.get_init():
+        pygame.mixer.init(RATE, -16, 2)
+    if pygame.mixer.get_init() != (RATE, -16, 2):
+        pytest.skip("mixer 格式不同，流式读取会重采样")
+
+
+@pytest.fixture
+def ramp(tmp_path):
+    """每帧的值等于帧号（取模），便于检查读到的范围"""
+    frames = RATE * 2
+    values = (np.arange(frames) % 30000 + 1).astype(np.int16)
+    pcm = np.stack((values, values), axis=1)
+    path = tmp_path / "ramp.wav"
+    with wave.open(str(path), "wb") as f:
+        f.setnchannels(2)
+        f.setsampwidth(2)
+        f.setframerate(RATE)
+        f.writeframes(pcm.tobytes())
+    return path, pcm
+
+
+def assert_frames(out, expected):
+    # 读取时经过浮点转换，数值可能差 1
+    assert out.shape == expected.shape
+    np.testing.assert_allclose(out, expected, atol=1)
+
+
+def read_all(reader):
+    chunks = []
+    while data := reader.read():
+        chunks.append(np.frombuffer(data, "<i2").reshape(-1, 2))
+    return np.concatenate(chunks)
+
+
+def test_reader_stops_at_span_end(mixer, ramp):
+    path, pcm = ramp
+    reader = StreamReader(path, (0.5, 1.25))
+    reader.rewind(0.75)
+    out = read_all(reader)
+    assert_frames(out, pcm[int(0.75 * RATE):int(1.25 * RATE)])
+    # 循环时回到段的起点
+    reader.rewind()
+    out = read_all(reader)
+    assert_frames(out, pcm[int(0.5 * RATE):int(1.25 * RATE)])
+    reader.close()
+
+
+def test_looping_voice_rewinds_to_span_start(mixer, ramp):
+    path, pcm = ramp
+
+    class Source:
+        pass
+
+    source = Source()
+    source.path = str(path)
+    span = (0.5, 0.75)
+    voice = StreamVoice(source, loops=2, span=span)
+    voice.reader.rewind(span[0])
+    chunks = []
+    while (sound := voice._next_sound()) is not None:
+        chunks.append(pygame.sndarray.array(sound))
+    voice._finish()
+    part = pcm[int(span[0] * RATE):int(span[1] * RATE)]
+    assert_frames(np.concatenate(chunks), np.concatenate([part] * 3))
+
+
+def test_stream_silence_matches_decoded(mixer, tmp_path):
+    pcm = np.zeros((RATE, 2), np.int16)
+    pcm[RATE // 4] = -32768
+    pcm[RATE // 2:RATE // 2 + 10] = 12000
+    path = tmp_path / "burst.wav"
+    with wave.open(str(path), "wb") as f:
+        f.setnchannels(2)
+        f.setsampwidth(2)
+        f.setframerate(RATE)
+        f.writeframes(pcm.tobytes())
+    assert stream_silence_bounds(path, RATE) == pytest.approx(silence_bounds(pcm, RATE))